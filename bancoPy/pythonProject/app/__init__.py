@@ -5,6 +5,8 @@ SINPE Banking System Flask Application Factory
 from flask import Flask
 from flask_cors import CORS
 from app.models import db
+from app.utils.json_provider import FastJSONProvider
+from app.utils.sqlite_config import sqlite_engine_options, register_sqlite_pragmas
 import os
 
 
@@ -26,13 +28,7 @@ def create_app():
             "SECRET_KEY": "supersecreta123",
             "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
             "SQLALCHEMY_TRACK_MODIFICATIONS": False,
-            "SQLALCHEMY_ENGINE_OPTIONS": {
-                "pool_pre_ping": True,
-                "pool_recycle": 300,
-                "pool_timeout": 20,
-                "pool_size": 10,
-                "max_overflow": 20,
-            },
+            "SQLALCHEMY_ENGINE_OPTIONS": sqlite_engine_options(),
             "JSON_SORT_KEYS": False,
             "JSONIFY_PRETTYPRINT_REGULAR": False,
             # Security headers
@@ -45,9 +41,16 @@ def create_app():
         }
     )
 
+    # orjson-backed JSON (stdlib fallback) that encodes Decimal and datetime
+    app.json = FastJSONProvider(app)
+
     # Initialize extensions
     db.init_app(app)
 
+    # WAL and connection pragmas must be in place before the first connection
+    with app.app_context():
+        register_sqlite_pragmas(db.engine)
+
     # Configure CORS with optimized settings
     CORS(
         app,
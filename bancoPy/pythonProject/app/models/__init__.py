@@ -2,6 +2,8 @@
 Database Models for SINPE Banking System
 """
 
+import json
+
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from decimal import Decimal
@@ -39,6 +41,7 @@ class Account(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     number = db.Column(db.String(30), unique=True, nullable=False)
+    iban = db.Column(db.String(34), unique=True, index=True)  # Derived from number
     currency = db.Column(db.String(3), nullable=False, default="CRC")
     balance = db.Column(db.Numeric(15, 2), default=Decimal("0.00"))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -61,6 +64,32 @@ class Account(db.Model):
         back_populates="to_account",
     )
 
+    IBAN_PREFIX = "CR210152"
+
+    @staticmethod
+    def normalize_iban(iban: str) -> str:
+        """Canonical IBAN form: no dashes or spaces, uppercase"""
+        return iban.replace("-", "").replace(" ", "").upper()
+
+    @staticmethod
+    def build_iban(number: str) -> str:
+        """Derive the account IBAN (normalized) from its account number"""
+        return Account.normalize_iban(f"{Account.IBAN_PREFIX}{number}")
+
+    @staticmethod
+    def iban_sql(number_column):
+        """SQL expression computing build_iban() from an account number column"""
+        return db.func.upper(
+            db.func.replace(
+                db.func.replace(Account.IBAN_PREFIX + number_column, "-", ""), " ", ""
+            )
+        )
+
+    @db.validates("number")
+    def _sync_iban(self, key, number):
+        self.iban = Account.build_iban(number)
+        return number
+
     def to_dict(self):
         # Get the first linked user ID if available
         user_id = None
@@ -70,7 +99,7 @@ class Account(db.Model):
         return {
             "id": self.id,
             "number": self.number,
-            "iban": f"CR210152{self.number}",  # Generate IBAN from account number
+            "iban": self.iban or Account.build_iban(self.number),
             "account_type": "savings",  # Default account type
             "currency": self.currency,
             "balance": float(self.balance),
@@ -161,6 +190,23 @@ class Transaction(db.Model):
         "Account", foreign_keys=[to_account_id], back_populates="received_transactions"
     )
 
+    # Composite indexes for range-bounded monitoring aggregates and paging
+    __table_args__ = (
+        db.Index(
+            "ix_transactions_from_account_created_status",
+            "from_account_id",
+            "created_at",
+            "status",
+        ),
+        db.Index("ix_transactions_sender_phone_created", "sender_phone", "created_at"),
+        db.Index(
+            "ix_transactions_receiver_phone_created", "receiver_phone", "created_at"
+        ),
+        db.Index("ix_transactions_to_account_created", "to_account_id", "created_at"),
+        # Keyset pagination over (created_at, id)
+        db.Index("ix_transactions_created_id", "created_at", "id"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -181,6 +227,96 @@ class Transaction(db.Model):
         }
 
 
+class LedgerSnapshot(db.Model):
+    """Checkpointed ledger balance per account for incremental integrity checks"""
+
+    __tablename__ = "ledger_snapshots"
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(
+        db.Integer, db.ForeignKey("accounts.id"), unique=True, nullable=False
+    )
+    # Net of completed transactions up to and including last_transaction_id
+    balance = db.Column(db.Numeric(15, 2), nullable=False, default=Decimal("0.00"))
+    last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "account_id": self.account_id,
+            "balance": float(self.balance),
+            "last_transaction_id": self.last_transaction_id,
+            "transaction_count": self.transaction_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class ProcessedTransfer(db.Model):
+    """Result of an incoming inter-bank transfer, keyed by its transaction id"""
+
+    __tablename__ = "processed_transfers"
+
+    # Primary key doubles as the idempotency constraint
+    transaction_id = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # sinpe_incoming, ...
+    result = db.Column(db.Text)  # JSON returned to the sending bank
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "transaction_id": self.transaction_id,
+            "kind": self.kind,
+            "result": json.loads(self.result) if self.result else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class OutboxTransfer(db.Model):
+    """Outgoing inter-bank transfer queued for background delivery"""
+
+    __tablename__ = "outbox_transfers"
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.String(36), unique=True, nullable=False)
+    # Client-supplied key; a replayed request returns the original entry
+    idempotency_key = db.Column(db.String(64), unique=True, nullable=True)
+    kind = db.Column(db.String(20), nullable=False)  # sinpe, sinpe_movil
+    destination = db.Column(db.String(50), nullable=False)  # IBAN or phone
+    payload = db.Column(db.Text, nullable=False)  # signed JSON sent to the peer
+    # pending, in_flight, delivered, failed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Next delivery attempt, or lease expiry while in_flight
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(255))
+    response = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime)
+
+    # Dispatcher claims due entries in next_attempt_at order
+    __table_args__ = (
+        db.Index("ix_outbox_transfers_status_next", "status", "next_attempt_at"),
+    )
+
+    def to_dict(self):
+        return {
+            "transaction_id": self.transaction_id,
+            "kind": self.kind,
+            "destination": self.destination,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "response": json.loads(self.response) if self.response else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "delivered_at": (
+                self.delivered_at.isoformat() if self.delivered_at else None
+            ),
+        }
+
+
 class Currency(db.Model):
     __tablename__ = "currencies"
 
@@ -5,19 +5,50 @@ Account Routes - API endpoints for account management
 from flask import Blueprint, request, jsonify
 from app.models import db, Account, User, UserAccount
 from app.utils.iban_generator import generate_account_number
+from app.utils.json_provider import column_records
 from decimal import Decimal
+from sqlalchemy import func, literal
 
 account_bp = Blueprint("accounts", __name__)
 
+# Keys of Account.to_dict(), in column order of the list query
+ACCOUNT_KEYS = (
+    "id",
+    "number",
+    "iban",
+    "account_type",
+    "currency",
+    "balance",
+    "user_id",
+    "created_at",
+)
+
 
 @account_bp.route("/accounts", methods=["GET"])
 def get_accounts():
     """Get all accounts"""
     try:
-        accounts = Account.query.all()
-        return jsonify(
-            {"success": True, "data": [account.to_dict() for account in accounts]}
+        # First linked user, as in Account.to_dict()
+        first_user_id = (
+            db.select(UserAccount.user_id)
+            .where(UserAccount.account_id == Account.id)
+            .order_by(UserAccount.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        rows = db.session.execute(
+            db.select(
+                Account.id,
+                Account.number,
+                func.coalesce(Account.iban, Account.iban_sql(Account.number)),
+                literal("savings"),  # Default account type
+                Account.currency,
+                Account.balance,
+                first_user_id,
+                Account.created_at,
+            )
         )
+        return jsonify({"success": True, "data": column_records(ACCOUNT_KEYS, rows)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
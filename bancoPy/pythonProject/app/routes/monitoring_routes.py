@@ -6,6 +6,13 @@ from flask import Blueprint, jsonify, request
 from app.services.health_monitoring_service import health_monitor
 from app.services.transaction_monitoring_service import transaction_monitor
 from app.services.logging_service import banking_logger
+from app.services.phone_directory_service import phone_directory
+from app.services.circuit_breaker_service import peer_breakers
+from app.services.idempotency_service import incoming_transfers
+from app.services.outbox_service import outbox
+from app.services.peer_health_service import peer_health
+from app.services.peer_session_service import peer_sessions
+from app.services.phone_routing_service import phone_routing
 from app.models import db, Transaction, Account, User
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_
@@ -275,6 +282,157 @@ def get_database_metrics():
         )
 
 
+@monitoring_bp.route("/metrics/cache", methods=["GET"])
+def get_cache_metrics():
+    """Get hit/miss counters for in-process lookup caches"""
+    try:
+        return jsonify(
+            {
+                "status": "success",
+                "data": {
+                    "phone_directory": phone_directory.get_stats(),
+                    "phone_routing": phone_routing.get_stats(),
+                    "incoming_transfers": incoming_transfers.get_stats(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+        )
+
+    except Exception as e:
+        banking_logger.log_error("cache_metrics_endpoint", str(e))
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Failed to get cache metrics",
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
+@monitoring_bp.route("/metrics/inter-bank", methods=["GET"])
+def get_inter_bank_metrics():
+    """Get the cached per-peer health snapshot and latency histograms"""
+    try:
+        return jsonify(
+            {
+                "status": "success",
+                "data": {
+                    "inter_bank": peer_health.snapshot(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+        )
+
+    except Exception as e:
+        banking_logger.log_error("inter_bank_metrics_endpoint", str(e))
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Failed to get inter-bank metrics",
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
+@monitoring_bp.route("/metrics/outbox", methods=["GET"])
+def get_outbox_metrics():
+    """Get outgoing transfer queue depth per delivery status"""
+    try:
+        return jsonify(
+            {
+                "status": "success",
+                "data": {
+                    "outbox": outbox.get_stats(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+        )
+
+    except Exception as e:
+        banking_logger.log_error("outbox_metrics_endpoint", str(e))
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Failed to get outbox metrics",
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
+@monitoring_bp.route("/metrics/peers", methods=["GET"])
+def get_peer_metrics():
+    """Get connection reuse, latency and circuit breaker state per peer bank"""
+    try:
+        return jsonify(
+            {
+                "status": "success",
+                "data": {
+                    "peers": peer_sessions.get_stats(),
+                    "circuits": peer_breakers.get_stats(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+        )
+
+    except Exception as e:
+        banking_logger.log_error("peer_metrics_endpoint", str(e))
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Failed to get peer metrics",
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
+@monitoring_bp.route("/routing/refresh", methods=["POST"])
+def refresh_phone_routing():
+    """Reload the phone -> bank routing file"""
+    try:
+        loaded = phone_routing.refresh_from_file()
+
+        return jsonify(
+            {
+                "status": "success",
+                "data": {
+                    "routes_loaded": loaded,
+                    "routing": phone_routing.get_stats(),
+                    "timestamp": datetime.utcnow().isoformat(),
+                },
+            }
+        )
+
+    except Exception as e:
+        banking_logger.log_error("routing_refresh_endpoint", str(e))
+        return (
+            jsonify(
+                {
+                    "status": "error",
+                    "message": "Failed to refresh phone routing",
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
 @monitoring_bp.route("/alerts", methods=["GET"])
 def get_active_alerts():
     """Get current system alerts"""
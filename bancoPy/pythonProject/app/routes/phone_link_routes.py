@@ -5,6 +5,7 @@ Phone Link Routes - API endpoints for phone link management
 from flask import Blueprint, request, jsonify
 from app.models import db, PhoneLink, Account
 from app.services.sinpe_service import SinpeService
+from app.services.phone_directory_service import phone_directory
 
 phone_link_bp = Blueprint("phone_links", __name__)
 
@@ -62,6 +63,7 @@ def create_phone_link():
 
         db.session.add(phone_link)
         db.session.commit()
+        phone_directory.invalidate(phone_link.phone)
 
         return jsonify({"success": True, "data": phone_link.to_dict()}), 201
 
@@ -83,12 +85,12 @@ def get_phone_link(link_id):
 def get_phone_link_by_phone(phone):
     """Get phone link by phone number"""
     try:
-        phone_link = PhoneLink.query.filter_by(phone=phone).first()
+        phone_link = phone_directory.get_phone_link(phone)
 
         if not phone_link:
             return jsonify({"error": "Phone link not found"}), 404
 
-        return jsonify({"success": True, "data": phone_link.to_dict()})
+        return jsonify({"success": True, "data": phone_link})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -112,6 +114,7 @@ def update_phone_link(link_id):
     """Update phone link"""
     try:
         phone_link = PhoneLink.query.get_or_404(link_id)
+        previous_phone = phone_link.phone
         data = request.get_json()
 
         if "phone" in data:
@@ -147,6 +150,7 @@ def update_phone_link(link_id):
             phone_link.account_number = data["account_number"]
 
         db.session.commit()
+        phone_directory.invalidate(previous_phone, phone_link.phone)
 
         return jsonify({"success": True, "data": phone_link.to_dict()})
 
@@ -159,8 +163,10 @@ def delete_phone_link(link_id):
     """Delete phone link"""
     try:
         phone_link = PhoneLink.query.get_or_404(link_id)
+        phone = phone_link.phone
         db.session.delete(phone_link)
         db.session.commit()
+        phone_directory.invalidate(phone)
 
         return jsonify({"success": True, "message": "Phone link deleted successfully"})
 
@@ -3,22 +3,21 @@ SINPE Routes - API endpoints for SINPE functionality
 FORMATO ACTUALIZADO: Compatible con ecosistema inter-banco usando SSH
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from app.services.sinpe_service import SinpeService
-from app.services.bank_connector_service import BankConnectorService
-from app.utils.hmac_generator import (
-    verify_hmac,
-    generar_hmac,
-    generate_hmac_for_phone_transfer,
-    generate_hmac_for_account_transfer,
-)
-from app.utils.validators import validate_sinpe_payload, validate_sinpe_movil_payload
+from app.services.outbox_service import SINPE, SINPE_MOVIL, outbox
+from app.utils.bank_routing import bank_code_from_iban
+from app.utils.bank_secrets import bank_secrets
+from app.utils.transfers import OutgoingTransfer
+from app.utils.validators import parse_amount, sinpe_validator, sinpe_movil_validator
 from datetime import datetime
 import uuid
 import json
 
 sinpe_bp = Blueprint("sinpe", __name__)
-bank_connector = BankConnectorService()
+
+# Maximum number of transfers accepted by the batch endpoint
+MAX_BATCH_SIZE = 1000
 
 
 # ============= ENDPOINTS PARA RECIBIR TRANSFERENCIAS =============
@@ -30,9 +29,9 @@ def receive_sinpe_transfer():
     try:
         data = request.get_json()
 
-        # Validar estructura
-        is_valid, error_msg = validate_sinpe_payload(data)
-        if not is_valid:
+        # Validar estructura y normalizar (monto Decimal, timestamp datetime)
+        transfer, error_msg = sinpe_validator.validate(data)
+        if transfer is None:
             return (
                 jsonify(
                     {
@@ -44,9 +43,8 @@ def receive_sinpe_transfer():
                 400,
             )
 
-        # Verificar HMAC
-        received_hmac = data.get("hmac_md5")
-        if not verify_hmac(data, received_hmac):
+        # Verificar HMAC sobre los campos ya normalizados
+        if not bank_secrets.verify_transfer(transfer):
             return (
                 jsonify(
                     {
@@ -59,14 +57,14 @@ def receive_sinpe_transfer():
             )
 
         # Procesar transferencia
-        result = SinpeService.process_incoming_sinpe_transfer(data)
+        result = SinpeService.process_incoming_transfer(transfer)
 
-        if result.get("success"):
+        if result.success:
             return jsonify(
                 {
                     "success": True,
                     "message": "Transferencia procesada exitosamente",
-                    "transaction_id": result.get("transaction_id"),
+                    "transaction_id": result.transaction_id,
                     "timestamp": datetime.utcnow().isoformat(),
                 }
             )
@@ -75,7 +73,7 @@ def receive_sinpe_transfer():
                 jsonify(
                     {
                         "success": False,
-                        "error": result.get("error", "Error procesando transferencia"),
+                        "error": result.error or "Error procesando transferencia",
                         "timestamp": datetime.utcnow().isoformat(),
                     }
                 ),
@@ -101,9 +99,9 @@ def receive_sinpe_movil_transfer():
     try:
         data = request.get_json()
 
-        # Validar estructura
-        is_valid, error_msg = validate_sinpe_movil_payload(data)
-        if not is_valid:
+        # Validar estructura y normalizar (monto Decimal, timestamp datetime)
+        transfer, error_msg = sinpe_movil_validator.validate(data)
+        if transfer is None:
             return (
                 jsonify(
                     {
@@ -115,9 +113,8 @@ def receive_sinpe_movil_transfer():
                 400,
             )
 
-        # Verificar HMAC
-        received_hmac = data.get("hmac_md5")
-        if not verify_hmac(data, received_hmac):
+        # Verificar HMAC sobre los campos ya normalizados
+        if not bank_secrets.verify_transfer(transfer):
             return (
                 jsonify(
                     {
@@ -130,14 +127,14 @@ def receive_sinpe_movil_transfer():
             )
 
         # Procesar transferencia
-        result = SinpeService.process_incoming_sinpe_movil_transfer(data)
+        result = SinpeService.process_incoming_transfer(transfer)
 
-        if result.get("success"):
+        if result.success:
             return jsonify(
                 {
                     "success": True,
                     "message": "Transferencia SINPE móvil procesada exitosamente",
-                    "transaction_id": result.get("transaction_id"),
+                    "transaction_id": result.transaction_id,
                     "timestamp": datetime.utcnow().isoformat(),
                 }
             )
@@ -146,15 +143,113 @@ def receive_sinpe_movil_transfer():
                 jsonify(
                     {
                         "success": False,
-                        "error": result.get(
-                            "error", "Error procesando transferencia móvil"
-                        ),
+                        "error": result.error or "Error procesando transferencia móvil",
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                ),
+                400,
+            )
+
+    except Exception as e:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": f"Error interno: {str(e)}",
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            ),
+            500,
+        )
+
+
+@sinpe_bp.route("/api/sinpe-movil-transfer/batch", methods=["POST"])
+def receive_sinpe_movil_transfer_batch():
+    """Recibir lote de transferencias SINPE móvil (una sola transacción de BD)"""
+    try:
+        data = request.get_json()
+        transfers = data.get("transfers") if isinstance(data, dict) else None
+
+        if not isinstance(transfers, list) or not transfers:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": "Payload inválido: transfers debe ser una lista no vacía",
                         "timestamp": datetime.utcnow().isoformat(),
                     }
                 ),
                 400,
             )
 
+        if len(transfers) > MAX_BATCH_SIZE:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "error": f"El lote excede el máximo de {MAX_BATCH_SIZE} transferencias",
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                ),
+                400,
+            )
+
+        # Validar estructura de cada item; solo los válidos se verifican
+        results = [None] * len(transfers)
+        valid = []
+        valid_indexes = []
+
+        for index, item in enumerate(transfers):
+            transfer, error_msg = sinpe_movil_validator.validate(item)
+            if transfer is None:
+                results[index] = _batch_error(
+                    index,
+                    f"Payload inválido: {error_msg}",
+                    item.get("transaction_id") if isinstance(item, dict) else None,
+                )
+            else:
+                valid.append(transfer)
+                valid_indexes.append(index)
+
+        # Verificar HMAC de los válidos; solo los firmados se procesan
+        accepted = []
+        accepted_indexes = []
+        signatures = bank_secrets.verify_transfers(valid)
+        for index, transfer, signed in zip(valid_indexes, valid, signatures):
+            if not signed:
+                results[index] = _batch_error(
+                    index, "HMAC signature inválida", transfer.transaction_id
+                )
+                continue
+            accepted_indexes.append(index)
+            accepted.append(transfer)
+
+        # Acreditar los items válidos en una sola transacción (solo crédito,
+        # igual que la transferencia individual)
+        if accepted:
+            batch_results = SinpeService.process_incoming_transfer_batch(accepted)
+            for index, transfer, result in zip(
+                accepted_indexes, accepted, batch_results
+            ):
+                results[index] = {
+                    "index": index,
+                    "transaction_id": transfer.transaction_id,
+                    **result.to_dict(),
+                }
+
+        succeeded = sum(1 for result in results if result["success"])
+
+        return jsonify(
+            {
+                "success": succeeded == len(results),
+                "processed": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+
     except Exception as e:
         return (
             jsonify(
@@ -168,46 +263,40 @@ def receive_sinpe_movil_transfer():
         )
 
 
+def _batch_error(index: int, error: str, transaction_id) -> dict:
+    """Resultado fallido de un item del lote"""
+    return {
+        "index": index,
+        "success": False,
+        "error": error,
+        "transaction_id": transaction_id,
+    }
+
+
 # ============= ENDPOINTS PARA ENVIAR TRANSFERENCIAS =============
 
 
 @sinpe_bp.route("/api/send-external-transfer", methods=["POST"])
 def send_external_transfer():
-    """Enviar transferencia SINPE a banco externo"""
+    """
+    Encolar transferencia SINPE a banco externo
+
+    La transferencia se guarda en el outbox y se entrega en segundo plano;
+    responde 202 con el transaction_id para consultar el estado.
+    """
     try:
         data = request.get_json()
 
-        # Generar datos de transferencia
-        transaction_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat()
+        transfer = _outgoing_transfer(SINPE, data, "Transferencia SINPE")
 
-        # Crear payload con HMAC correcto
-        payload = {
-            "version": "1.0",
-            "timestamp": timestamp,
-            "transaction_id": transaction_id,
-            "sender": data["sender"],
-            "receiver": data["receiver"],
-            "amount": data["amount"],
-            "description": data.get("description", "Transferencia SINPE"),
-        }
-
-        # Generar HMAC con formato correcto
-        hmac_signature = generate_hmac_for_account_transfer(
-            data["sender"]["account_number"],
-            timestamp,
-            transaction_id,
-            data["amount"]["value"],
+        # Firmar con la clave y formato acordados con el banco destino
+        receiver_bank = transfer.receiver.get("bank_code") or bank_code_from_iban(
+            transfer.destination
         )
-        payload["hmac_md5"] = hmac_signature
-
-        # Enviar a banco externo
-        result = bank_connector.send_sinpe_transfer_to_bank(
-            data["receiver"]["account_number"], payload
+        return _queued_response(
+            transfer, bank_secrets.verifier_for(receiver_bank), data
         )
 
-        return jsonify(result)
-
     except Exception as e:
         return (
             jsonify(
@@ -223,40 +312,15 @@ def send_external_transfer():
 
 @sinpe_bp.route("/api/send-external-movil-transfer", methods=["POST"])
 def send_external_movil_transfer():
-    """Enviar transferencia SINPE móvil a banco externo"""
+    """Encolar transferencia SINPE móvil a banco externo (202 + transaction_id)"""
     try:
         data = request.get_json()
 
-        # Generar datos de transferencia
-        transaction_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat()
-
-        # Crear payload con HMAC correcto
-        payload = {
-            "version": "1.0",
-            "timestamp": timestamp,
-            "transaction_id": transaction_id,
-            "sender": data["sender"],
-            "receiver": data["receiver"],
-            "amount": data["amount"],
-            "description": data.get("description", "SINPE Móvil"),
-        }
-
-        # Generar HMAC móvil con formato correcto
-        hmac_signature = generate_hmac_for_phone_transfer(
-            data["sender"]["phone_number"],
-            timestamp,
-            transaction_id,
-            data["amount"]["value"],
-        )
-        payload["hmac_md5"] = hmac_signature
-
-        # Enviar a banco externo
-        result = bank_connector.send_sinpe_movil_transfer_to_bank(
-            data["receiver"]["phone_number"], payload
-        )
+        transfer = _outgoing_transfer(SINPE_MOVIL, data, "SINPE Móvil")
 
-        return jsonify(result)
+        # Firmar con la clave del banco destino si se conoce; si no, la común
+        verifier = bank_secrets.verifier_for(transfer.receiver.get("bank_code"))
+        return _queued_response(transfer, verifier, data)
 
     except Exception as e:
         return (
@@ -271,6 +335,69 @@ def send_external_movil_transfer():
         )
 
 
+def _outgoing_transfer(kind: str, data: dict, description: str) -> OutgoingTransfer:
+    """Construir la transferencia saliente (nuevo transaction_id y timestamp)"""
+    amount = parse_amount(data["amount"]["value"])
+    if amount is None:
+        raise ValueError("Amount value debe ser un número válido")
+
+    return OutgoingTransfer(
+        kind=kind,
+        transaction_id=str(uuid.uuid4()),
+        timestamp=datetime.utcnow().isoformat(),
+        amount=amount,
+        currency=data["amount"].get("currency", "CRC"),
+        sender=data["sender"],
+        receiver=data["receiver"],
+        description=data.get("description", description),
+    )
+
+
+def _queued_response(transfer: OutgoingTransfer, verifier, data: dict):
+    """Firmar, encolar en el outbox y responder 202 Accepted"""
+    hmac_signature = verifier.sign(
+        transfer.signer, transfer.timestamp, transfer.transaction_id, transfer.amount
+    )
+    payload = transfer.to_payload(hmac_signature)
+
+    # Guardar en el outbox; el despachador lo envía al banco externo
+    idempotency_key = request.headers.get("Idempotency-Key") or data.get(
+        "idempotency_key"
+    )
+    entry, created = outbox.enqueue(
+        transfer.kind, transfer.destination, payload, idempotency_key
+    )
+
+    response = jsonify(
+        {
+            "success": True,
+            "transaction_id": entry.transaction_id,
+            "status": entry.status,
+            "duplicate": not created,
+            "status_url": url_for(
+                "sinpe.get_external_transfer_status",
+                transaction_id=entry.transaction_id,
+            ),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    )
+    response.status_code = 202
+    response.headers["Location"] = response.json["status_url"]
+    return response
+
+
+@sinpe_bp.route("/api/external-transfers/<transaction_id>", methods=["GET"])
+def get_external_transfer_status(transaction_id):
+    """Consultar estado de entrega de una transferencia encolada"""
+    status = outbox.get_status(transaction_id)
+    if status is None:
+        return (
+            jsonify({"success": False, "error": "Transferencia no encontrada"}),
+            404,
+        )
+    return jsonify({"success": True, "data": status})
+
+
 # ============= ENDPOINTS DE UTILIDAD =============
 
 
@@ -4,34 +4,80 @@ Transaction Routes - API endpoints for transaction management
 
 from flask import Blueprint, request, jsonify
 from app.models import db, Transaction, Account
-from app.utils.hmac_generator import verify_hmac
+from app.services.account_balance_service import AccountBalanceService
+from app.services.posting_service import posting_engine, InsufficientFundsError
+from app.services.transaction_monitoring_service import transaction_monitor
+from app.utils.bank_secrets import bank_secrets
+from app.utils.json_provider import column_records
+from app.utils.pagination import (
+    after_cursor,
+    build_page,
+    newest_first,
+    parse_page_args,
+)
+from sqlalchemy import func
 from decimal import Decimal
 import uuid
 
 transaction_bp = Blueprint("transactions", __name__)
 
+# Keys of Transaction.to_dict(); the list query selects these columns
+TRANSACTION_KEYS = (
+    "id",
+    "transaction_id",
+    "from_account_id",
+    "to_account_id",
+    "amount",
+    "currency",
+    "status",
+    "description",
+    "sender_phone",
+    "receiver_phone",
+    "sender_info",
+    "receiver_info",
+    "external_bank_code",
+    "transaction_type",
+    "created_at",
+)
+TRANSACTION_COLUMNS = tuple(getattr(Transaction, key) for key in TRANSACTION_KEYS)
+
 
 @transaction_bp.route("/transactions", methods=["GET"])
 def get_transactions():
-    """Get all transactions"""
+    """Get all transactions, newest first, with keyset pagination"""
     try:
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
+        try:
+            limit, after, include_total = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Column tuples, no ORM objects; the JSON provider encodes the
+        # Decimal amounts and datetimes
+        query = db.select(*TRANSACTION_COLUMNS)
+        if after:
+            query = query.where(
+                after_cursor(Transaction.created_at, Transaction.id, after)
+            )
+        rows = db.session.execute(
+            query.order_by(*newest_first(Transaction.created_at, Transaction.id)).limit(
+                limit + 1
+            )
+        ).all()
+        transactions, next_cursor = build_page(rows, limit)
 
-        transactions = Transaction.query.order_by(
-            Transaction.created_at.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False)
+        pagination = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        if include_total:
+            pagination["total"] = db.session.query(func.count(Transaction.id)).scalar()
 
         return jsonify(
             {
                 "success": True,
-                "data": [transaction.to_dict() for transaction in transactions.items],
-                "pagination": {
-                    "page": page,
-                    "per_page": per_page,
-                    "total": transactions.total,
-                    "pages": transactions.pages,
-                },
+                "data": column_records(TRANSACTION_KEYS, transactions),
+                "pagination": pagination,
             }
         )
 
@@ -55,26 +101,42 @@ def get_transaction(transaction_id):
 
 @transaction_bp.route("/accounts/<account_number>/transactions", methods=["GET"])
 def get_account_transactions(account_number):
-    """Get transactions for specific account"""
+    """Get transactions for specific account, newest first, with keyset pagination"""
     try:
-        account = Account.query.filter_by(number=account_number).first_or_404()
-
-        # Get both sent and received transactions
-        sent_transactions = Transaction.query.filter_by(
-            from_account_id=account.id
-        ).all()
+        try:
+            limit, after, include_total = parse_page_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        received_transactions = Transaction.query.filter_by(
-            to_account_id=account.id
-        ).all()
+        account = Account.query.filter_by(number=account_number).first_or_404()
 
-        all_transactions = sent_transactions + received_transactions
-        all_transactions.sort(key=lambda x: x.created_at, reverse=True)
+        # Sent and received transactions in a single UNION query
+        rows = (
+            db.session.execute(
+                AccountBalanceService.account_transactions_statement(
+                    account.id, limit + 1, after
+                )
+            )
+            .scalars()
+            .all()
+        )
+        transactions, next_cursor = build_page(rows, limit)
+
+        pagination = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        if include_total:
+            pagination["total"] = AccountBalanceService.count_account_transactions(
+                account.id
+            )
 
         return jsonify(
             {
                 "success": True,
-                "data": [transaction.to_dict() for transaction in all_transactions],
+                "data": [transaction.to_dict() for transaction in transactions],
+                "pagination": pagination,
             }
         )
 
@@ -100,9 +162,13 @@ def create_transaction():
         if not from_account or not to_account:
             return jsonify({"error": "Invalid account ID"}), 400
 
-        # Check sufficient balance
         amount = Decimal(str(data["amount"]))
-        if from_account.balance < amount:
+
+        # Update balances atomically; the debit fails if funds are insufficient
+        try:
+            posting_engine.transfer(from_account.id, to_account.id, amount)
+        except InsufficientFundsError:
+            db.session.rollback()
             return jsonify({"error": "Insufficient funds"}), 400
 
         # Create transaction
@@ -118,14 +184,11 @@ def create_transaction():
 
         db.session.add(transaction)
 
-        # Update balances
-        from_account.balance -= amount
-        to_account.balance += amount
-
         # Mark transaction as completed
         transaction.status = "completed"
 
         db.session.commit()
+        transaction_monitor.record_transaction(transaction)
 
         return jsonify({"success": True, "data": transaction.to_dict()}), 201
 
@@ -169,7 +232,7 @@ def verify_transaction_hmac():
         if "payload" not in data or "hmac" not in data:
             return jsonify({"error": "Payload and HMAC are required"}), 400
 
-        is_valid = verify_hmac(data["payload"], data["hmac"])
+        is_valid = bank_secrets.verify(data["payload"], data["hmac"])
 
         return jsonify({"success": True, "valid": is_valid})
 
@@ -4,17 +4,24 @@ User Routes - API endpoints for user management
 
 from flask import Blueprint, request, jsonify
 from app.models import db, User
+from app.utils.json_provider import column_records
 from werkzeug.security import generate_password_hash
 
 user_bp = Blueprint("users", __name__)
 
+# Keys of User.to_dict(), in column order of the list query
+USER_KEYS = ("id", "name", "email", "phone", "created_at")
+
 
 @user_bp.route("/users", methods=["GET"])
 def get_users():
     """Get all users"""
     try:
-        users = User.query.all()
-        return jsonify({"success": True, "data": [user.to_dict() for user in users]})
+        # Column tuples, no ORM objects; the JSON provider encodes datetimes
+        rows = db.session.execute(
+            db.select(User.id, User.name, User.email, User.phone, User.created_at)
+        )
+        return jsonify({"success": True, "data": column_records(USER_KEYS, rows)})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -2,9 +2,15 @@
 Account Balance Service - Manages account balances and transaction history
 """
 
-from app.models import db, Account, Transaction
+from app.models import db, Account, LedgerSnapshot, Transaction
+from app.services.posting_service import posting_engine, InsufficientFundsError
+from app.services.transaction_monitoring_service import transaction_monitor
+from app.utils.pagination import CursorKey, after_cursor, newest_first
+from sqlalchemy import and_, func, or_, select, union, union_all
+from sqlalchemy.orm import aliased
+from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,35 +49,38 @@ class AccountBalanceService:
             Dict with success status and new balance
         """
         try:
+            amount = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+
             account = Account.query.filter_by(number=account_number).first()
             if not account:
                 return {"success": False, "error": "Cuenta no encontrada"}
 
-            # Check for sufficient funds on debits
-            if amount < 0 and account.balance + amount < 0:
+            # Conditional UPDATE: a debit only applies while the balance covers it
+            try:
+                balances = posting_engine.post([(account.id, amount)])
+            except InsufficientFundsError as e:
+                db.session.rollback()
                 return {
                     "success": False,
                     "error": "Fondos insuficientes",
-                    "current_balance": float(account.balance),
+                    "current_balance": float(e.available),
                     "requested_amount": float(amount),
                 }
 
-            # Update balance
-            previous_balance = account.balance
-            account.balance += amount
+            new_balance = balances[account.id]
+            previous_balance = new_balance - amount
 
-            # Commit the change
             db.session.commit()
 
             logger.info(
                 f"Balance updated for account {account_number}: "
-                f"{previous_balance} -> {account.balance} (change: {amount})"
+                f"{previous_balance} -> {new_balance} (change: {amount})"
             )
 
             return {
                 "success": True,
                 "previous_balance": float(previous_balance),
-                "new_balance": float(account.balance),
+                "new_balance": float(new_balance),
                 "change": float(amount),
             }
 
@@ -114,19 +123,18 @@ class AccountBalanceService:
             if not dest_acc:
                 return {"success": False, "error": "Cuenta destino no encontrada"}
 
-            # Check sufficient funds
-            if source_acc.balance < amount:
+            # Perform atomic transfer with row-level conditional updates
+            try:
+                balances = posting_engine.transfer(source_acc.id, dest_acc.id, amount)
+            except InsufficientFundsError as e:
+                db.session.rollback()
                 return {
                     "success": False,
                     "error": "Fondos insuficientes",
-                    "available": float(source_acc.balance),
+                    "available": float(e.available),
                     "requested": float(amount),
                 }
 
-            # Perform atomic transfer
-            source_acc.balance -= amount
-            dest_acc.balance += amount
-
             # Create transaction record if transaction_id provided
             if transaction_id:
                 transaction = Transaction(
@@ -141,6 +149,8 @@ class AccountBalanceService:
                 db.session.add(transaction)
 
             db.session.commit()
+            if transaction_id:
+                transaction_monitor.record_transaction(transaction)
 
             logger.info(
                 f"Transfer completed: {from_account} -> {to_account}, "
@@ -153,8 +163,8 @@ class AccountBalanceService:
                 "from_account": from_account,
                 "to_account": to_account,
                 "amount": float(amount),
-                "source_new_balance": float(source_acc.balance),
-                "dest_new_balance": float(dest_acc.balance),
+                "source_new_balance": float(balances[source_acc.id]),
+                "dest_new_balance": float(balances[dest_acc.id]),
             }
 
         except Exception as e:
@@ -167,7 +177,7 @@ class AccountBalanceService:
         account_number: str, limit: int = 50, transaction_type: str = None
     ) -> List[Dict]:
         """
-        Get transaction history for an account
+        Get the latest transactions of an account, newest first
 
         Args:
             account_number: Account number
@@ -182,23 +192,13 @@ class AccountBalanceService:
             if not account:
                 return []
 
-            # Get both sent and received transactions
-            query_sent = Transaction.query.filter_by(from_account_id=account.id)
-            query_received = Transaction.query.filter_by(to_account_id=account.id)
-
-            if transaction_type:
-                query_sent = query_sent.filter_by(transaction_type=transaction_type)
-                query_received = query_received.filter_by(
-                    transaction_type=transaction_type
+            transactions = db.session.execute(
+                AccountBalanceService.account_transactions_statement(
+                    account.id, limit, transaction_type=transaction_type
                 )
+            ).scalars()
 
-            sent_transactions = query_sent.limit(limit // 2).all()
-            received_transactions = query_received.limit(limit // 2).all()
-
-            all_transactions = sent_transactions + received_transactions
-            all_transactions.sort(key=lambda x: x.created_at, reverse=True)
-
-            return [tx.to_dict() for tx in all_transactions[:limit]]
+            return [tx.to_dict() for tx in transactions]
 
         except Exception as e:
             logger.error(
@@ -206,11 +206,222 @@ class AccountBalanceService:
             )
             return []
 
+    @staticmethod
+    def iter_transaction_history(
+        account_number: str, transaction_type: str = None, batch_size: int = 500
+    ) -> Iterator[Dict]:
+        """
+        Stream the full transaction history of an account, newest first
+
+        Rows are fetched in keyset batches, so exports of large histories use
+        constant memory and every batch costs the same as the first.
+
+        Args:
+            account_number: Account number
+            transaction_type: Filter by transaction type
+            batch_size: Rows fetched per query
+
+        Yields:
+            Transaction dictionaries
+        """
+        account = Account.query.filter_by(number=account_number).first()
+        if not account:
+            return
+
+        after = None
+        while True:
+            batch = (
+                db.session.execute(
+                    AccountBalanceService.account_transactions_statement(
+                        account.id, batch_size, after, transaction_type
+                    )
+                )
+                .scalars()
+                .all()
+            )
+
+            for tx in batch:
+                yield tx.to_dict()
+
+            if len(batch) < batch_size:
+                return
+
+            after = (batch[-1].created_at, batch[-1].id)
+
+    @staticmethod
+    def account_transactions_statement(
+        account_id: int,
+        limit: int,
+        after: CursorKey = None,
+        transaction_type: str = None,
+    ):
+        """
+        Newest-first sent and received transactions of an account as one query
+
+        Sent and received rows are each range-seeked through their
+        (account, created_at) index and limited before the UNION, so the cost
+        depends on the page size rather than on the account's history.
+
+        Args:
+            account_id: Account primary key
+            limit: Maximum rows to return
+            after: Optional keyset cursor (created_at, id) to continue from
+            transaction_type: Filter by transaction type
+
+        Returns:
+            Select statement yielding Transaction entities
+        """
+
+        def branch(account_column):
+            stmt = select(Transaction.__table__).where(account_column == account_id)
+            if transaction_type:
+                stmt = stmt.where(Transaction.transaction_type == transaction_type)
+            if after:
+                stmt = stmt.where(
+                    after_cursor(Transaction.created_at, Transaction.id, after)
+                )
+            stmt = stmt.order_by(
+                *newest_first(Transaction.created_at, Transaction.id)
+            ).limit(limit)
+            return select(stmt.subquery())
+
+        # UNION (not UNION ALL) keeps a self-transfer only once
+        combined = union(
+            branch(Transaction.from_account_id), branch(Transaction.to_account_id)
+        ).subquery()
+        tx = aliased(Transaction, combined)
+
+        return select(tx).order_by(*newest_first(tx.created_at, tx.id)).limit(limit)
+
+    @staticmethod
+    def count_account_transactions(account_id: int) -> int:
+        """Count sent and received transactions of an account"""
+        return (
+            db.session.query(func.count(Transaction.id))
+            .filter(
+                or_(
+                    Transaction.from_account_id == account_id,
+                    Transaction.to_account_id == account_id,
+                )
+            )
+            .scalar()
+        )
+
+    @staticmethod
+    def _ledger_flows(account_id: int = None):
+        """
+        Completed transactions as signed per-account movements
+
+        Each transaction contributes a debit row for its sender account (if
+        local) and a credit row for its receiver account. Both branches only
+        read transactions after the oldest checkpoint involved (the account's
+        own for a single account), so checkpointed history is never scanned;
+        for a single account the branches are also restricted to that account
+        so the (from/to account) indexes serve them.
+        """
+        sent = select(
+            Transaction.from_account_id.label("account_id"),
+            (-Transaction.amount).label("amount"),
+            Transaction.id.label("transaction_id"),
+        ).where(
+            Transaction.status == "completed",
+            Transaction.from_account_id.isnot(None),
+        )
+        received = select(
+            Transaction.to_account_id.label("account_id"),
+            Transaction.amount.label("amount"),
+            Transaction.id.label("transaction_id"),
+        ).where(Transaction.status == "completed")
+
+        # Accounts without a snapshot replay from the start (checkpoint 0)
+        checkpoints = (
+            select(func.min(func.coalesce(LedgerSnapshot.last_transaction_id, 0)))
+            .select_from(Account)
+            .outerjoin(LedgerSnapshot, LedgerSnapshot.account_id == Account.id)
+        )
+        if account_id is not None:
+            checkpoints = checkpoints.where(Account.id == account_id)
+            sent = sent.where(Transaction.from_account_id == account_id)
+            received = received.where(Transaction.to_account_id == account_id)
+
+        checkpoint_id = checkpoints.scalar_subquery()
+        sent = sent.where(Transaction.id > checkpoint_id)
+        received = received.where(Transaction.id > checkpoint_id)
+
+        return union_all(sent, received).subquery("flows")
+
+    @staticmethod
+    def _ledger_summary(account_id: int = None):
+        """
+        Grouped aggregate of movements after each account's checkpoint
+
+        Returns:
+            Select yielding account id, number, stored balance, checkpoint
+            balance/count/last id, replayed net amount, replayed count and the
+            highest replayed transaction id
+        """
+        flows = AccountBalanceService._ledger_flows(account_id)
+        checkpoint_id = func.coalesce(LedgerSnapshot.last_transaction_id, 0)
+
+        stmt = (
+            select(
+                Account.id,
+                Account.number,
+                Account.balance,
+                func.coalesce(LedgerSnapshot.balance, 0).label("checkpoint_balance"),
+                func.coalesce(LedgerSnapshot.transaction_count, 0).label(
+                    "checkpoint_count"
+                ),
+                checkpoint_id.label("checkpoint_id"),
+                func.round(func.coalesce(func.sum(flows.c.amount), 0), 2).label(
+                    "replayed_amount"
+                ),
+                func.count(flows.c.transaction_id).label("replayed_count"),
+                func.max(flows.c.transaction_id).label("last_replayed_id"),
+            )
+            .select_from(Account)
+            .outerjoin(LedgerSnapshot, LedgerSnapshot.account_id == Account.id)
+            .outerjoin(
+                flows,
+                and_(
+                    flows.c.account_id == Account.id,
+                    flows.c.transaction_id > checkpoint_id,
+                ),
+            )
+            .group_by(Account.id)
+            .order_by(Account.id)
+        )
+        if account_id is not None:
+            stmt = stmt.where(Account.id == account_id)
+        return stmt
+
+    @staticmethod
+    def _integrity_result(row) -> Dict:
+        stored_balance = Decimal(str(row.balance or 0))
+        calculated_balance = (
+            Decimal(str(row.checkpoint_balance)) + Decimal(str(row.replayed_amount))
+        ).quantize(Decimal("0.01"))
+        difference = stored_balance - calculated_balance
+
+        return {
+            "account_number": row.number,
+            "valid": abs(difference) < Decimal("0.01"),
+            "stored_balance": float(stored_balance),
+            "calculated_balance": float(calculated_balance),
+            "difference": float(difference),
+            "total_transactions": row.checkpoint_count + row.replayed_count,
+            "checkpoint_transaction_id": row.checkpoint_id,
+            "replayed_transactions": row.replayed_count,
+        }
+
     @staticmethod
     def validate_account_integrity(account_number: str) -> Dict:
         """
         Validate account balance against transaction history
 
+        Starts from the account's ledger snapshot and replays only the
+        completed transactions recorded after its checkpoint.
+
         Args:
             account_number: Account to validate
 
@@ -222,39 +433,90 @@ class AccountBalanceService:
             if not account:
                 return {"valid": False, "error": "Cuenta no encontrada"}
 
-            # Calculate balance from transactions
-            sent_transactions = Transaction.query.filter_by(
-                from_account_id=account.id, status="completed"
-            ).all()
+            row = db.session.execute(
+                AccountBalanceService._ledger_summary(account.id)
+            ).one()
+            result = AccountBalanceService._integrity_result(row)
+            del result["account_number"]
+            return result
 
-            received_transactions = Transaction.query.filter_by(
-                to_account_id=account.id, status="completed"
-            ).all()
+        except Exception as e:
+            logger.error(f"Error validating account {account_number}: {str(e)}")
+            return {"valid": False, "error": f"Error en validación: {str(e)}"}
 
-            calculated_balance = Decimal("0.00")
+    @staticmethod
+    def validate_all_accounts() -> Dict:
+        """
+        Validate every account with one grouped aggregate query
 
-            # Subtract sent amounts
-            for tx in sent_transactions:
-                calculated_balance -= tx.amount
+        Returns:
+            Dict with per-account results and a summary
+        """
+        try:
+            rows = db.session.execute(AccountBalanceService._ledger_summary()).all()
+            results = [AccountBalanceService._integrity_result(row) for row in rows]
+            invalid = [r["account_number"] for r in results if not r["valid"]]
+
+            return {
+                "accounts_checked": len(results),
+                "valid_accounts": len(results) - len(invalid),
+                "invalid_accounts": invalid,
+                "results": results,
+            }
+
+        except Exception as e:
+            logger.error(f"Error validating accounts: {str(e)}")
+            return {"error": f"Error en validación: {str(e)}"}
+
+    @staticmethod
+    def checkpoint_ledger() -> Dict:
+        """
+        Roll every account's ledger snapshot forward to its latest transaction
 
-            # Add received amounts
-            for tx in received_transactions:
-                calculated_balance += tx.amount
+        Only transactions after the previous checkpoint are aggregated. Meant
+        to run periodically (e.g. nightly) so integrity checks stay O(recent).
 
-            # Compare with stored balance
-            balance_matches = abs(account.balance - calculated_balance) < Decimal(
-                "0.01"
+        Returns:
+            Dict with the number of snapshots advanced
+        """
+        try:
+            rows = db.session.execute(AccountBalanceService._ledger_summary()).all()
+            snapshots = {s.account_id: s for s in LedgerSnapshot.query.all()}
+            advanced = 0
+
+            # Every transaction up to this id has been aggregated for every
+            # account, so all snapshots (idle accounts too) move up to it and
+            # the next run starts reading after it
+            high_water = max(
+                (row.last_replayed_id or row.checkpoint_id for row in rows), default=0
             )
 
-            return {
-                "valid": balance_matches,
-                "stored_balance": float(account.balance),
-                "calculated_balance": float(calculated_balance),
-                "difference": float(account.balance - calculated_balance),
-                "total_transactions": len(sent_transactions)
-                + len(received_transactions),
-            }
+            for row in rows:
+                if not row.replayed_count and row.id in snapshots:
+                    snapshot = snapshots[row.id]
+                    if snapshot.last_transaction_id < high_water:
+                        snapshot.last_transaction_id = high_water
+                    continue
+
+                snapshot = snapshots.get(row.id)
+                if snapshot is None:
+                    snapshot = LedgerSnapshot(account_id=row.id)
+                    db.session.add(snapshot)
+
+                snapshot.balance = (
+                    Decimal(str(row.checkpoint_balance))
+                    + Decimal(str(row.replayed_amount))
+                ).quantize(Decimal("0.01"))
+                snapshot.transaction_count = row.checkpoint_count + row.replayed_count
+                snapshot.last_transaction_id = max(high_water, row.checkpoint_id)
+                snapshot.updated_at = datetime.utcnow()
+                advanced += 1
+
+            db.session.commit()
+            logger.info(f"Ledger checkpoint advanced for {advanced} accounts")
+            return {"success": True, "accounts_checkpointed": advanced}
 
         except Exception as e:
-            logger.error(f"Error validating account {account_number}: {str(e)}")
-            return {"valid": False, "error": f"Error en validación: {str(e)}"}
+            db.session.rollback()
+            logger.error(f"Error checkpointing ledger: {str(e)}")
+            return {"success": False, "error": f"Error en checkpoint: {str(e)}"}
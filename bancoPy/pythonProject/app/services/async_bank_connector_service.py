@@ -0,0 +1,445 @@
+"""
+Async Bank Connector Service - asyncio variant of BankConnectorService
+Peer calls are coroutines over one shared connection pool, so health sweeps
+and phone-ownership fan-out can run hundreds of concurrent requests from a
+single thread. BlockingBankConnector keeps a synchronous facade for Flask
+handlers and background threads
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+import requests
+
+from app.services.bank_connector_service import (
+    Backoff,
+    BankConnectorService,
+    PeerCall,
+    PeerProtocol,
+    StartProbes,
+    WaitFirst,
+)
+from app.services.peer_session_service import (
+    DEFAULT_HEADERS,
+    PeerSessionPool,
+    peer_sessions,
+)
+from app.utils.bank_routing import BankRoute
+
+logger = logging.getLogger(__name__)
+
+# Optional asyncio HTTP client
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+class AsyncPeerClient:
+    """Shared asyncio HTTP connection pool for peer banks"""
+
+    def __init__(
+        self,
+        sessions: PeerSessionPool = None,
+        verify=True,
+        max_connections: int = 200,
+        max_keepalive: int = 50,
+    ):
+        """
+        Args:
+            sessions: Pool whose per-peer latency metrics are updated (and
+                which carries the requests when httpx is not installed)
+            verify: SSL verification (bool or CA bundle path)
+            max_connections: Concurrent peer requests across all banks
+            max_keepalive: Idle keep-alive connections kept open
+        """
+        self.sessions = sessions or peer_sessions
+        self.verify = verify
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+
+    async def _bind(self):
+        # Pools and semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        stale, stale_loop = self._client, self._loop
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_connections)
+        if HTTPX_AVAILABLE:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                verify=self.verify,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+            )
+        if stale is not None:
+            await self._close_stale(stale, stale_loop)
+
+    @staticmethod
+    async def _close_stale(client, loop):
+        """Close the client a previous event loop left behind"""
+        try:
+            if loop is not None and loop.is_running():
+                # Its connections still live on that loop's thread
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                )
+            else:
+                await client.aclose()
+        except Exception as e:
+            # Transports of a closed loop cannot be shut down cleanly
+            logger.debug(f"Closing stale peer client failed: {e}")
+
+    async def request(
+        self, method: str, base_url: str, path: str, timeout: float = None, **kwargs
+    ):
+        """
+        Send a request to a peer
+
+        Args:
+            method: HTTP method
+            base_url: Peer base URL
+            path: Request path
+            timeout: Seconds before the call is abandoned
+            **kwargs: Request body options (json)
+
+        Returns:
+            Response with status_code, json() and text
+
+        Raises:
+            requests.exceptions.Timeout: The peer did not answer in time
+            requests.exceptions.ConnectionError: The peer could not be reached
+        """
+        await self._bind()
+        async with self._semaphore:
+            if self._client is None:
+                # No asyncio HTTP client installed: run the pooled blocking
+                # session in a worker thread
+                return await asyncio.to_thread(
+                    self.sessions.request,
+                    method,
+                    base_url,
+                    path,
+                    timeout=timeout,
+                    verify=self.verify,
+                    **kwargs,
+                )
+
+            start = time.perf_counter()
+            try:
+                response = await self._client.request(
+                    method, f"{base_url}{path}", timeout=timeout, **kwargs
+                )
+            except httpx.TimeoutException as e:
+                self.sessions.observe(base_url, time.perf_counter() - start, True)
+                raise requests.exceptions.Timeout(str(e))
+            except httpx.TransportError as e:
+                self.sessions.observe(base_url, time.perf_counter() - start, True)
+                raise requests.exceptions.ConnectionError(str(e))
+
+            self.sessions.observe(
+                base_url, time.perf_counter() - start, response.status_code >= 500
+            )
+            return response
+
+    async def post(self, base_url: str, path: str, **kwargs):
+        return await self.request("POST", base_url, path, **kwargs)
+
+    async def get(self, base_url: str, path: str, **kwargs):
+        return await self.request("GET", base_url, path, **kwargs)
+
+    async def aclose(self):
+        """Close the pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._loop = None
+
+
+class AsyncBankConnectorService(BankConnectorService):
+    """BankConnectorService whose network methods are coroutines
+
+    Lookup helpers (get_bank_ip, validate_iban_structure, ...) are inherited
+    unchanged; routing, circuit breakers and adaptive timeouts are shared
+    with the blocking connector.
+    """
+
+    def __init__(
+        self,
+        sessions: PeerSessionPool = None,
+        routing=None,
+        breakers=None,
+        client: AsyncPeerClient = None,
+    ):
+        super().__init__(sessions=sessions, routing=routing, breakers=breakers)
+        self.client = client or AsyncPeerClient(
+            sessions=self.sessions, verify=self.ssl_verify
+        )
+
+    async def send_sinpe_transfer_to_bank(
+        self, target_iban: str, transfer_data: Dict
+    ) -> Dict:
+        """
+        Send SINPE transfer to another bank
+
+        Args:
+            target_iban: Destination IBAN
+            transfer_data: Transfer payload
+
+        Returns:
+            Response from target bank
+        """
+        return await self._run(self._transfer_protocol(target_iban, transfer_data))
+
+    async def send_sinpe_movil_transfer_to_bank(
+        self, target_phone: str, transfer_data: Dict
+    ) -> Dict:
+        """
+        Send SINPE Móvil transfer to the bank that owns the phone number
+
+        Args:
+            target_phone: Destination phone number
+            transfer_data: Transfer payload
+
+        Returns:
+            Response from target bank
+        """
+        return await self._run(self._movil_protocol(target_phone, transfer_data))
+
+    async def find_bank_for_phone(self, phone: str) -> Optional[BankRoute]:
+        """
+        Find the peer bank that owns a phone number
+
+        All peers are probed concurrently; the first confirmation wins and
+        the remaining probes are cancelled.
+
+        Args:
+            phone: Phone number
+
+        Returns:
+            Route of the owning bank or None if no peer confirmed in time
+        """
+        return await self._run(self._phone_search(phone))
+
+    async def _run(self, protocol: PeerProtocol):
+        """
+        Carry out a peer protocol over the shared asyncio client
+
+        Args:
+            protocol: Generator yielding PeerCall, Backoff, StartProbes and
+                WaitFirst steps
+
+        Returns:
+            The protocol's return value
+        """
+        outcome = None
+        try:
+            while True:
+                step = protocol.send(outcome)
+                if isinstance(step, PeerCall):
+                    try:
+                        outcome = await self.client.request(
+                            step.method,
+                            step.base_url,
+                            step.path,
+                            json=step.json,
+                            timeout=step.timeout,
+                        )
+                    except requests.exceptions.RequestException as e:
+                        outcome = e
+                elif isinstance(step, Backoff):
+                    await asyncio.sleep(step.seconds)
+                    outcome = None
+                elif isinstance(step, StartProbes):
+                    outcome = {
+                        asyncio.ensure_future(
+                            self._run(self._ownership_probe(route, step.phone))
+                        ): route
+                        for route in step.routes
+                    }
+                elif isinstance(step, WaitFirst):
+                    outcome, _ = await asyncio.wait(
+                        step.pending,
+                        timeout=step.timeout,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+        except StopIteration as finished:
+            return finished.value
+        finally:
+            protocol.close()
+
+    async def check_health(
+        self, enabled_only: bool = True, protocol: str = None, timeout: float = 5.0
+    ) -> Dict[str, Dict]:
+        """
+        Probe the health endpoint of every peer concurrently
+
+        Each result also feeds the peer's circuit breaker.
+
+        Args:
+            enabled_only: Skip banks disabled in contactos-bancos.json
+            protocol: http or https (defaults to the connector's protocol)
+            timeout: Per-peer timeout in seconds
+
+        Returns:
+            Dict of bank code -> {bank, healthy, status_code, latency_ms, error}
+        """
+        routes = self.routing.routes(enabled_only=enabled_only)
+        results = await asyncio.gather(
+            *(self._check_route_health(route, protocol, timeout) for route in routes)
+        )
+        return {route.bank_code: result for route, result in zip(routes, results)}
+
+    async def _check_route_health(
+        self, route: BankRoute, protocol: Optional[str], timeout: float
+    ) -> Dict:
+        base_url = route.base_url(protocol) if protocol else self._base_url(route)
+        result = {"bank": route.name, "healthy": False, "status_code": None}
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.get(
+                base_url, route.health_path, timeout=timeout
+            )
+            result["status_code"] = response.status_code
+            result["healthy"] = response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            result["error"] = type(e).__name__
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        self.breakers.record_health_check(route.bank_code, result["healthy"])
+        return result
+
+
+class AsyncLoopRunner:
+    """Event loop on a daemon thread for calling coroutines from sync code"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="interbank-asyncio",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    def run(self, coro, timeout: float = None):
+        """
+        Run a coroutine on the loop thread and wait for its result
+
+        The coroutine runs in a copy of the caller's context, so a Flask
+        application context pushed by the caller stays visible.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            The coroutine's result
+        """
+        loop = self._ensure_loop()
+        context = contextvars.copy_context()
+        result = Future()
+
+        def start():
+            task = loop.create_task(coro, context=context)
+
+            def done(task):
+                if task.cancelled():
+                    result.cancel()
+                elif task.exception() is not None:
+                    result.set_exception(task.exception())
+                else:
+                    result.set_result(task.result())
+
+            task.add_done_callback(done)
+
+        loop.call_soon_threadsafe(start)
+        return result.result(timeout)
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+
+class BlockingBankConnector:
+    """Blocking facade over AsyncBankConnectorService
+
+    Drop-in for BankConnectorService in Flask handlers: each call blocks
+    the caller while the coroutine runs on a shared event loop thread.
+    """
+
+    def __init__(
+        self,
+        connector: AsyncBankConnectorService = None,
+        runner: AsyncLoopRunner = None,
+    ):
+        self.connector = connector or AsyncBankConnectorService()
+        self.runner = runner or AsyncLoopRunner()
+
+    def send_sinpe_transfer_to_bank(
+        self, target_iban: str, transfer_data: Dict
+    ) -> Dict:
+        return self.runner.run(
+            self.connector.send_sinpe_transfer_to_bank(target_iban, transfer_data)
+        )
+
+    def send_sinpe_movil_transfer_to_bank(
+        self, target_phone: str, transfer_data: Dict
+    ) -> Dict:
+        return self.runner.run(
+            self.connector.send_sinpe_movil_transfer_to_bank(
+                target_phone, transfer_data
+            )
+        )
+
+    def find_bank_for_phone(self, phone: str) -> Optional[BankRoute]:
+        return self.runner.run(self.connector.find_bank_for_phone(phone))
+
+    def check_health(self, **kwargs) -> Dict[str, Dict]:
+        return self.runner.run(self.connector.check_health(**kwargs))
+
+    def __getattr__(self, name):
+        # Lookup helpers (get_bank_ip, get_all_bank_contacts, ...)
+        return getattr(self.connector, name)
+
+
+def create_bank_connector(mode: str = None):
+    """
+    Build the inter-bank connector for the configured client mode
+
+    Args:
+        mode: "sync" (requests) or "async" (asyncio facade); defaults to the
+            INTERBANK_CLIENT_MODE environment variable, then "sync"
+
+    Returns:
+        BankConnectorService or BlockingBankConnector
+    """
+    mode = (mode or os.environ.get("INTERBANK_CLIENT_MODE", "sync")).lower()
+    if mode == "async":
+        if not HTTPX_AVAILABLE:
+            logger.info("httpx not installed; async connector uses worker threads")
+        return BlockingBankConnector()
+    return BankConnectorService()
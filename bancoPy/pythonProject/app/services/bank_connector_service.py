@@ -4,40 +4,100 @@ Bank Connector Service - Manages connections between banks using IP addresses
 
 import json
 import os
+import time
 import requests
-from typing import Dict, Optional, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Generator, NamedTuple, Optional, List
 import logging
+from app.services.circuit_breaker_service import (
+    PeerCircuitBreakers,
+    backoff_delay,
+    peer_breakers,
+)
+from app.services.peer_session_service import PeerSessionPool, peer_sessions
+from app.services.phone_routing_service import UNROUTABLE, phone_routing
+from app.utils.bank_routing import (
+    BankRoute,
+    BankRoutingRegistry,
+    bank_code_from_iban,
+    bank_routing,
+)
 from app.utils.ssl_config import ssl_config
 
+# Shared worker pool for concurrent peer probes
+_fanout_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="sinpe-fanout")
+
+
+# Steps a peer protocol yields to its connector's transport. Protocols hold
+# the routing, retry and ownership rules; the blocking and asyncio connectors
+# only carry the steps out (see BankConnectorService._run).
+
+
+class PeerCall(NamedTuple):
+    """HTTP call to a peer; resumed with the response or the RequestException"""
+
+    method: str
+    base_url: str
+    path: str
+    timeout: float
+    json: Optional[Dict] = None
+
+
+class Backoff(NamedTuple):
+    """Pause before retrying; resumed with None"""
+
+    seconds: float
+
+
+class StartProbes(NamedTuple):
+    """
+    Run _ownership_probe on every route concurrently
+
+    Resumed with {handle: route}; handles offer result() and cancel()
+    """
+
+    routes: List[BankRoute]
+    phone: str
+
+
+class WaitFirst(NamedTuple):
+    """Wait for the first finished probes; resumed with the set of done handles"""
+
+    pending: Dict
+    timeout: float
+
+
+PeerProtocol = Generator[object, object, object]
+
 
 class BankConnectorService:
-    def __init__(self):
-        self.contactos_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "contactos-bancos.json",
-        )
+    def __init__(
+        self,
+        sessions: PeerSessionPool = None,
+        routing: BankRoutingRegistry = None,
+        breakers: PeerCircuitBreakers = None,
+    ):
         self.iban_structure_file = os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
             "IBAN-estructure.json",
         )
-        self.contacts = self._load_bank_contacts()
+        # Precomputed bank code -> endpoint table (reloaded on file change)
+        self.routing = routing or bank_routing
         self.iban_structure = self._load_iban_structure()
 
         # SSL Configuration for inter-bank communication
         self.ssl_verify = ssl_config.get_requests_ssl_config()
         self.use_https = True  # Force HTTPS for inter-bank communications
 
-    def _load_bank_contacts(self) -> List[Dict]:
-        """Load bank contacts from JSON file"""
-        try:
-            with open(self.contactos_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logging.error(f"File not found: {self.contactos_file}")
-            return []
-        except json.JSONDecodeError:
-            logging.error(f"Invalid JSON in: {self.contactos_file}")
-            return []
+        # Keep-alive connection pools per peer bank (shared by default)
+        self.sessions = sessions or peer_sessions
+
+        # Per-peer circuit breakers and adaptive timeouts (shared by default)
+        self.breakers = breakers or peer_breakers
+
+        # Parallel phone ownership probing (seconds)
+        self.probe_timeout = 3.0
+        self.fanout_deadline = 5.0
 
     def _load_iban_structure(self) -> Dict:
         """Load IBAN structure from JSON file"""
@@ -61,19 +121,9 @@ class BankConnectorService:
         Returns:
             Bank code (4 digits) or None if invalid
         """
-        if not iban or len(iban) < 8:
-            return None
-
         # IBAN format: CR21-0XXX-0001-XX-XXXX-XXXX-XX
         # Bank code is positions 4-7 (0-indexed)
-        try:
-            # Remove dashes and get bank code
-            clean_iban = iban.replace("-", "")
-            if len(clean_iban) >= 8:
-                return clean_iban[4:8]  # Extract bank code
-        except Exception:
-            return None
-        return None
+        return bank_code_from_iban(iban)
 
     def get_bank_ip(self, bank_code: str) -> Optional[str]:
         """
@@ -85,13 +135,8 @@ class BankConnectorService:
         Returns:
             IP address with port or None if not found
         """
-        for contact in self.contacts:
-            contact_iban = contact.get("IBAN", "")
-            contact_bank_code = self.get_bank_from_iban(contact_iban)
-
-            if contact_bank_code == bank_code and contact.get("IP"):
-                return contact["IP"]
-        return None
+        route = self.routing.get(bank_code)
+        return route.address if route else None
 
     def get_bank_ip_by_iban(self, iban: str) -> Optional[str]:
         """
@@ -121,9 +166,106 @@ class BankConnectorService:
         Returns:
             Response from target bank
         """
-        bank_ip = self.get_bank_ip_by_iban(target_iban)
+        return self._run(self._transfer_protocol(target_iban, transfer_data))
+
+    def send_sinpe_movil_transfer_to_bank(
+        self, target_phone: str, transfer_data: Dict
+    ) -> Dict:
+        """
+        Send SINPE Móvil transfer to the bank that owns the phone number
+
+        The owning bank comes from the phone routing directory; when unknown,
+        ownership is probed on every peer in parallel. The transfer itself is
+        sent only to that one bank, so it can never be credited twice.
+
+        Args:
+            target_phone: Destination phone number
+            transfer_data: Transfer payload
+
+        Returns:
+            Response from target bank
+        """
+        return self._run(self._movil_protocol(target_phone, transfer_data))
+
+    def get_route_by_bank_code(self, bank_code: str) -> Optional[BankRoute]:
+        """
+        Get the endpoint of a bank by its code
+
+        Args:
+            bank_code: Bank code (3 or 4 digits)
+
+        Returns:
+            Bank route or None if not found
+        """
+        return self.routing.get(bank_code)
+
+    def find_bank_for_phone(self, phone: str) -> Optional[BankRoute]:
+        """
+        Find the peer bank that owns a phone number
+
+        Probes all peers concurrently and returns the first that confirms
+        ownership. Pending probes are cancelled once an answer is found, and
+        the whole search is bounded by fanout_deadline.
+
+        Args:
+            phone: Phone number
+
+        Returns:
+            Route of the owning bank or None if no peer confirmed in time
+        """
+        return self._run(self._phone_search(phone))
+
+    def _run(self, protocol: PeerProtocol):
+        """
+        Carry out a peer protocol over the pooled blocking sessions
+
+        Args:
+            protocol: Generator yielding PeerCall, Backoff, StartProbes and
+                WaitFirst steps
 
-        if not bank_ip:
+        Returns:
+            The protocol's return value
+        """
+        outcome = None
+        try:
+            while True:
+                step = protocol.send(outcome)
+                if isinstance(step, PeerCall):
+                    try:
+                        outcome = self.sessions.request(
+                            step.method,
+                            step.base_url,
+                            step.path,
+                            json=step.json,
+                            timeout=step.timeout,
+                            verify=self.ssl_verify,  # SSL certificate verification
+                        )
+                    except requests.exceptions.RequestException as e:
+                        outcome = e
+                elif isinstance(step, Backoff):
+                    time.sleep(step.seconds)
+                    outcome = None
+                elif isinstance(step, StartProbes):
+                    outcome = {
+                        _fanout_executor.submit(
+                            self._run, self._ownership_probe(route, step.phone)
+                        ): route
+                        for route in step.routes
+                    }
+                elif isinstance(step, WaitFirst):
+                    outcome, _ = wait(
+                        step.pending, timeout=step.timeout, return_when=FIRST_COMPLETED
+                    )
+        except StopIteration as finished:
+            return finished.value
+        finally:
+            protocol.close()
+
+    def _transfer_protocol(self, target_iban: str, transfer_data: Dict) -> PeerProtocol:
+        """Send a SINPE transfer, retrying transient failures"""
+        route = self.routing.get(self.get_bank_from_iban(target_iban))
+
+        if not route:
             return {
                 "success": False,
                 "error": "No se encontró IP del banco destino",
@@ -133,109 +275,214 @@ class BankConnectorService:
             if field not in transfer_data:
                 return {"success": False, "error": f"Campo requerido faltante: {field}"}
 
-        try:
-            # Construct full URL with HTTPS for secure inter-bank communication
-            protocol = "https" if self.use_https else "http"
-            url = f"{protocol}://{bank_ip}/api/sinpe-transfer"
+        if not self.breakers.allow_request(route.bank_code):
+            return self._circuit_open_error(route)
 
-            # Add retry logic for inter-bank communication
+        # Construct base URL with HTTPS for secure inter-bank communication
+        base_url = self._base_url(route)
+
+        try:
+            # Retry transient failures with jittered backoff; the circuit
+            # breaker stops retrying as soon as the peer is considered down
             max_retries = 3
+            result = None
             for attempt in range(max_retries):
-                try:
-                    # Send POST request to target bank with SSL verification
-                    response = requests.post(
-                        url,
-                        json=transfer_data,
-                        timeout=30,
-                        headers={
-                            "Content-Type": "application/json",
-                            "User-Agent": "SINPE-Banking-System/1.0",
-                        },
-                        verify=self.ssl_verify,  # SSL certificate verification
-                    )
-
-                    if response.status_code == 200:
-                        return {"success": True, "data": response.json()}
-                    elif response.status_code in [500, 502, 503, 504]:
-                        # Server errors - retry
-                        if attempt < max_retries - 1:
-                            continue
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"Error del banco destino: {response.status_code}",
-                            "details": response.text,
-                        }
-                except requests.exceptions.Timeout:
-                    if attempt < max_retries - 1:
-                        continue
-                    return {
-                        "success": False,
-                        "error": "Timeout al conectar con banco destino",
-                    }
-                except requests.exceptions.ConnectionError:
-                    if attempt < max_retries - 1:
-                        continue
-                    return {
-                        "success": False,
-                        "error": "No se pudo conectar con banco destino",
-                    }
+                if attempt:
+                    yield Backoff(backoff_delay(attempt - 1))
+                    if not self.breakers.allow_request(route.bank_code):
+                        return self._circuit_open_error(route)
+
+                # POST over the peer's pooled keep-alive connection
+                response = yield PeerCall(
+                    "POST",
+                    base_url,
+                    route.sinpe_path,
+                    self.request_timeout(base_url),
+                    json=transfer_data,
+                )
+                if isinstance(response, requests.exceptions.RequestException):
+                    result = self._request_error(route, response)
+                    continue
 
-            return {"success": False, "error": "Máximo número de reintentos alcanzado"}
+                result = self._transfer_result(route, response)
+                if not result.get("retryable"):
+                    return result
+            return result
 
         except Exception as e:
             return {"success": False, "error": f"Error inesperado: {str(e)}"}
 
-    def send_sinpe_movil_transfer_to_bank(
-        self, target_phone: str, transfer_data: Dict
-    ) -> Dict:
+    def _movil_protocol(self, target_phone: str, transfer_data: Dict) -> PeerProtocol:
+        """Send a SINPE Móvil transfer to the phone's owning bank"""
+        # Route straight to the known owner; probe peers only when unknown
+        route = self._known_phone_route(target_phone)
+        if route is None:
+            route = yield from self._phone_search(target_phone)
+            if route is None:
+                phone_routing.mark_unroutable(target_phone)
+        if not isinstance(route, BankRoute):
+            return self._phone_unroutable_error()
+
+        if not self.breakers.allow_request(route.bank_code):
+            return self._circuit_open_error(route)
+
+        base_url = self._base_url(route)
+        response = yield PeerCall(
+            "POST",
+            base_url,
+            route.movil_path,
+            # The transfer has its own budget, independent of the probe deadline
+            self.request_timeout(base_url),
+            json=transfer_data,
+        )
+        if isinstance(response, requests.exceptions.RequestException):
+            return self._request_error(route, response)
+        return self._movil_result(route, target_phone, response)
+
+    def _phone_search(self, phone: str) -> PeerProtocol:
+        """Probe every candidate peer; the first confirmation wins"""
+        candidates = self._probe_candidates()
+        if not candidates:
+            return None
+
+        deadline = time.monotonic() + self.fanout_deadline
+        pending = yield StartProbes(candidates, phone)
+
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.warning(f"Phone ownership probe timed out for {phone}")
+                    return None
+
+                done = yield WaitFirst(pending, remaining)
+                for probe in done:
+                    route = pending.pop(probe)
+                    if probe.result():
+                        return route
+            return None
+        finally:
+            # Futures and asyncio tasks both support cancel()
+            for probe in pending:
+                probe.cancel()
+
+    def _ownership_probe(self, route: BankRoute, phone: str) -> PeerProtocol:
+        """Ask one peer whether it has the phone number linked"""
+        response = yield PeerCall(
+            "GET",
+            self._base_url(route),
+            route.phone_lookup_path(phone),
+            self.probe_timeout,
+        )
+        if isinstance(response, requests.exceptions.RequestException):
+            return False
+        return self._owns_phone(response)
+
+    @staticmethod
+    def _owns_phone(response) -> bool:
         """
-        Send SINPE Móvil transfer to another bank
+        Whether a peer's phone lookup answer confirms ownership
 
-        Args:
-            target_phone: Destination phone number
-            transfer_data: Transfer payload
+        A 200 alone is not enough: validation endpoints answer 200 false for
+        phones they do not hold. The body must be true, or a success flag
+        with the phone link as data.
+        """
+        if response.status_code != 200:
+            return False
+        try:
+            body = response.json()
+        except ValueError:
+            return False
+        if isinstance(body, dict):
+            return bool(body.get("success") and body.get("data"))
+        return body is True
+
+    def _probe_candidates(self) -> List[BankRoute]:
+        """Enabled peers to ask for phone ownership"""
+        # Peers with an open circuit are known to be down; don't wait on them
+        return [
+            route
+            for route in self.routing.routes(enabled_only=True)
+            if not self.breakers.is_open(route.bank_code)
+        ]
+
+    def _known_phone_route(self, phone: str):
+        """
+        Route of a phone's owner according to the phone routing directory
 
         Returns:
-            Response from target bank
-        """  # First, we need to find which bank handles this phone number
-        # This would typically involve querying the BCCR registry
-        # For now, we'll try all available banks
-
-        for contact in self.contacts:
-            if not contact.get("IP"):
-                continue
+            The owner's BankRoute, None when the owner is unknown, or
+            UNROUTABLE when no peer owned the phone on the last search
+        """
+        bank_code = phone_routing.lookup(phone)
+        if bank_code == UNROUTABLE:
+            return UNROUTABLE
+        return self.routing.get(bank_code) if bank_code else None
 
-            try:
-                protocol = "https" if self.use_https else "http"
-                url = f"{protocol}://{contact['IP']}/api/sinpe-movil-transfer"
+    def _request_error(
+        self, route: BankRoute, error: requests.exceptions.RequestException
+    ) -> Dict:
+        """Record a peer call that got no answer and build its result"""
+        self.breakers.record_failure(route.bank_code)
+        if isinstance(error, requests.exceptions.Timeout):
+            message = "Timeout al conectar con banco destino"
+        else:
+            message = "No se pudo conectar con banco destino"
+        return {"success": False, "error": message, "retryable": True}
+
+    def _transfer_result(self, route: BankRoute, response) -> Dict:
+        """Record a peer's answer to a transfer and build its result"""
+        # Server errors count against the peer and may be retried
+        if response.status_code >= 500:
+            self.breakers.record_failure(route.bank_code)
+        else:
+            self.breakers.record_success(route.bank_code)
+
+        if response.status_code == 200:
+            return {"success": True, "data": response.json(), "bank": route.contact}
+        return {
+            "success": False,
+            "error": f"Error del banco destino: {response.status_code}",
+            "details": response.text,
+            "bank": route.contact,
+            "retryable": response.status_code >= 500,
+        }
 
-                response = requests.post(
-                    url,
-                    json=transfer_data,
-                    timeout=10,
-                    headers={
-                        "Content-Type": "application/json",
-                        "User-Agent": "SINPE-Banking-System/1.0",
-                    },
-                    verify=self.ssl_verify,  # SSL certificate verification
-                )
+    def _movil_result(self, route: BankRoute, phone: str, response) -> Dict:
+        """Build a SINPE Móvil result and update the phone routing directory"""
+        result = self._transfer_result(route, response)
+        if result["success"]:
+            phone_routing.learn(phone, route.bank_code)
+        else:
+            # The routed bank rejected the transfer; re-discover next time
+            phone_routing.forget(phone)
+        return result
+
+    @staticmethod
+    def _phone_unroutable_error() -> Dict:
+        return {
+            "success": False,
+            "error": "No se encontró banco que maneje el número de teléfono",
+        }
 
-                if response.status_code == 200:
-                    return {
-                        "success": True,
-                        "data": response.json(),
-                        "bank": contact["contacto"],
-                    }
+    def _base_url(self, route: BankRoute) -> str:
+        return route.base_url("https" if self.use_https else "http")
 
-            except requests.exceptions.Timeout:
-                continue
-            except requests.exceptions.ConnectionError:
-                continue
+    def request_timeout(self, base_url: str) -> float:
+        """Timeout for a peer call, derived from the peer's observed p99 latency"""
+        p99 = self.sessions.latency_percentile(
+            base_url, 0.99, min_samples=self.breakers.min_samples
+        )
+        return self.breakers.timeout_for(p99)
 
+    @staticmethod
+    def _circuit_open_error(route: BankRoute) -> Dict:
         return {
             "success": False,
-            "error": "No se encontró banco que maneje el número de teléfono",
+            "error": "Banco destino no disponible temporalmente",
+            "circuit": "open",
+            "bank": route.contact,
+            "retryable": True,
         }
 
     def validate_iban_structure(self, iban: str) -> bool:
@@ -273,7 +520,7 @@ class BankConnectorService:
 
     def get_all_bank_contacts(self) -> List[Dict]:
         """Get all bank contacts"""
-        return self.contacts
+        return [dict(contact) for contact in self.routing.table.contacts]
 
     def get_iban_structure(self) -> Dict:
         """Get IBAN structure template"""
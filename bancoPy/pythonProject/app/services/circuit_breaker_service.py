@@ -0,0 +1,250 @@
+"""
+Circuit Breaker Service - Per-peer circuit breakers for inter-bank calls
+A peer that keeps failing is cut off for a cooldown (open), then allowed a
+single trial call (half-open) before traffic resumes (closed), so a dead bank
+fails fast instead of holding Flask workers on timeouts
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """
+    Full-jitter exponential backoff
+
+    Args:
+        attempt: Retry number, starting at 0
+        base: Delay ceiling of the first retry (seconds)
+        cap: Maximum delay ceiling (seconds)
+
+    Returns:
+        Random delay between 0 and min(cap, base * 2**attempt)
+    """
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state machine for one peer"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: First cooldown before a trial call (seconds)
+            max_reset_timeout: Cooldown ceiling after repeated failed trials
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+
+        self.state = CLOSED
+        self.failures = 0
+        self.open_count = 0  # consecutive openings without a success
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call may go to the peer now
+
+        In half-open state only one trial call is let through at a time.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+
+            if self.state == HALF_OPEN:
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (does not claim a trial)"""
+        with self._lock:
+            return self.state == OPEN and self.clock() - self.opened_at < self.cooldown
+
+    def record_success(self):
+        """A call or health check reached the peer"""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit closed after successful call")
+            self.state = CLOSED
+            self.failures = 0
+            self.open_count = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """A call or health check failed (timeout, connection error, 5xx)"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+
+    def probe_succeeded(self):
+        """
+        An out-of-band health check succeeded
+
+        An open circuit moves straight to half-open so the next real call is
+        the trial, instead of waiting out the whole cooldown.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+
+    def _open(self):
+        self.open_count += 1
+        # Jittered exponential cooldown so peers are not retried in lockstep
+        ceiling = min(
+            self.max_reset_timeout,
+            self.reset_timeout * (2 ** (self.open_count - 1)),
+        )
+        self.cooldown = random.uniform(ceiling / 2, ceiling)
+        self.opened_at = self.clock()
+        self.state = OPEN
+        self.trial_in_flight = False
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (self.clock() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "open_count": self.open_count,
+                "retry_in_seconds": (
+                    round(retry_in, 2) if retry_in is not None else None
+                ),
+            }
+
+
+class PeerCircuitBreakers:
+    """Circuit breakers and adaptive timeouts keyed by bank code"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 120.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 10.0,
+        timeout_multiplier: float = 3.0,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open a circuit
+            reset_timeout: First open cooldown (seconds)
+            max_reset_timeout: Cooldown ceiling (seconds)
+            min_timeout: Lower bound of adaptive timeouts (seconds)
+            max_timeout: Upper bound, also used before enough samples exist
+            timeout_multiplier: Timeout = p99 latency * multiplier
+            min_samples: Latency samples needed before adapting the timeout
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, peer: str) -> CircuitBreaker:
+        """Get (or create) the breaker of a peer"""
+        breaker = self._breakers.get(peer)
+        if breaker is not None:
+            return breaker
+
+        with self._lock:
+            breaker = self._breakers.get(peer)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    self.failure_threshold,
+                    self.reset_timeout,
+                    self.max_reset_timeout,
+                    self.clock,
+                )
+                self._breakers[peer] = breaker
+        return breaker
+
+    def allow_request(self, peer: str) -> bool:
+        return self.get(peer).allow_request()
+
+    def is_open(self, peer: str) -> bool:
+        breaker = self._breakers.get(peer)
+        return breaker.is_open() if breaker else False
+
+    def record_success(self, peer: str):
+        self.get(peer).record_success()
+
+    def record_failure(self, peer: str):
+        self.get(peer).record_failure()
+
+    def record_health_check(self, peer: str, healthy: bool):
+        """Feed an inter-bank health check result into the peer's breaker"""
+        if healthy:
+            self.get(peer).probe_succeeded()
+        else:
+            self.get(peer).record_failure()
+
+    def timeout_for(self, p99_latency: Optional[float]) -> float:
+        """
+        Request timeout derived from the peer's observed p99 latency
+
+        Args:
+            p99_latency: p99 latency in seconds, None if not enough samples
+
+        Returns:
+            Timeout in seconds, clamped to [min_timeout, max_timeout]
+        """
+        if p99_latency is None:
+            return self.max_timeout
+        return max(
+            self.min_timeout,
+            min(self.max_timeout, p99_latency * self.timeout_multiplier),
+        )
+
+    def get_stats(self) -> Dict:
+        """Get the state of every peer circuit"""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {peer: breaker.to_dict() for peer, breaker in breakers.items()}
+
+    def reset(self):
+        """Forget every circuit (tests and manual recovery)"""
+        with self._lock:
+            self._breakers.clear()
+
+
+# Global instance
+peer_breakers = PeerCircuitBreakers()
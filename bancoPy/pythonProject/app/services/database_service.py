@@ -12,6 +12,8 @@ from app.models import (
     Currency,
     Transaction,
 )
+from app.services.phone_directory_service import phone_directory
+from sqlalchemy import inspect, text
 from werkzeug.security import generate_password_hash
 from decimal import Decimal
 import uuid
@@ -204,6 +206,7 @@ class DatabaseService:
 
         # Commit all changes
         db.session.commit()
+        phone_directory.invalidate_all()
 
         print("✓ Sample data created successfully")
         print("Sample users:")
@@ -213,6 +216,51 @@ class DatabaseService:
         for phone_link in phone_links_data:
             print(f"  - {phone_link[1]} -> Account {phone_link[0]}")
 
+    def upgrade_schema(self):
+        """Bring a database created by an older version up to the current models"""
+        self.ensure_columns()
+        self.ensure_indexes()
+
+    def ensure_columns(self):
+        """Add nullable columns declared on the models that existing tables lack"""
+        inspector = inspect(db.engine)
+        existing_tables = inspector.get_table_names()
+
+        with db.engine.begin() as connection:
+            for table in db.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+
+                existing = {col["name"] for col in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing or not column.nullable:
+                        continue
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(
+                        text(
+                            f"ALTER TABLE {table.name} "
+                            f"ADD COLUMN {column.name} {column_type}"
+                        )
+                    )
+
+            # Backfill derived columns; IBANs stored before normalization
+            # (dashed account numbers) are rewritten to the lookup form
+            iban = Account.iban_sql(Account.__table__.c.number)
+            connection.execute(
+                Account.__table__.update()
+                .where(
+                    (Account.__table__.c.iban.is_(None))
+                    | (Account.__table__.c.iban != iban)
+                )
+                .values(iban=iban)
+            )
+
+    def ensure_indexes(self):
+        """Create indexes declared on the models that an existing database lacks"""
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+
     def reset_database(self):
         """Reset database (drop all tables and recreate)"""
         db.drop_all()
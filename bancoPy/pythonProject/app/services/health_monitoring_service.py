@@ -14,16 +14,15 @@ except ImportError:
 
     logging.warning("psutil not available - system monitoring features will be limited")
 
+import copy
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import requests
 import threading
 from app.models import db, Transaction, Account
 from app.services.logging_service import banking_logger
+from app.services.peer_health_service import peer_health
 from sqlalchemy import text
-import json
-import os
 
 
 class SystemHealthMonitor:
@@ -40,6 +39,8 @@ class SystemHealthMonitor:
             "transactions": {"last_24h": 0, "success_rate": 0},
             "alerts": [],
         }
+        self._report = self.health_data
+        self._check_lock = threading.Lock()
         self.start_monitoring()
 
     def start_monitoring(self):
@@ -56,35 +57,44 @@ class SystemHealthMonitor:
 
         monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
         monitor_thread.start()
+
+        # Inter-bank probes run on their own schedule, concurrently
+        peer_health.start()
         banking_logger.app_logger.info("System health monitoring started")
 
     def perform_health_check(self) -> Dict:
         """Perform comprehensive health check"""
-        try:
-            self.health_data["last_check"] = datetime.utcnow().isoformat()
-            self.health_data["alerts"] = []
+        with self._check_lock:
+            try:
+                # Build the next report aside and publish it in one step, so
+                # readers never see a half-finished check
+                self._report = {
+                    **self.health_data,
+                    "last_check": datetime.utcnow().isoformat(),
+                    "alerts": [],
+                }
 
-            # Check database health
-            self._check_database_health()
+                # Check database health
+                self._check_database_health()
 
-            # Check system resources
-            self._check_system_resources()
+                # Check system resources
+                self._check_system_resources()
 
-            # Check transaction health
-            self._check_transaction_health()
+                # Check transaction health
+                self._check_transaction_health()
 
-            # Check inter-bank connectivity (less frequently)
-            if datetime.utcnow().minute % 5 == 0:  # Every 5 minutes
+                # Inter-bank connectivity from the cached peer snapshot
                 self._check_inter_bank_health()
 
-            # Generate alerts if needed
-            self._generate_alerts()
+                # Generate alerts if needed
+                self._generate_alerts()
 
-            return self.health_data
+                self.health_data = self._report
+                return self.health_data
 
-        except Exception as e:
-            banking_logger.log_error("health_check", str(e))
-            return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
+            except Exception as e:
+                banking_logger.log_error("health_check", str(e))
+                return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
     def _check_database_health(self):
         """Check database connectivity and performance"""
@@ -97,30 +107,30 @@ class SystemHealthMonitor:
             response_time = time.time() - start_time
 
             if result and response_time < 1.0:  # Less than 1 second
-                self.health_data["database"] = {
+                self._report["database"] = {
                     "status": "healthy",
                     "response_time": round(response_time * 1000, 2),  # Convert to ms
                 }
             else:
-                self.health_data["database"] = {
+                self._report["database"] = {
                     "status": "slow",
                     "response_time": round(response_time * 1000, 2),
                 }
-                self.health_data["alerts"].append("Database response time is slow")
+                self._report["alerts"].append("Database response time is slow")
 
         except Exception as e:
-            self.health_data["database"] = {
+            self._report["database"] = {
                 "status": "error",
                 "response_time": 0,
                 "error": str(e),
             }
-            self.health_data["alerts"].append(f"Database connection failed: {str(e)}")
+            self._report["alerts"].append(f"Database connection failed: {str(e)}")
 
     def _check_system_resources(self):
         """Check system CPU, memory, and disk usage"""
         try:
             if not PSUTIL_AVAILABLE:
-                self.health_data["system"] = {
+                self._report["system"] = {
                     "status": "limited",
                     "message": "psutil not available - system monitoring disabled",
                     "cpu_percent": 0,
@@ -140,7 +150,7 @@ class SystemHealthMonitor:
             disk = psutil.disk_usage("/")
             disk_percent = (disk.used / disk.total) * 100
 
-            self.health_data["system"] = {
+            self._report["system"] = {
                 "cpu_percent": round(cpu_percent, 1),
                 "memory_percent": round(memory_percent, 1),
                 "disk_percent": round(disk_percent, 1),
@@ -149,23 +159,21 @@ class SystemHealthMonitor:
 
             # Generate alerts for high resource usage
             if cpu_percent > 80:
-                self.health_data["alerts"].append(f"High CPU usage: {cpu_percent:.1f}%")
-                self.health_data["system"]["status"] = "warning"
+                self._report["alerts"].append(f"High CPU usage: {cpu_percent:.1f}%")
+                self._report["system"]["status"] = "warning"
 
             if memory_percent > 85:
-                self.health_data["alerts"].append(
+                self._report["alerts"].append(
                     f"High memory usage: {memory_percent:.1f}%"
                 )
-                self.health_data["system"]["status"] = "warning"
+                self._report["system"]["status"] = "warning"
 
             if disk_percent > 90:
-                self.health_data["alerts"].append(
-                    f"High disk usage: {disk_percent:.1f}%"
-                )
-                self.health_data["system"]["status"] = "critical"
+                self._report["alerts"].append(f"High disk usage: {disk_percent:.1f}%")
+                self._report["system"]["status"] = "critical"
 
         except Exception as e:
-            self.health_data["system"] = {"status": "error", "error": str(e)}
+            self._report["system"] = {"status": "error", "error": str(e)}
 
     def _check_transaction_health(self):
         """Check transaction processing health"""
@@ -184,7 +192,7 @@ class SystemHealthMonitor:
 
             success_rate = (successful_transactions / max(total_transactions, 1)) * 100
 
-            self.health_data["transactions"] = {
+            self._report["transactions"] = {
                 "last_24h": total_transactions,
                 "successful": successful_transactions,
                 "success_rate": round(success_rate, 2),
@@ -193,10 +201,10 @@ class SystemHealthMonitor:
 
             # Generate alerts for low success rate
             if success_rate < 95 and total_transactions > 10:
-                self.health_data["alerts"].append(
+                self._report["alerts"].append(
                     f"Low transaction success rate: {success_rate:.1f}%"
                 )
-                self.health_data["transactions"]["status"] = "warning"
+                self._report["transactions"]["status"] = "warning"
 
             # Alert if no transactions in last hour (during business hours)
             one_hour_ago = datetime.utcnow() - timedelta(hours=1)
@@ -207,59 +215,46 @@ class SystemHealthMonitor:
             if (
                 recent_transactions == 0 and 8 <= datetime.utcnow().hour <= 18
             ):  # Business hours
-                self.health_data["alerts"].append(
+                self._report["alerts"].append(
                     "No transactions in the last hour during business hours"
                 )
 
         except Exception as e:
-            self.health_data["transactions"] = {"status": "error", "error": str(e)}
+            self._report["transactions"] = {"status": "error", "error": str(e)}
 
     def _check_inter_bank_health(self):
         """Check connectivity to other banks"""
         try:
-            # Load bank contacts
-            contacts_file = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                "contactos-bancos.json",
-            )
-
-            reachable_banks = 0
-            total_banks = 0
-
-            if os.path.exists(contacts_file):
-                with open(contacts_file, "r", encoding="utf-8") as f:
-                    banks = json.load(f)
-
-                for bank in banks:
-                    if bank.get("IP"):
-                        total_banks += 1
-                        try:
-                            # Quick health check to bank
-                            response = requests.get(
-                                f"http://{bank['IP']}/health", timeout=5
-                            )
-                            if response.status_code == 200:
-                                reachable_banks += 1
-                        except:
-                            pass  # Bank unreachable
-
-            self.health_data["inter_bank"] = {
+            # Probed concurrently in the background; no network I/O here
+            snapshot = peer_health.snapshot()
+            if snapshot["checked_at"] is None:
+                self._report["inter_bank"] = {
+                    "status": "unknown",
+                    "reachable_banks": 0,
+                    "total_banks": 0,
+                }
+                return
+
+            total_banks = snapshot["total_banks"]
+            reachable_banks = snapshot["reachable_banks"]
+
+            self._report["inter_bank"] = {
                 "status": "healthy" if reachable_banks == total_banks else "partial",
                 "reachable_banks": reachable_banks,
                 "total_banks": total_banks,
-                "connectivity_rate": round(
-                    (reachable_banks / max(total_banks, 1)) * 100, 1
-                ),
+                "connectivity_rate": snapshot["connectivity_rate"],
+                "checked_at": snapshot["checked_at"],
+                "age_seconds": snapshot["age_seconds"],
             }
 
             if reachable_banks < total_banks:
                 unreachable = total_banks - reachable_banks
-                self.health_data["alerts"].append(
+                self._report["alerts"].append(
                     f"{unreachable} bank(s) unreachable out of {total_banks}"
                 )
 
         except Exception as e:
-            self.health_data["inter_bank"] = {"status": "error", "error": str(e)}
+            self._report["inter_bank"] = {"status": "error", "error": str(e)}
 
     def _generate_alerts(self):
         """Generate system-wide alerts based on health data"""
@@ -269,20 +264,20 @@ class SystemHealthMonitor:
             warning_alerts = []
 
             # Check for critical conditions
-            if self.health_data["database"]["status"] == "error":
+            if self._report["database"]["status"] == "error":
                 critical_alerts.append("Database connection failed")
 
-            if self.health_data["system"].get("disk_percent", 0) > 95:
+            if self._report["system"].get("disk_percent", 0) > 95:
                 critical_alerts.append("Critical disk space - system may fail")
 
-            if self.health_data["system"].get("memory_percent", 0) > 95:
+            if self._report["system"].get("memory_percent", 0) > 95:
                 critical_alerts.append("Critical memory usage - system may fail")
 
             # Log critical alerts
             for alert in critical_alerts:
                 banking_logger.log_security_event(
                     "system_critical_alert",
-                    {"alert": alert, "health_data": self.health_data},
+                    {"alert": alert, "health_data": self._report},
                     "CRITICAL",
                 )
 
@@ -290,7 +285,7 @@ class SystemHealthMonitor:
             for alert in warning_alerts:
                 banking_logger.log_security_event(
                     "system_warning_alert",
-                    {"alert": alert, "health_data": self.health_data},
+                    {"alert": alert, "health_data": self._report},
                     "WARNING",
                 )
 
@@ -304,8 +299,8 @@ class SystemHealthMonitor:
     def get_detailed_report(self) -> Dict:
         """Get detailed health report"""
         try:
-            # Get additional metrics
-            detailed_report = self.health_data.copy()
+            # Get additional metrics (copy: the published report is shared)
+            detailed_report = copy.deepcopy(self.health_data)
 
             # Add process information (if psutil available)
             if PSUTIL_AVAILABLE:
@@ -362,10 +357,15 @@ class SystemHealthMonitor:
     def stop_monitoring(self):
         """Stop health monitoring"""
         self.monitoring_active = False
+        peer_health.stop()
         banking_logger.app_logger.info("System health monitoring stopped")
 
     def force_health_check(self) -> Dict:
-        """Force an immediate health check"""
+        """Force an immediate health check, re-probing peer banks first"""
+        try:
+            peer_health.probe()
+        except Exception as e:
+            banking_logger.log_error("peer_health_probe", str(e))
         return self.perform_health_check()
 
 
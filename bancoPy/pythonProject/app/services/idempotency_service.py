@@ -0,0 +1,128 @@
+"""
+Idempotency Service - Exactly-once processing of incoming transfers
+Peer banks retry transfers; the first request claims the transaction id with
+an INSERT into processed_transfers in the same DB transaction as the credit,
+and every replay gets the stored result back (usually from the in-memory
+LRU front) without the credit being applied again
+"""
+
+import json
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, ProcessedTransfer
+from app.utils.sqlite_config import begin_sqlite_transaction
+from app.utils.transfers import TransferResult
+from app.utils.ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateTransferError(Exception):
+    """The transaction id was already claimed by an earlier request"""
+
+    def __init__(self, transaction_id: str, result: Optional[TransferResult]):
+        self.transaction_id = transaction_id
+        self.result = result
+        super().__init__(f"Transacción duplicada: {transaction_id}")
+
+
+class IdempotencyStore:
+    """Insert-first idempotency keys with an LRU cache of final results"""
+
+    def __init__(self, maxsize: int = 20000, ttl: float = 3600.0):
+        """
+        Args:
+            maxsize: Results kept in memory
+            ttl: Seconds a result stays in memory (the table keeps it for good)
+        """
+        self.results = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def cached(self, transaction_id: str) -> Optional[TransferResult]:
+        """
+        Result of an already processed transfer, from memory only
+
+        Args:
+            transaction_id: Incoming transaction id
+
+        Returns:
+            Original result or None on a cache miss
+        """
+        result = self.results.get(transaction_id)
+        return None if result is MISSING else result
+
+    def claim(self, transaction_id: str, kind: str) -> ProcessedTransfer:
+        """
+        Claim a transaction id inside the current DB transaction
+
+        The row is flushed immediately, so a concurrent request with the same
+        id blocks on the write lock and then fails on the primary key instead
+        of applying the credit a second time. Nothing is committed: the claim
+        commits or rolls back together with the credit. A rejected claim only
+        rolls back its own savepoint.
+
+        Args:
+            transaction_id: Incoming transaction id
+            kind: Transaction type (sinpe_incoming, sinpe_movil_incoming)
+
+        Returns:
+            The claimed row, to be completed with complete()
+
+        Raises:
+            DuplicateTransferError: If the id was already processed; carries
+                the original result when one was stored
+        """
+        record = ProcessedTransfer(transaction_id=transaction_id, kind=kind)
+
+        # The savepoint keeps a rejected claim from rolling back the caller's
+        # transaction (other items of a batch)
+        begin_sqlite_transaction(db.session)
+        try:
+            with db.session.begin_nested():
+                db.session.add(record)
+        except IntegrityError:
+            raise DuplicateTransferError(transaction_id, self.replay(transaction_id))
+        return record
+
+    def complete(self, record: ProcessedTransfer, result: TransferResult):
+        """Store the result on a claimed row (committed by the caller)"""
+        record.result = json.dumps(result.to_dict(), default=str)
+
+    def remember(self, transaction_id: str, result: TransferResult):
+        """Cache a committed result for cheap replays"""
+        self.results.set(transaction_id, result)
+
+    def forget(self, transaction_id: str):
+        """Drop a cached result whose transaction was rolled back"""
+        self.results.invalidate(transaction_id)
+
+    def replay(self, transaction_id: str) -> Optional[TransferResult]:
+        """
+        Load a stored result from the table and cache it
+
+        Args:
+            transaction_id: Incoming transaction id
+
+        Returns:
+            Original result or None if the id was never processed
+        """
+        record = db.session.get(ProcessedTransfer, transaction_id)
+        if record is None or not record.result:
+            return None
+        result = TransferResult.from_dict(json.loads(record.result))
+        self.remember(transaction_id, result)
+        return result
+
+    def reset(self):
+        """Forget cached results (the table is left untouched)"""
+        self.results.clear()
+
+    def get_stats(self) -> Dict:
+        """Get result cache counters"""
+        return self.results.get_stats()
+
+
+# Global instance
+incoming_transfers = IdempotencyStore()
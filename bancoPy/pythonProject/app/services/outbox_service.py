@@ -0,0 +1,366 @@
+"""
+Outbox Service - Durable queue of outgoing inter-bank transfers
+Transfers are written to the outbox_transfers table and acknowledged right
+away; a background dispatcher pool delivers them to the peer bank with
+retries, so API latency no longer depends on the slowest peer
+"""
+
+import json
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, OutboxTransfer
+from app.services.async_bank_connector_service import create_bank_connector
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+SINPE = "sinpe"
+SINPE_MOVIL = "sinpe_movil"
+
+# Error the receiving bank returns for a transaction id it already credited
+DUPLICATE_ERROR = "Transacción duplicada"
+
+
+class OutboxService:
+    """Enqueues outgoing transfers and dispatches them in the background"""
+
+    def __init__(
+        self,
+        connector=None,
+        workers: int = 4,
+        max_attempts: int = 8,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 120.0,
+        retry_base: float = 2.0,
+        retry_cap: float = 300.0,
+    ):
+        """
+        Args:
+            connector: Inter-bank connector used for delivery (defaults to
+                the INTERBANK_CLIENT_MODE connector)
+            workers: Concurrent deliveries
+            max_attempts: Delivery attempts before an entry is marked failed
+            poll_interval: Seconds between polls when the queue is idle
+            lease_seconds: In-flight entries older than this are re-delivered
+                (dispatcher crashed mid-delivery)
+            retry_base: First retry delay ceiling (seconds)
+            retry_cap: Maximum retry delay (seconds)
+        """
+        self.connector = connector or create_bank_connector()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_base = retry_base
+        self.retry_cap = retry_cap
+
+        self._app = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._poller: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(workers)
+
+    # ------------------------------------------------------------------ enqueue
+
+    def enqueue(
+        self,
+        kind: str,
+        destination: str,
+        payload: Dict,
+        idempotency_key: str = None,
+    ) -> Tuple[OutboxTransfer, bool]:
+        """
+        Durably queue a transfer for delivery
+
+        Args:
+            kind: SINPE (destination is an IBAN) or SINPE_MOVIL (a phone)
+            destination: Destination IBAN or phone number
+            payload: Signed payload to send; must carry transaction_id
+            idempotency_key: Optional client key for safe request replays
+
+        Returns:
+            Tuple of (outbox entry, created). created is False when the
+            idempotency key was already used; the original entry is returned.
+        """
+        if idempotency_key:
+            existing = OutboxTransfer.query.filter_by(
+                idempotency_key=idempotency_key
+            ).first()
+            if existing:
+                return existing, False
+
+        entry = OutboxTransfer(
+            transaction_id=payload["transaction_id"],
+            idempotency_key=idempotency_key,
+            kind=kind,
+            destination=destination,
+            payload=json.dumps(payload),
+            status=PENDING,
+        )
+        db.session.add(entry)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request with the same key won the insert
+            db.session.rollback()
+            existing = (
+                OutboxTransfer.query.filter_by(idempotency_key=idempotency_key).first()
+                if idempotency_key
+                else None
+            )
+            if existing is None:
+                raise
+            return existing, False
+
+        self._wake.set()
+        return entry, True
+
+    def get_status(self, transaction_id: str) -> Optional[Dict]:
+        """
+        Get the delivery status of a queued transfer
+
+        Args:
+            transaction_id: Transaction id returned on enqueue
+
+        Returns:
+            Status dict or None if unknown
+        """
+        entry = OutboxTransfer.query.filter_by(transaction_id=transaction_id).first()
+        return entry.to_dict() if entry else None
+
+    # ----------------------------------------------------------------- dispatch
+
+    def claim(self, limit: int) -> List:
+        """
+        Atomically lease up to `limit` due entries for delivery
+
+        Due entries are pending ones whose retry time has come and in-flight
+        ones whose lease expired. A single UPDATE ... RETURNING marks them
+        in flight, so two dispatchers never claim the same entry.
+
+        Returns:
+            Rows of (id, kind, destination, payload, attempts)
+        """
+        now = datetime.utcnow()
+        due = (
+            select(OutboxTransfer.id)
+            .where(
+                OutboxTransfer.status.in_([PENDING, IN_FLIGHT]),
+                OutboxTransfer.next_attempt_at <= now,
+            )
+            .order_by(OutboxTransfer.next_attempt_at)
+            .limit(limit)
+        )
+        rows = db.session.execute(
+            update(OutboxTransfer)
+            .where(OutboxTransfer.id.in_(due.scalar_subquery()))
+            .values(
+                status=IN_FLIGHT,
+                attempts=OutboxTransfer.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=self.lease_seconds),
+                updated_at=now,
+            )
+            .returning(
+                OutboxTransfer.id,
+                OutboxTransfer.kind,
+                OutboxTransfer.destination,
+                OutboxTransfer.payload,
+                OutboxTransfer.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        return rows
+
+    def deliver(self, row) -> str:
+        """
+        Send one claimed entry to the peer bank and record the outcome
+
+        Args:
+            row: Row returned by claim()
+
+        Returns:
+            The entry's new status
+        """
+        payload = json.loads(row.payload)
+        try:
+            if row.kind == SINPE_MOVIL:
+                result = self.connector.send_sinpe_movil_transfer_to_bank(
+                    row.destination, payload
+                )
+            else:
+                result = self.connector.send_sinpe_transfer_to_bank(
+                    row.destination, payload
+                )
+        except Exception as e:
+            result = {"success": False, "error": f"Error inesperado: {e}"}
+
+        now = datetime.utcnow()
+        values = {"updated_at": now, "response": json.dumps(result, default=str)}
+        if result.get("success") or (row.attempts > 1 and self._is_duplicate(result)):
+            # A duplicate on a retry means an earlier attempt was credited
+            # even though its response never reached us
+            values.update(status=DELIVERED, delivered_at=now, last_error=None)
+        else:
+            values["last_error"] = str(result.get("error", ""))[:255]
+            if result.get("retryable") and row.attempts < self.max_attempts:
+                values.update(
+                    status=PENDING,
+                    next_attempt_at=now + timedelta(seconds=self._retry_delay(row)),
+                )
+            else:
+                values["status"] = FAILED
+
+        # Only the current lease holder may record the outcome
+        db.session.execute(
+            update(OutboxTransfer)
+            .where(
+                OutboxTransfer.id == row.id,
+                OutboxTransfer.status == IN_FLIGHT,
+                OutboxTransfer.attempts == row.attempts,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        if values["status"] == FAILED:
+            logger.warning(
+                f"Outbox transfer {payload.get('transaction_id')} failed after "
+                f"{row.attempts} attempt(s): {values['last_error']}"
+            )
+        return values["status"]
+
+    @staticmethod
+    def _is_duplicate(result: Dict) -> bool:
+        """Whether the peer rejected the transfer as an already used id"""
+        if result.get("retryable"):
+            return False
+        details = result.get("details")
+        try:
+            error = json.loads(details).get("error", "")
+        except (TypeError, ValueError, AttributeError):
+            error = details or ""
+        return str(error).startswith(DUPLICATE_ERROR)
+
+    def _retry_delay(self, row) -> float:
+        """Jittered exponential delay before the next attempt"""
+        ceiling = min(self.retry_cap, self.retry_base * (2 ** (row.attempts - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def dispatch_pending(self, limit: int = 100) -> int:
+        """
+        Deliver due entries synchronously in the calling thread
+
+        Args:
+            limit: Maximum entries to deliver
+
+        Returns:
+            Number of entries processed
+        """
+        rows = self.claim(limit)
+        for row in rows:
+            self.deliver(row)
+        return len(rows)
+
+    # ------------------------------------------------------------- background
+
+    def start(self, app):
+        """
+        Start the background dispatcher pool
+
+        Args:
+            app: Flask application (workers run inside its app context)
+        """
+        if self._poller and self._poller.is_alive():
+            return
+
+        self._app = app
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="outbox-dispatch"
+        )
+        self._poller = threading.Thread(
+            target=self._poll_loop, name="outbox-poller", daemon=True
+        )
+        self._poller.start()
+        logger.info(f"Outbox dispatcher started with {self.workers} workers")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop polling and wait for in-progress deliveries"""
+        self._stopping.set()
+        self._wake.set()
+        if self._poller:
+            self._poller.join(timeout)
+            self._poller = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _poll_loop(self):
+        while not self._stopping.is_set():
+            claimed = free = 0
+            try:
+                # Claim only as many entries as there are free workers
+                while self._slots.acquire(blocking=False):
+                    free += 1
+                if free:
+                    with self._app.app_context():
+                        rows = self.claim(free)
+                    claimed = len(rows)
+                    for row in rows:
+                        self._executor.submit(self._run_delivery, row)
+                    for _ in range(free - claimed):
+                        self._slots.release()
+            except Exception as e:
+                logger.error(f"Outbox poll failed: {e}")
+                for _ in range(free - claimed):
+                    self._slots.release()
+
+            if not claimed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _run_delivery(self, row):
+        try:
+            with self._app.app_context():
+                self.deliver(row)
+        except Exception as e:
+            # The lease expires and the entry is claimed again
+            logger.error(f"Outbox delivery of entry {row.id} failed: {e}")
+        finally:
+            self._slots.release()
+            self._wake.set()
+
+    def get_stats(self) -> Dict:
+        """Get entry counts per status"""
+        counts = dict(
+            db.session.query(OutboxTransfer.status, db.func.count(OutboxTransfer.id))
+            .group_by(OutboxTransfer.status)
+            .all()
+        )
+        return {
+            "running": bool(self._poller and self._poller.is_alive()),
+            "workers": self.workers,
+            "counts": {
+                status: counts.get(status, 0)
+                for status in (PENDING, IN_FLIGHT, DELIVERED, FAILED)
+            },
+        }
+
+
+# Global instance
+outbox = OutboxService()
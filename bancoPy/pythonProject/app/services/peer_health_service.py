@@ -0,0 +1,195 @@
+"""
+Peer Health Service - Cached inter-bank health snapshot
+A background prober checks every peer concurrently on its own schedule and
+publishes an immutable snapshot (per-peer status, timestamps and latency
+histograms); monitoring endpoints read the snapshot and never touch the network
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+from app.services.async_bank_connector_service import BlockingBankConnector
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (non-cumulative counts)"""
+
+    __slots__ = ("bounds", "counts", "count", "total_ms")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: > max bound
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, latency_ms: float):
+        self.counts[bisect_left(self.bounds, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the p-th percentile (ms)
+
+        None when there are no samples or the percentile falls above the
+        largest bucket.
+        """
+        if not self.count:
+            return None
+        rank = p * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+
+    def to_dict(self) -> Dict:
+        buckets = {f"le_{bound}ms": n for bound, n in zip(self.bounds, self.counts)}
+        buckets[f"gt_{self.bounds[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class PeerHealthRegistry:
+    """Probes peer banks in the background and caches the results"""
+
+    def __init__(
+        self,
+        connector=None,
+        interval: float = 60.0,
+        timeout: float = 5.0,
+        protocol: str = "http",
+    ):
+        """
+        Args:
+            connector: Object with check_health(protocol=, timeout=) (defaults
+                to the asyncio connector behind its blocking facade)
+            interval: Seconds between probe rounds
+            timeout: Per-peer probe timeout in seconds
+            protocol: Protocol used for health checks
+        """
+        self.connector = connector or BlockingBankConnector()
+        self.interval = interval
+        self.timeout = timeout
+        self.protocol = protocol
+
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._last_success: Dict[str, str] = {}
+        self._snapshot: Dict = {
+            "status": "unknown",
+            "reachable_banks": 0,
+            "total_banks": 0,
+            "connectivity_rate": 0.0,
+            "checked_at": None,
+            "peers": {},
+        }
+        self._checked_monotonic: Optional[float] = None
+        self._probe_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def probe(self) -> Dict:
+        """
+        Probe every enabled peer concurrently and publish a new snapshot
+
+        Returns:
+            The published snapshot
+        """
+        with self._probe_lock:
+            results = self.connector.check_health(
+                protocol=self.protocol, timeout=self.timeout
+            )
+            checked_at = datetime.utcnow().isoformat()
+
+            peers = {}
+            for bank_code, result in results.items():
+                histogram = self._histograms.setdefault(bank_code, LatencyHistogram())
+                # Failed connections carry the timeout, not a peer latency
+                if result.get("status_code") is not None:
+                    histogram.observe(result["latency_ms"])
+                if result["healthy"]:
+                    self._last_success[bank_code] = checked_at
+
+                peers[bank_code] = {
+                    **result,
+                    "checked_at": checked_at,
+                    "last_success_at": self._last_success.get(bank_code),
+                    "latency_histogram": histogram.to_dict(),
+                }
+
+            total_banks = len(peers)
+            reachable_banks = sum(1 for peer in peers.values() if peer["healthy"])
+            snapshot = {
+                "status": "healthy" if reachable_banks == total_banks else "partial",
+                "reachable_banks": reachable_banks,
+                "total_banks": total_banks,
+                "connectivity_rate": round(
+                    (reachable_banks / max(total_banks, 1)) * 100, 1
+                ),
+                "checked_at": checked_at,
+                "peers": peers,
+            }
+
+            # Readers only ever see a complete snapshot
+            self._snapshot = snapshot
+            self._checked_monotonic = time.monotonic()
+            return snapshot
+
+    def snapshot(self) -> Dict:
+        """
+        Get the last published snapshot without probing
+
+        Returns:
+            Snapshot dict with an age_seconds field (None before the first probe)
+        """
+        snapshot = dict(self._snapshot)
+        checked = self._checked_monotonic
+        snapshot["age_seconds"] = (
+            round(time.monotonic() - checked, 1) if checked is not None else None
+        )
+        return snapshot
+
+    def start(self):
+        """Start probing every `interval` seconds on a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def probe_loop():
+            while not self._stop.is_set():
+                try:
+                    self.probe()
+                except Exception as e:
+                    logger.error(f"Inter-bank health probe failed: {e}")
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(
+            target=probe_loop, name="peer-health", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background prober"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+# Global instance
+peer_health = PeerHealthRegistry()
@@ -0,0 +1,247 @@
+"""
+Peer Session Service - Pooled keep-alive HTTP sessions for inter-bank calls
+One requests.Session per peer bank reuses TCP/TLS connections across
+transfers instead of paying a new handshake on every request
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "SINPE-Banking-System/1.0",
+    "Connection": "keep-alive",
+}
+
+
+class _PeerMetrics:
+    """Request, handshake and latency counters for one peer"""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "handshakes",
+        "latencies",
+        "total_latency",
+        "seen_connections",
+    )
+
+    def __init__(self, window: int):
+        self.requests = 0
+        self.errors = 0
+        self.handshakes = 0
+        self.seen_connections = 0
+        self.latencies = deque(maxlen=window)
+        self.total_latency = 0.0
+
+    def add_sample(self, elapsed: float, error: bool):
+        self.requests += 1
+        self.total_latency += elapsed
+        self.latencies.append(elapsed)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p: float, latencies=None) -> Optional[float]:
+        """Latency percentile in seconds over the recent window"""
+        latencies = latencies if latencies is not None else sorted(self.latencies)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+        return latencies[index]
+
+    def to_dict(self) -> Dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            value = self.percentile(p, latencies)
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "handshakes": self.handshakes,
+            "connection_reuse_rate": (
+                round((1 - self.handshakes / self.requests) * 100, 2)
+                if self.requests
+                else 0.0
+            ),
+            "avg_latency_ms": (
+                round(self.total_latency / self.requests * 1000, 2)
+                if self.requests
+                else None
+            ),
+            "p50_latency_ms": percentile(0.50),
+            "p95_latency_ms": percentile(0.95),
+            "p99_latency_ms": percentile(0.99),
+            "max_latency_ms": percentile(1.0),
+        }
+
+
+class PeerSessionPool:
+    """Per-peer pooled requests.Session objects with connection metrics"""
+
+    def __init__(self, pool_maxsize: int = 10, latency_window: int = 512):
+        """
+        Args:
+            pool_maxsize: Keep-alive connections kept per peer
+            latency_window: Recent latencies kept per peer for percentiles
+        """
+        self.pool_maxsize = pool_maxsize
+        self.latency_window = latency_window
+        self._sessions: Dict[str, requests.Session] = {}
+        self._metrics: Dict[str, _PeerMetrics] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, base_url: str) -> requests.Session:
+        """
+        Get (or create) the pooled session for a peer
+
+        Args:
+            base_url: Peer base URL, e.g. https://192.168.2.10:3001
+
+        Returns:
+            requests.Session bound to a keep-alive connection pool
+        """
+        session = self._sessions.get(base_url)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(DEFAULT_HEADERS)
+                # Retries are decided by the caller, not by urllib3
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[base_url] = session
+                self._metrics.setdefault(base_url, _PeerMetrics(self.latency_window))
+        return session
+
+    def request(
+        self, method: str, base_url: str, path: str, **kwargs
+    ) -> requests.Response:
+        """
+        Send a request to a peer over its pooled session
+
+        Args:
+            method: HTTP method
+            base_url: Peer base URL
+            path: Request path, e.g. /api/sinpe-transfer
+            **kwargs: Passed to requests.Session.request (json, timeout, verify)
+
+        Returns:
+            requests.Response
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors/timeouts
+        """
+        session = self.get_session(base_url)
+        start = time.perf_counter()
+
+        try:
+            response = session.request(method, f"{base_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(base_url, session, start, error=True)
+            raise
+
+        self._record(base_url, session, start, error=response.status_code >= 500)
+        return response
+
+    def post(self, base_url: str, path: str, **kwargs) -> requests.Response:
+        """POST to a peer over its pooled session"""
+        return self.request("POST", base_url, path, **kwargs)
+
+    def get(self, base_url: str, path: str, **kwargs) -> requests.Response:
+        """GET from a peer over its pooled session"""
+        return self.request("GET", base_url, path, **kwargs)
+
+    @staticmethod
+    def _opened_connections(session: requests.Session) -> int:
+        """Connections (i.e. TCP/TLS handshakes) opened so far by the session"""
+        poolmanager = session.get_adapter("http://").poolmanager
+        pools = poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def _record(
+        self, base_url: str, session: requests.Session, start: float, error: bool
+    ):
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            metrics = self._metrics[base_url]
+            # New connections since the last request to this peer
+            opened = self._opened_connections(session)
+            metrics.handshakes += max(0, opened - metrics.seen_connections)
+            metrics.seen_connections = max(opened, metrics.seen_connections)
+            metrics.add_sample(elapsed, error)
+
+    def observe(self, base_url: str, elapsed: float, error: bool = False):
+        """
+        Record a call made outside the pooled sessions (e.g. the asyncio client)
+
+        Keeps one latency history per peer, so adaptive timeouts see every call.
+
+        Args:
+            base_url: Peer base URL
+            elapsed: Call duration in seconds
+            error: Whether the call failed (connection error, timeout or 5xx)
+        """
+        with self._lock:
+            metrics = self._metrics.get(base_url)
+            if metrics is None:
+                metrics = self._metrics[base_url] = _PeerMetrics(self.latency_window)
+            metrics.add_sample(elapsed, error)
+
+    def latency_percentile(
+        self, base_url: str, p: float, min_samples: int = 1
+    ) -> Optional[float]:
+        """
+        Observed latency percentile for a peer
+
+        Args:
+            base_url: Peer base URL
+            p: Percentile as a fraction (0.99 for p99)
+            min_samples: Samples required before a value is reported
+
+        Returns:
+            Latency in seconds, or None without enough samples
+        """
+        with self._lock:
+            metrics = self._metrics.get(base_url)
+            if metrics is None or len(metrics.latencies) < min_samples:
+                return None
+            return metrics.percentile(p)
+
+    def get_stats(self) -> Dict:
+        """Get per-peer request, handshake and latency metrics"""
+        with self._lock:
+            return {
+                base_url: metrics.to_dict()
+                for base_url, metrics in self._metrics.items()
+            }
+
+    def close(self):
+        """Close every pooled session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._metrics.clear()
+
+
+# Global instance
+peer_sessions = PeerSessionPool()
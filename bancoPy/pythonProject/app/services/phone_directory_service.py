@@ -0,0 +1,118 @@
+"""
+Phone Directory Service - Cached phone -> account and SINPE subscription lookups
+PhoneLink and SinpeSubscription are small, read-mostly tables; every SINPE Móvil
+request reads them, so lookups are served from a bounded TTL/LRU cache
+"""
+
+import logging
+from typing import Dict, NamedTuple, Optional
+
+from app.models import PhoneLink, SinpeSubscription
+from app.utils.ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSubscription(NamedTuple):
+    """Detached copy of a SinpeSubscription row"""
+
+    sinpe_number: str
+    sinpe_bank_code: str
+    sinpe_client_name: str
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+class PhoneDirectoryCache:
+    """Phone -> phone link and phone -> subscription caches"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.phone_links = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.subscriptions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_phone_link(self, phone: str) -> Optional[Dict]:
+        """
+        Get the phone link for a phone number (cached, including misses)
+
+        Args:
+            phone: Phone number
+
+        Returns:
+            PhoneLink as dict or None if the phone is not linked
+        """
+        cached = self.phone_links.get(phone)
+        if cached is not MISSING:
+            return cached
+
+        link = PhoneLink.query.filter_by(phone=phone).first()
+        value = link.to_dict() if link else None
+        self.phone_links.set(phone, value)
+        return value
+
+    def get_account_number(self, phone: str) -> Optional[str]:
+        """Get the account number linked to a phone, or None"""
+        link = self.get_phone_link(phone)
+        return link["account_number"] if link else None
+
+    def get_subscription(self, phone: str) -> Optional[CachedSubscription]:
+        """
+        Get the SINPE Móvil subscription for a phone number (cached, including misses)
+
+        Args:
+            phone: Phone number
+
+        Returns:
+            CachedSubscription or None if the phone is not subscribed
+        """
+        cached = self.subscriptions.get(phone)
+        if cached is not MISSING:
+            return cached
+
+        subscription = SinpeSubscription.query.filter_by(sinpe_number=phone).first()
+        value = self.remember_subscription(phone, subscription)
+        return value
+
+    def remember_phone_link(self, phone: str, link: Optional[PhoneLink]):
+        """Populate the cache from a PhoneLink already loaded by another query"""
+        self.phone_links.set(phone, link.to_dict() if link else None)
+
+    def remember_subscription(
+        self, phone: str, subscription: Optional[SinpeSubscription]
+    ) -> Optional[CachedSubscription]:
+        """Populate the cache from a SinpeSubscription already loaded by another query"""
+        value = (
+            CachedSubscription(
+                subscription.sinpe_number,
+                subscription.sinpe_bank_code,
+                subscription.sinpe_client_name,
+            )
+            if subscription
+            else None
+        )
+        self.subscriptions.set(phone, value)
+        return value
+
+    def invalidate(self, *phones: str):
+        """Drop cached entries for the given phone numbers"""
+        for phone in phones:
+            if phone:
+                self.phone_links.invalidate(phone)
+                self.subscriptions.invalidate(phone)
+
+    def invalidate_all(self):
+        """Drop every cached entry"""
+        self.phone_links.clear()
+        self.subscriptions.clear()
+        logger.info("Phone directory cache cleared")
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters for both caches"""
+        return {
+            "phone_links": self.phone_links.get_stats(),
+            "subscriptions": self.subscriptions.get_stats(),
+        }
+
+
+# Global instance
+phone_directory = PhoneDirectoryCache()
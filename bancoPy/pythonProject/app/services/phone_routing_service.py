@@ -0,0 +1,147 @@
+"""
+Phone Routing Service - Phone number -> owning bank directory
+Combines the local SinpeSubscription registry, a bulk routing file and
+routes learned from peer responses so outbound SINPE Móvil transfers go
+straight to one bank instead of probing every peer
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from app.services.phone_directory_service import phone_directory
+from app.utils.bank_routing import normalize_bank_code
+from app.utils.ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Default bulk routing file: {"88881234": "0119", ...}
+PHONE_ROUTES_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "phone-routes.json"
+)
+
+# Returned by lookup when the phone is cached as not routable
+UNROUTABLE = "unroutable"
+
+
+class PhoneRoutingDirectory:
+    """Cached phone -> bank code routes with negative caching"""
+
+    def __init__(
+        self,
+        maxsize: int = 50000,
+        ttl: float = 3600.0,
+        negative_ttl: float = 60.0,
+    ):
+        """
+        Args:
+            maxsize: Maximum learned routes kept
+            ttl: Seconds a learned route stays valid
+            negative_ttl: Seconds a phone no bank claimed stays unroutable
+        """
+        self.negative_ttl = negative_ttl
+        self.learned = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._file_routes: Dict[str, str] = {}
+        self._file_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def lookup(self, phone: str) -> Optional[str]:
+        """
+        Find the bank that owns a phone number
+
+        Args:
+            phone: Phone number
+
+        Returns:
+            4-digit bank code, UNROUTABLE if no bank claimed the phone
+            recently, or None if the owner is unknown
+        """
+        cached = self.learned.get(phone)
+        if cached is not MISSING:
+            return cached if cached is not None else UNROUTABLE
+
+        bank_code = self._file_routes.get(phone)
+        if bank_code:
+            return bank_code
+
+        try:
+            subscription = phone_directory.get_subscription(phone)
+        except RuntimeError:
+            # No application context (e.g. called from a worker thread)
+            subscription = None
+        if subscription:
+            return normalize_bank_code(subscription.sinpe_bank_code)
+
+        return None
+
+    def learn(self, phone: str, bank_code: str):
+        """Remember the bank that confirmed or accepted a phone number"""
+        bank_code = normalize_bank_code(bank_code)
+        if bank_code:
+            self.learned.set(phone, bank_code)
+
+    def mark_unroutable(self, phone: str):
+        """Cache that no bank claimed the phone number (negative entry)"""
+        self.learned.set(phone, None, ttl=self.negative_ttl)
+
+    def forget(self, phone: str):
+        """Drop the learned route for a phone number"""
+        self.learned.invalidate(phone)
+
+    def refresh_from_file(self, path: str = None) -> int:
+        """
+        Replace the bulk routes with the contents of a JSON file
+
+        The file maps phone numbers to bank codes, either as an object
+        ({"88881234": "0119"}) or a list of {"phone", "bank_code"} entries.
+        The new table is swapped in atomically; a missing or invalid file
+        keeps the current routes.
+
+        Args:
+            path: Routing file (defaults to PHONE_ROUTES_FILE)
+
+        Returns:
+            Number of routes loaded
+        """
+        path = path or self._file_path or PHONE_ROUTES_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.info(f"Phone routing file not found: {path}")
+            return 0
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON in phone routing file: {path}")
+            return 0
+
+        if isinstance(data, dict):
+            entries = data.items()
+        else:
+            entries = ((item.get("phone"), item.get("bank_code")) for item in data)
+
+        routes = {}
+        for phone, bank_code in entries:
+            bank_code = normalize_bank_code(bank_code)
+            if phone and bank_code:
+                routes[str(phone)] = bank_code
+
+        with self._lock:
+            self._file_routes = routes
+            self._file_path = path
+
+        logger.info(f"Loaded {len(routes)} phone routes from {path}")
+        return len(routes)
+
+    def get_stats(self) -> Dict:
+        """Get route counts and learned-route cache counters"""
+        return {
+            "file_routes": len(self._file_routes),
+            "file_path": self._file_path,
+            "learned": self.learned.get_stats(),
+        }
+
+
+# Global instance
+phone_routing = PhoneRoutingDirectory()
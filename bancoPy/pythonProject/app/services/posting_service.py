@@ -0,0 +1,120 @@
+"""
+Posting Service - Row-level atomic balance posting
+Debits and credits are applied as conditional UPDATE statements instead of
+read-modify-write through the ORM, so concurrent transfers cannot lose updates
+or overdraw an account
+"""
+
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.models import db, Account
+
+logger = logging.getLogger(__name__)
+
+
+class PostingError(Exception):
+    """Base error for a posting that could not be applied"""
+
+
+class AccountNotFoundError(PostingError):
+    """A posting references an account that does not exist"""
+
+    def __init__(self, account_id: int):
+        self.account_id = account_id
+        super().__init__(f"Cuenta {account_id} no encontrada")
+
+
+class InsufficientFundsError(PostingError):
+    """A debit would leave the account with a negative balance"""
+
+    def __init__(self, account_id: int, available: Decimal, requested: Decimal):
+        self.account_id = account_id
+        self.available = available
+        self.requested = requested
+        super().__init__(
+            f"Fondos insuficientes. Saldo disponible: {available}, "
+            f"Monto solicitado: {requested}"
+        )
+
+
+class PostingEngine:
+    """Applies balance postings atomically within the current DB transaction"""
+
+    def post(self, postings: Iterable[Tuple[int, Decimal]]) -> Dict[int, Decimal]:
+        """
+        Apply debits (negative) and credits (positive) to account balances
+
+        Each posting is a single conditional UPDATE; debits only match while the
+        balance covers them. Postings are applied in account id order so that
+        concurrent transfers acquire row locks in the same order. Nothing is
+        committed: the caller commits or rolls back together with its
+        Transaction record.
+
+        Args:
+            postings: (account_id, amount) pairs
+
+        Returns:
+            Dict of account_id -> new balance
+
+        Raises:
+            AccountNotFoundError: If an account does not exist
+            InsufficientFundsError: If a debit exceeds the available balance
+        """
+        accounts = Account.__table__
+        balances = {}
+
+        for account_id, amount in sorted(postings, key=lambda p: p[0]):
+            amount = Decimal(str(amount))
+            stmt = (
+                update(accounts)
+                .where(accounts.c.id == account_id)
+                .values(
+                    balance=func.round(
+                        accounts.c.balance + amount, 2, type_=accounts.c.balance.type
+                    )
+                )
+                .returning(accounts.c.balance)
+            )
+            if amount < 0:
+                stmt = stmt.where(accounts.c.balance >= -amount)
+
+            new_balance = db.session.execute(stmt).scalar()
+            if new_balance is None:
+                self._raise_rejected(account_id, amount)
+
+            balances[account_id] = new_balance
+            self._sync_identity_map(account_id, new_balance)
+
+        return balances
+
+    def transfer(
+        self, from_account_id: int, to_account_id: int, amount: Decimal
+    ) -> Dict[int, Decimal]:
+        """Debit one account and credit another"""
+        return self.post([(from_account_id, -amount), (to_account_id, amount)])
+
+    @staticmethod
+    def _raise_rejected(account_id: int, amount: Decimal):
+        available = db.session.execute(
+            select(Account.balance).where(Account.id == account_id)
+        ).scalar()
+        if available is None:
+            raise AccountNotFoundError(account_id)
+        raise InsufficientFundsError(account_id, available, -amount)
+
+    @staticmethod
+    def _sync_identity_map(account_id: int, balance: Decimal):
+        """Refresh an already loaded Account so callers see the posted balance"""
+        account = db.session.identity_map.get(identity_key(Account, account_id))
+        if account is not None:
+            set_committed_value(account, "balance", balance)
+
+
+# Global instance
+posting_engine = PostingEngine()
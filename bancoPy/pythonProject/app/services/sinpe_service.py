@@ -12,13 +12,44 @@ from app.models import (
     Transaction,
 )
 from app.services.transaction_monitoring_service import transaction_monitor
+from app.services.posting_service import posting_engine
+from app.services.idempotency_service import (
+    DuplicateTransferError,
+    incoming_transfers,
+)
+from app.services.phone_directory_service import phone_directory, CachedSubscription
+from app.utils.ttl_cache import MISSING
+from app.utils.sqlite_config import begin_sqlite_transaction
+from app.utils.transfers import (
+    IncomingTransfer,
+    MonitoringInput,
+    TransferResult,
+    SINPE,
+    SINPE_MOVIL,
+)
+from app.utils.validators import parse_amount, parse_timestamp
+from sqlalchemy import select, literal, union_all
+from sqlalchemy.exc import IntegrityError
+from dataclasses import dataclass
 from decimal import Decimal
+from typing import List, Optional
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SinpeParties:
+    """Sender and receiver records resolved for a SINPE Móvil transfer"""
+
+    sender_linked: bool = False
+    sender_account: Optional[Account] = None
+    receiver_linked: bool = False
+    receiver_account: Optional[Account] = None
+    receiver_subscription: Optional[CachedSubscription] = None
+
+
 class SinpeService:
     @staticmethod
     def find_phone_link_for_user(username: str):
@@ -56,9 +87,81 @@ class SinpeService:
             phone: Phone number to search for
 
         Returns:
-            SinpeSubscription object or None
+            CachedSubscription or None
+        """
+        return phone_directory.get_subscription(phone)
+
+    @staticmethod
+    def resolve_sinpe_parties(sender_phone: str, receiver_phone: str):
+        """
+        Resolve sender and receiver phone -> account -> subscription in one query
+
+        Args:
+            sender_phone: Sender's phone number
+            receiver_phone: Receiver's phone number
+
+        Returns:
+            SinpeParties with the linked accounts and receiver subscription
         """
-        return SinpeSubscription.query.filter_by(sinpe_number=phone).first()
+        parties = SinpeParties()
+
+        # Fast path: both phone links and the receiver subscription are cached,
+        # only the account rows (for balances) need to be loaded
+        sender_link = phone_directory.phone_links.get(sender_phone)
+        receiver_link = phone_directory.phone_links.get(receiver_phone)
+        subscription = phone_directory.subscriptions.get(receiver_phone)
+
+        if MISSING not in (sender_link, receiver_link, subscription):
+            numbers = [
+                link["account_number"]
+                for link in (sender_link, receiver_link)
+                if link is not None
+            ]
+            accounts = {}
+            if numbers:
+                accounts = {
+                    account.number: account
+                    for account in Account.query.filter(Account.number.in_(numbers))
+                }
+
+            parties.sender_linked = sender_link is not None
+            if sender_link:
+                parties.sender_account = accounts.get(sender_link["account_number"])
+            parties.receiver_linked = receiver_link is not None
+            if receiver_link:
+                parties.receiver_account = accounts.get(receiver_link["account_number"])
+            parties.receiver_subscription = subscription
+            return parties
+
+        phones = union_all(
+            select(literal(sender_phone).label("phone")),
+            select(literal(receiver_phone).label("phone")),
+        ).subquery()
+
+        rows = (
+            db.session.query(phones.c.phone, PhoneLink, Account, SinpeSubscription)
+            .select_from(phones)
+            .outerjoin(PhoneLink, PhoneLink.phone == phones.c.phone)
+            .outerjoin(Account, Account.number == PhoneLink.account_number)
+            .outerjoin(
+                SinpeSubscription, SinpeSubscription.sinpe_number == phones.c.phone
+            )
+            .all()
+        )
+
+        for phone, link, account, subscription in rows:
+            phone_directory.remember_phone_link(phone, link)
+            if phone == sender_phone:
+                parties.sender_linked = link is not None
+                parties.sender_account = account
+            if phone == receiver_phone:
+                parties.receiver_linked = link is not None
+                parties.receiver_account = account
+                parties.receiver_subscription = phone_directory.remember_subscription(
+                    phone, subscription
+                )
+
+        return parties
 
     @staticmethod
     def send_sinpe_transfer(
@@ -85,125 +188,18 @@ class SinpeService:
             Exception: If transfer cannot be processed
         """
         try:
-            # Input validation
-            if amount <= 0:
-                raise Exception("El monto debe ser mayor a cero.")
-
-            if not SinpeService.validate_phone_number(sender_phone):
-                raise Exception("Número de teléfono remitente inválido.")
-
-            if not SinpeService.validate_phone_number(receiver_phone):
-                raise Exception("Número de teléfono receptor inválido.")
-
-            # Pre-transaction monitoring
-            monitoring_data = {
-                "amount": amount,
-                "transaction_type": "sinpe_movil",
-                "sender_phone": sender_phone,
-                "receiver_phone": receiver_phone,
-                "currency": currency,
-            }
-
-            # Get sender account info for monitoring
-            sender_link = PhoneLink.query.filter_by(phone=sender_phone).first()
-            if sender_link:
-                from_account = Account.query.filter_by(
-                    number=sender_link.account_number
-                ).first()
-                if from_account:
-                    monitoring_data["from_account_id"] = from_account.id
-
-            # Monitor transaction for fraud
-            monitoring_result = transaction_monitor.monitor_transaction(monitoring_data)
-
-            if not monitoring_result.get("allow_transaction", True):
-                raise Exception(
-                    f"Transacción bloqueada por seguridad. "
-                    f"Razones: {', '.join(monitoring_result.get('alerts', []))}"
-                )
-
-            if monitoring_result.get("requires_review", False):
-                logger.warning(
-                    f"Transaction requires review: Risk score {monitoring_result.get('risk_score', 0)}, "
-                    f"Alerts: {monitoring_result.get('alerts', [])}"
-                )
-
-            # 1. Validate receiver is registered in BCCR
-            subscription = SinpeSubscription.query.filter_by(
-                sinpe_number=receiver_phone
-            ).first()
-            if not subscription:
-                raise Exception(
-                    "El número de destino no está registrado en SINPE Móvil."
-                )
-
-            # 2. Get receiver account
-            receiver_link = PhoneLink.query.filter_by(phone=receiver_phone).first()
-            if not receiver_link:
-                raise Exception("No existe una cuenta vinculada al número receptor.")
-
-            to_account = Account.query.filter_by(
-                number=receiver_link.account_number
-            ).first()
-            if not to_account:
-                raise Exception("La cuenta destino no existe.")
-
-            # 3. Check if sender has local account
-            from_account_id = None
-            from_account = None
-
-            if sender_link:
-                from_account = Account.query.filter_by(
-                    number=sender_link.account_number
-                ).first()
-                if not from_account:
-                    raise Exception(
-                        "La cuenta origen vinculada al número remitente no existe."
-                    )
-
-                # Validate sufficient funds with decimal precision
-                transfer_amount = Decimal(str(amount))
-                if from_account.balance < transfer_amount:
-                    raise Exception(
-                        f"Fondos insuficientes. Saldo disponible: {from_account.balance}, "
-                        f"Monto solicitado: {transfer_amount}"
-                    )
-
-                from_account_id = from_account.id
-
-                # Deduct funds from sender (within transaction)
-                from_account.balance -= transfer_amount
-            else:
-                transfer_amount = Decimal(str(amount))
-
-            # 4. Credit funds to receiver
-            to_account.balance += transfer_amount
-
-            # 5. Create transaction record
-            transaction = Transaction(
-                transaction_id=str(uuid.uuid4()),
-                from_account_id=from_account_id,
-                to_account_id=to_account.id,
-                amount=transfer_amount,
-                currency=currency,
-                description=description,
-                sender_phone=sender_phone,
-                receiver_phone=receiver_phone,
-                status="completed",
-                transaction_type=(
-                    "sinpe_movil" if not from_account_id else "internal_sinpe_movil"
-                ),
+            transaction = SinpeService._apply_sinpe_transfer(
+                sender_phone, receiver_phone, amount, currency, description
             )
 
-            db.session.add(transaction)
-
             # Commit all changes atomically
             db.session.commit()
+            transaction_monitor.record_transaction(transaction)
 
             # Log successful transaction
             logger.info(
                 f"SINPE transfer completed: {sender_phone} -> {receiver_phone}, "
-                f"Amount: {transfer_amount}, Transaction ID: {transaction.transaction_id}"
+                f"Amount: {transaction.amount}, Transaction ID: {transaction.transaction_id}"
             )
 
             return transaction
@@ -214,48 +210,128 @@ class SinpeService:
             logger.error(f"SINPE transfer failed: {str(e)}")
             raise e
 
+    @staticmethod
+    def _apply_sinpe_transfer(
+        sender_phone: str,
+        receiver_phone: str,
+        amount: float,
+        currency: str = "CRC",
+        description: str = "",
+    ) -> Transaction:
+        """
+        Validate, fraud-score and post a SINPE mobile transfer without committing
+
+        Raises:
+            Exception: If transfer cannot be processed
+        """
+        transfer_amount = Decimal(str(amount))
+
+        # Input validation
+        if transfer_amount <= 0:
+            raise Exception("El monto debe ser mayor a cero.")
+
+        if not SinpeService.validate_phone_number(sender_phone):
+            raise Exception("Número de teléfono remitente inválido.")
+
+        if not SinpeService.validate_phone_number(receiver_phone):
+            raise Exception("Número de teléfono receptor inválido.")
+
+        # Resolve sender and receiver phone -> account -> subscription at once
+        parties = SinpeService.resolve_sinpe_parties(sender_phone, receiver_phone)
+
+        # Pre-transaction monitoring
+        monitoring_data = MonitoringInput(
+            amount=transfer_amount,
+            transaction_type="sinpe_movil",
+            currency=currency,
+            sender_phone=sender_phone,
+            receiver_phone=receiver_phone,
+            from_account_id=(
+                parties.sender_account.id if parties.sender_account else None
+            ),
+        )
+
+        # Monitor transaction for fraud
+        blocked = SinpeService._fraud_check(monitoring_data)
+        if blocked:
+            raise Exception(blocked)
+
+        # 1. Validate receiver is registered in BCCR
+        if not parties.receiver_subscription:
+            raise Exception("El número de destino no está registrado en SINPE Móvil.")
+
+        # 2. Get receiver account
+        if not parties.receiver_linked:
+            raise Exception("No existe una cuenta vinculada al número receptor.")
+
+        to_account = parties.receiver_account
+        if not to_account:
+            raise Exception("La cuenta destino no existe.")
+
         # 3. Check if sender has local account
-        sender_link = PhoneLink.query.filter_by(phone=sender_phone).first()
         from_account_id = None
+        from_account = parties.sender_account
 
-        if sender_link:
-            from_account = Account.query.filter_by(
-                number=sender_link.account_number
-            ).first()
+        if parties.sender_linked:
             if not from_account:
                 raise Exception(
                     "La cuenta origen vinculada al número remitente no existe."
                 )
 
-            if from_account.balance < Decimal(str(amount)):
-                raise Exception("Fondos insuficientes en la cuenta origen.")
-
             from_account_id = from_account.id
 
-            # Deduct funds from sender
-            from_account.balance -= Decimal(str(amount))
-
-        # 4. Credit funds to receiver
-        to_account.balance += Decimal(str(amount))
+        # 4. Debit sender (if local) and credit receiver atomically;
+        # the debit only applies while the balance covers it
+        postings = [(to_account.id, transfer_amount)]
+        if from_account_id:
+            postings.append((from_account_id, -transfer_amount))
+        posting_engine.post(postings)
 
         # 5. Create transaction record
         transaction = Transaction(
             transaction_id=str(uuid.uuid4()),
             from_account_id=from_account_id,
             to_account_id=to_account.id,
-            amount=Decimal(str(amount)),
+            amount=transfer_amount,
             currency=currency,
             description=description,
             sender_phone=sender_phone,
             receiver_phone=receiver_phone,
             status="completed",
+            transaction_type=(
+                "sinpe_movil" if not from_account_id else "internal_sinpe_movil"
+            ),
         )
 
         db.session.add(transaction)
-        db.session.commit()
+        db.session.flush()
 
-        return transaction @ staticmethod
+        return transaction
 
+    @staticmethod
+    def _fraud_check(monitoring_data: MonitoringInput) -> Optional[str]:
+        """
+        Score a transfer with the fraud monitor
+
+        Returns:
+            Rejection message if the monitor blocks the transfer, else None
+        """
+        monitoring_result = transaction_monitor.monitor_transaction(monitoring_data)
+
+        if not monitoring_result.get("allow_transaction", True):
+            return (
+                f"Transacción bloqueada por seguridad. "
+                f"Razones: {', '.join(monitoring_result.get('alerts', []))}"
+            )
+
+        if monitoring_result.get("requires_review", False):
+            logger.warning(
+                f"Transaction requires review: Risk score {monitoring_result.get('risk_score', 0)}, "
+                f"Alerts: {monitoring_result.get('alerts', [])}"
+            )
+        return None
+
+    @staticmethod
     def validate_phone_number(phone: str) -> bool:
         """
         Enhanced phone number validation for Costa Rican numbers
@@ -309,8 +385,131 @@ class SinpeService:
             account_info["phone_link"] = phone_link.to_dict() if phone_link else None
             accounts_info.append(account_info)
 
-        return accounts_info @ staticmethod
+        return accounts_info
+
+    @staticmethod
+    def process_incoming_transfer(transfer: IncomingTransfer) -> TransferResult:
+        """
+        Process a validated incoming transfer from another bank
+
+        Args:
+            transfer: Normalized transfer from the payload validator
+
+        Returns:
+            TransferResult with success status and details
+        """
+        try:
+            result, transaction = SinpeService._credit_incoming(transfer)
+            if transaction is None:
+                return result
+            db.session.commit()
+        except DuplicateTransferError as e:
+            db.session.rollback()
+            return e.result or SinpeService._duplicate_result(transfer.transaction_id)
+        except IntegrityError:
+            # Transaction recorded before idempotency keys were stored
+            db.session.rollback()
+            return SinpeService._duplicate_result(transfer.transaction_id)
+        except Exception as e:
+            db.session.rollback()
+            return SinpeService._error_result(transfer, e)
+
+        incoming_transfers.remember(transfer.transaction_id, result)
+        transaction_monitor.record_transaction(transaction)
+        return result
 
+    @staticmethod
+    def process_incoming_transfer_batch(
+        transfers: List[IncomingTransfer],
+    ) -> List[TransferResult]:
+        """
+        Credit many validated incoming transfers in a single database transaction
+
+        Each item goes through the same claim/credit/replay flow as
+        process_incoming_transfer inside its own savepoint, so a failing item
+        is rolled back alone while the rest are committed together at the end.
+        Items are also fraud-scored before their credit; a blocked item fails
+        on its own. Incoming transfers only credit the receiver; nothing is
+        debited here.
+
+        Args:
+            transfers: Normalized transfers from the payload validator
+
+        Returns:
+            List of per-item results in input order
+        """
+        results = []
+        credited = []
+
+        try:
+            begin_sqlite_transaction(db.session)
+
+            for transfer in transfers:
+                savepoint = db.session.begin_nested()
+                transaction = None
+                try:
+                    result, transaction = SinpeService._credit_incoming(
+                        transfer, screen=True
+                    )
+                    savepoint.commit()
+                except DuplicateTransferError as e:
+                    savepoint.rollback()
+                    result = e.result or SinpeService._duplicate_result(
+                        transfer.transaction_id
+                    )
+                except IntegrityError:
+                    savepoint.rollback()
+                    result = SinpeService._duplicate_result(transfer.transaction_id)
+                except Exception as e:
+                    savepoint.rollback()
+                    result = SinpeService._error_result(transfer, e)
+
+                if transaction is not None:
+                    credited.append((result, transaction))
+                results.append(result)
+
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            # Replays inside the batch may have cached uncommitted results
+            for result, _ in credited:
+                incoming_transfers.forget(result.transaction_id)
+            logger.error(f"Incoming SINPE batch failed: {str(e)}")
+            raise e
+
+        for result, transaction in credited:
+            incoming_transfers.remember(result.transaction_id, result)
+            transaction_monitor.record_transaction(transaction)
+
+        logger.info(
+            f"Incoming SINPE batch completed: "
+            f"{len(credited)}/{len(transfers)} transfers credited"
+        )
+        return results
+
+    @staticmethod
+    def _credit_incoming(transfer: IncomingTransfer, screen: bool = False):
+        """
+        Claim and credit one incoming transfer without committing
+
+        Args:
+            transfer: Normalized incoming transfer
+            screen: Fraud-score the transfer once its receiver is known and
+                reject it if the monitor blocks it
+
+        Returns:
+            (TransferResult, Transaction); the transaction is None when nothing
+            was credited (rejected or replayed transfer)
+
+        Raises:
+            DuplicateTransferError: If another request already claimed the id
+        """
+        if transfer.kind == SINPE_MOVIL:
+            return SinpeService._credit_incoming_movil(transfer, screen)
+        return SinpeService._credit_incoming_sinpe(transfer, screen)
+
+    @staticmethod
     def process_incoming_sinpe_transfer(
         sender_account: str,
         sender_bank: str,
@@ -343,84 +542,29 @@ class SinpeService:
         Returns:
             Dict with success status and details
         """
-        try:
-            # Input validation
-            if amount <= 0:
-                return {"success": False, "error": "Monto inválido"}
+        transfer_amount = parse_amount(amount)
+        if transfer_amount is None:
+            return {"success": False, "error": "Monto inválido"}
 
-            if not transaction_id:
-                return {"success": False, "error": "ID de transacción requerido"}
-
-            # Check for duplicate transaction
-            existing_transaction = Transaction.query.filter_by(
-                transaction_id=transaction_id
-            ).first()
-            if existing_transaction:
-                return {
-                    "success": False,
-                    "error": "Transacción duplicada",
-                    "transaction_id": transaction_id,
-                }
-
-            # Find receiver account by IBAN or account number
-            receiver_acc = None
-
-            # Try to find by IBAN first
-            if receiver_account.startswith("CR") and "-" in receiver_account:
-                # Extract account number from IBAN
-                # For now, try to match with existing accounts
-                # In a real implementation, we'd have proper IBAN to account mapping
-                potential_accounts = Account.query.all()
-                for acc in potential_accounts:
-                    if acc.number in receiver_account:
-                        receiver_acc = acc
-                        break
-            else:
-                # Direct account number lookup
-                receiver_acc = Account.query.filter_by(number=receiver_account).first()
-
-            if not receiver_acc:
-                return {"success": False, "error": "Cuenta destino no encontrada"}
-
-            # Convert amount to Decimal for precision
-            transfer_amount = Decimal(str(amount))
-
-            # Credit funds to receiver account
-            receiver_acc.balance += transfer_amount
-
-            # Create transaction record
-            transaction = Transaction(
+        result = SinpeService.process_incoming_transfer(
+            IncomingTransfer(
+                kind=SINPE,
                 transaction_id=transaction_id,
-                from_account_id=None,  # External transfer
-                to_account_id=receiver_acc.id,
                 amount=transfer_amount,
                 currency=currency,
-                description=f"SINPE from {sender_bank}: {description}",
-                sender_info=f"{sender_name} ({sender_account})",
-                receiver_info=f"{receiver_name} ({receiver_account})",
-                status="completed",
-                external_bank_code=sender_bank,
-                transaction_type="sinpe_incoming",
+                timestamp=parse_timestamp(timestamp),
+                description=description,
+                sender_account=sender_account,
+                sender_bank=sender_bank,
+                sender_name=sender_name,
+                receiver_account=receiver_account,
+                receiver_bank=receiver_bank,
+                receiver_name=receiver_name,
             )
+        )
+        return result.to_dict()
 
-            db.session.add(transaction)
-            db.session.commit()
-
-            return {
-                "success": True,
-                "transaction_id": transaction_id,
-                "receiver_account": receiver_acc.number,
-                "amount": float(transfer_amount),
-                "new_balance": float(receiver_acc.balance),
-            }
-
-        except Exception as e:
-            db.session.rollback()
-            return {
-                "success": False,
-                "error": f"Error procesando transferencia: {str(e)}",
-            } @ staticmethod
-
+    @staticmethod
     def process_incoming_sinpe_movil_transfer(
         sender_phone: str,
         receiver_phone: str,
@@ -445,80 +589,193 @@ class SinpeService:
         Returns:
             Dict with success status and details
         """
-        try:
-            # Input validation
-            if amount <= 0:
-                return {"success": False, "error": "Monto inválido"}
-
-            if not SinpeService.validate_phone_number(receiver_phone):
-                return {
-                    "success": False,
-                    "error": "Número de teléfono receptor inválido",
-                }
+        transfer_amount = parse_amount(amount)
+        if transfer_amount is None:
+            return {"success": False, "error": "Monto inválido"}
+
+        result = SinpeService.process_incoming_transfer(
+            IncomingTransfer(
+                kind=SINPE_MOVIL,
+                transaction_id=transaction_id,
+                amount=transfer_amount,
+                currency=currency,
+                timestamp=parse_timestamp(timestamp),
+                description=description,
+                sender_phone=sender_phone,
+                receiver_phone=receiver_phone,
+            )
+        )
+        return result.to_dict()
 
-            if not transaction_id:
-                return {"success": False, "error": "ID de transacción requerido"}
+    @staticmethod
+    def _credit_incoming_sinpe(transfer: IncomingTransfer, screen: bool = False):
+        transaction_id = transfer.transaction_id
 
-            # Check for duplicate transaction
-            existing_transaction = Transaction.query.filter_by(
-                transaction_id=transaction_id
-            ).first()
-            if existing_transaction:
-                return {
-                    "success": False,
-                    "error": "Transacción duplicada",
-                    "transaction_id": transaction_id,
-                }
+        # Input validation
+        if transfer.amount <= 0:
+            return SinpeService._rejected("Monto inválido")
 
-            # Find receiver by phone link
-            phone_link = PhoneLink.query.filter_by(phone=receiver_phone).first()
-            if not phone_link:
-                return {
-                    "success": False,
-                    "error": "Número de teléfono no está vinculado a ninguna cuenta",
-                }
+        if not transaction_id:
+            return SinpeService._rejected("ID de transacción requerido")
 
+        # Peer retries of a processed transfer get the original result
+        replayed = incoming_transfers.cached(transaction_id)
+        if replayed is not None:
+            return replayed, None
+
+        # Find receiver account by IBAN (indexed) or account number
+        receiver_account = transfer.receiver_account
+        if receiver_account.upper().startswith("CR"):
             receiver_acc = Account.query.filter_by(
-                number=phone_link.account_number
+                iban=Account.normalize_iban(receiver_account)
             ).first()
-            if not receiver_acc:
-                return {"success": False, "error": "Cuenta destino no encontrada"}
+        else:
+            # Direct account number lookup
+            receiver_acc = Account.query.filter_by(number=receiver_account).first()
 
-            # Convert amount to Decimal for precision
-            transfer_amount = Decimal(str(amount))
+        if not receiver_acc:
+            return SinpeService._rejected("Cuenta destino no encontrada")
 
-            # Credit funds to receiver account
-            receiver_acc.balance += transfer_amount
+        blocked = screen and SinpeService._screen_incoming(transfer, receiver_acc)
+        if blocked:
+            return SinpeService._rejected(blocked)
 
-            # Create transaction record
-            transaction = Transaction(
-                transaction_id=transaction_id,
-                from_account_id=None,  # External transfer
+        # Claim the transaction id first; a concurrent retry stops here
+        claim = incoming_transfers.claim(transaction_id, "sinpe_incoming")
+
+        # Credit funds to receiver account
+        posting_engine.post([(receiver_acc.id, transfer.amount)])
+
+        # Create transaction record
+        transaction = Transaction(
+            transaction_id=transaction_id,
+            from_account_id=None,  # External transfer
+            to_account_id=receiver_acc.id,
+            amount=transfer.amount,
+            currency=transfer.currency,
+            description=f"SINPE from {transfer.sender_bank}: {transfer.description}",
+            sender_info=f"{transfer.sender_name} ({transfer.sender_account})",
+            receiver_info=f"{transfer.receiver_name} ({receiver_account})",
+            status="completed",
+            external_bank_code=transfer.sender_bank,
+            transaction_type="sinpe_incoming",
+        )
+
+        db.session.add(transaction)
+
+        result = TransferResult(
+            success=True,
+            transaction_id=transaction_id,
+            receiver_account=receiver_acc.number,
+            amount=float(transfer.amount),
+            new_balance=float(receiver_acc.balance),
+        )
+        incoming_transfers.complete(claim, result)
+        return result, transaction
+
+    @staticmethod
+    def _credit_incoming_movil(transfer: IncomingTransfer, screen: bool = False):
+        transaction_id = transfer.transaction_id
+        receiver_phone = transfer.receiver_phone
+
+        # Input validation
+        if transfer.amount <= 0:
+            return SinpeService._rejected("Monto inválido")
+
+        if not SinpeService.validate_phone_number(receiver_phone):
+            return SinpeService._rejected("Número de teléfono receptor inválido")
+
+        if not transaction_id:
+            return SinpeService._rejected("ID de transacción requerido")
+
+        # Peer retries of a processed transfer get the original result
+        replayed = incoming_transfers.cached(transaction_id)
+        if replayed is not None:
+            return replayed, None
+
+        # Find receiver by phone link
+        account_number = phone_directory.get_account_number(receiver_phone)
+        if not account_number:
+            return SinpeService._rejected(
+                "Número de teléfono no está vinculado a ninguna cuenta"
+            )
+
+        receiver_acc = Account.query.filter_by(number=account_number).first()
+        if not receiver_acc:
+            return SinpeService._rejected("Cuenta destino no encontrada")
+
+        blocked = screen and SinpeService._screen_incoming(transfer, receiver_acc)
+        if blocked:
+            return SinpeService._rejected(blocked)
+
+        # Claim the transaction id first; a concurrent retry stops here
+        claim = incoming_transfers.claim(transaction_id, "sinpe_movil_incoming")
+
+        # Credit funds to receiver account
+        posting_engine.post([(receiver_acc.id, transfer.amount)])
+
+        # Create transaction record
+        transaction = Transaction(
+            transaction_id=transaction_id,
+            from_account_id=None,  # External transfer
+            to_account_id=receiver_acc.id,
+            amount=transfer.amount,
+            currency=transfer.currency,
+            description=f"SINPE Móvil: {transfer.description}",
+            sender_phone=transfer.sender_phone,
+            receiver_phone=receiver_phone,
+            status="completed",
+            transaction_type="sinpe_movil_incoming",
+        )
+
+        db.session.add(transaction)
+
+        result = TransferResult(
+            success=True,
+            transaction_id=transaction_id,
+            receiver_phone=receiver_phone,
+            receiver_account=receiver_acc.number,
+            amount=float(transfer.amount),
+            new_balance=float(receiver_acc.balance),
+        )
+        incoming_transfers.complete(claim, result)
+        return result, transaction
+
+    @staticmethod
+    def _screen_incoming(
+        transfer: IncomingTransfer, receiver_acc: Account
+    ) -> Optional[str]:
+        """Fraud-score an incoming transfer; returns the rejection if blocked"""
+        return SinpeService._fraud_check(
+            MonitoringInput(
+                amount=transfer.amount,
+                transaction_type=(
+                    "sinpe_movil" if transfer.kind == SINPE_MOVIL else "sinpe_transfer"
+                ),
+                currency=transfer.currency,
+                sender_phone=transfer.sender_phone or None,
+                receiver_phone=transfer.receiver_phone or None,
                 to_account_id=receiver_acc.id,
-                amount=transfer_amount,
-                currency=currency,
-                description=f"SINPE Móvil: {description}",
-                sender_phone=sender_phone,
-                receiver_phone=receiver_phone,
-                status="completed",
-                transaction_type="sinpe_movil_incoming",
+                timestamp=transfer.timestamp,
             )
+        )
 
-            db.session.add(transaction)
-            db.session.commit()
+    @staticmethod
+    def _rejected(error: str):
+        """Result of a transfer rejected before anything was credited"""
+        return TransferResult(success=False, error=error), None
 
-            return {
-                "success": True,
-                "transaction_id": transaction_id,
-                "receiver_phone": receiver_phone,
-                "receiver_account": receiver_acc.number,
-                "amount": float(transfer_amount),
-                "new_balance": float(receiver_acc.balance),
-            }
+    @staticmethod
+    def _error_result(transfer: IncomingTransfer, error: Exception) -> TransferResult:
+        kind = (
+            "transferencia móvil" if transfer.kind == SINPE_MOVIL else "transferencia"
+        )
+        return TransferResult(
+            success=False, error=f"Error procesando {kind}: {str(error)}"
+        )
 
-        except Exception as e:
-            db.session.rollback()
-            return {
-                "success": False,
-                "error": f"Error procesando transferencia móvil: {str(e)}",
-            }
+    @staticmethod
+    def _duplicate_result(transaction_id: str) -> TransferResult:
+        return TransferResult(
+            success=False, error="Transacción duplicada", transaction_id=transaction_id
+        )
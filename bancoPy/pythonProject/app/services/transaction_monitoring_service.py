@@ -4,10 +4,18 @@ Transaction Monitoring Service - Real-time monitoring and fraud detection
 
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from decimal import Decimal
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, case, literal
 from app.models import db, Transaction, Account, PhoneLink
+from app.utils.transfers import MonitoringInput
+from app.services.velocity_counter_service import (
+    velocity_counters,
+    FROM_ACCOUNT,
+    TO_ACCOUNT,
+    SENDER_PHONE,
+    RECEIVER_PHONE,
+)
 import threading
 import time
 
@@ -45,14 +53,20 @@ class TransactionMonitoringService:
                 "rapid_succession": 60,  # Seconds between transactions
                 "account_jumping": 5,  # Max different accounts per hour
             },
+            # Read velocity data from the in-memory counters once warmed up;
+            # disable for multi-process deployments to always aggregate in SQL
+            "use_velocity_counters": True,
         }
 
-    def monitor_transaction(self, transaction_data: Dict) -> Dict:
+    def monitor_transaction(
+        self, transaction_data: Union[MonitoringInput, Dict]
+    ) -> Dict:
         """
         Monitor a transaction in real-time for fraud detection
 
         Args:
-            transaction_data: Transaction data to monitor
+            transaction_data: MonitoringInput (or a legacy dict with the same
+                keys) to monitor
 
         Returns:
             Dict with monitoring results and risk score
@@ -61,13 +75,15 @@ class TransactionMonitoringService:
             risk_score = 0
             alerts = []
 
-            # Extract key information
-            amount = Decimal(str(transaction_data.get("amount", 0)))
-            transaction_type = transaction_data.get("transaction_type", "unknown")
-            sender_phone = transaction_data.get("sender_phone")
-            receiver_phone = transaction_data.get("receiver_phone")
-            from_account_id = transaction_data.get("from_account_id")
-            to_account_id = transaction_data.get("to_account_id")
+            if not isinstance(transaction_data, MonitoringInput):
+                transaction_data = MonitoringInput.from_dict(transaction_data)
+
+            amount = transaction_data.amount
+            transaction_type = transaction_data.transaction_type
+            sender_phone = transaction_data.sender_phone
+            receiver_phone = transaction_data.receiver_phone
+            from_account_id = transaction_data.from_account_id
+            to_account_id = transaction_data.to_account_id
 
             # Rule 1: Check single transaction limits
             single_limit_check = self._check_single_transaction_limit(
@@ -160,18 +176,7 @@ class TransactionMonitoringService:
             return {"passed": True, "message": ""}
 
         try:
-            # Get today's transactions
-            today = datetime.utcnow().date()
-            daily_transactions = Transaction.query.filter(
-                and_(
-                    Transaction.from_account_id == account_id,
-                    func.date(Transaction.created_at) == today,
-                    Transaction.status == "completed",
-                )
-            ).all()
-
-            # Calculate daily total
-            daily_total = sum(tx.amount for tx in daily_transactions)
+            daily_total = self._daily_sent_total(account_id)
             new_total = daily_total + amount
 
             # Check limit
@@ -195,24 +200,17 @@ class TransactionMonitoringService:
     ) -> Dict:
         """Check transaction velocity (frequency)"""
         try:
-            # Check last minute activity
-            one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
+            max_per_minute = self.fraud_rules["velocity_thresholds"][
+                "transactions_per_minute"
+            ]
+
+            recent_by_account, recent_by_phone = self._sent_last_minute(
+                account_id, phone
+            )
 
             # Check by account
             if account_id:
-                recent_by_account = Transaction.query.filter(
-                    and_(
-                        Transaction.from_account_id == account_id,
-                        Transaction.created_at >= one_minute_ago,
-                    )
-                ).count()
-
-                if (
-                    recent_by_account
-                    >= self.fraud_rules["velocity_thresholds"][
-                        "transactions_per_minute"
-                    ]
-                ):
+                if recent_by_account >= max_per_minute:
                     return {
                         "passed": False,
                         "message": "Demasiadas transacciones por minuto desde esta cuenta",
@@ -220,19 +218,7 @@ class TransactionMonitoringService:
 
             # Check by phone
             if phone:
-                recent_by_phone = Transaction.query.filter(
-                    and_(
-                        Transaction.sender_phone == phone,
-                        Transaction.created_at >= one_minute_ago,
-                    )
-                ).count()
-
-                if (
-                    recent_by_phone
-                    >= self.fraud_rules["velocity_thresholds"][
-                        "transactions_per_minute"
-                    ]
-                ):
+                if recent_by_phone >= max_per_minute:
                     return {
                         "passed": False,
                         "message": "Demasiadas transacciones por minuto desde este teléfono",
@@ -244,12 +230,12 @@ class TransactionMonitoringService:
             logger.error(f"Error checking velocity limits: {str(e)}")
             return {"passed": True, "message": ""}
 
-    def _check_suspicious_patterns(self, transaction_data: Dict) -> Dict:
+    def _check_suspicious_patterns(self, transaction_data: MonitoringInput) -> Dict:
         """Check for suspicious transaction patterns"""
         alerts = []
         risk_score = 0
 
-        amount = Decimal(str(transaction_data.get("amount", 0)))
+        amount = transaction_data.amount
 
         # Check for round amounts
         if self.fraud_rules["suspicious_patterns"]["round_amounts"]:
@@ -260,17 +246,11 @@ class TransactionMonitoringService:
                 risk_score += 10
 
         # Check for rapid succession (if timestamp provided)
-        timestamp = transaction_data.get("timestamp")
-        if timestamp and transaction_data.get("from_account_id"):
+        if transaction_data.timestamp and transaction_data.from_account_id:
             try:
-                recent_transactions = Transaction.query.filter(
-                    and_(
-                        Transaction.from_account_id
-                        == transaction_data["from_account_id"],
-                        Transaction.created_at
-                        >= datetime.utcnow() - timedelta(seconds=60),
-                    )
-                ).count()
+                recent_transactions, _ = self._sent_last_minute(
+                    transaction_data.from_account_id, None
+                )
 
                 if recent_transactions > 0:
                     alerts.append("Transacciones en sucesión rápida")
@@ -289,27 +269,8 @@ class TransactionMonitoringService:
             if not receiver_phone and not to_account_id:
                 return {"passed": True, "message": ""}
 
-            # Check if recipient receives unusually high volume
-            one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-
-            received_count = 0
-            if receiver_phone:
-                received_count += Transaction.query.filter(
-                    and_(
-                        Transaction.receiver_phone == receiver_phone,
-                        Transaction.created_at >= one_hour_ago,
-                        Transaction.status == "completed",
-                    )
-                ).count()
-
-            if to_account_id:
-                received_count += Transaction.query.filter(
-                    and_(
-                        Transaction.to_account_id == to_account_id,
-                        Transaction.created_at >= one_hour_ago,
-                        Transaction.status == "completed",
-                    )
-                ).count()
+            # Check if recipient receives unusually high volume in the last hour
+            received_count = self._received_last_hour(receiver_phone, to_account_id)
 
             if received_count > 20:  # More than 20 transactions per hour
                 return {
@@ -323,6 +284,120 @@ class TransactionMonitoringService:
             logger.error(f"Error checking recipient patterns: {str(e)}")
             return {"passed": True, "message": ""}
 
+    def _use_counters(self) -> bool:
+        """Counters are only authoritative once warmed up in this process"""
+        return (
+            self.fraud_rules.get("use_velocity_counters", True)
+            and velocity_counters.is_warm
+        )
+
+    def _daily_sent_total(self, account_id: int) -> Decimal:
+        """Today's completed amount sent from an account"""
+        if self._use_counters():
+            return velocity_counters.snapshot(FROM_ACCOUNT, account_id)["day_amount"]
+
+        now = datetime.utcnow()
+        start_of_day = datetime(now.year, now.month, now.day)
+        total = (
+            db.session.query(func.sum(Transaction.amount))
+            .filter(
+                Transaction.from_account_id == account_id,
+                Transaction.created_at >= start_of_day,
+                Transaction.created_at < start_of_day + timedelta(days=1),
+                Transaction.status == "completed",
+            )
+            .scalar()
+        )
+        return Decimal(str(total or 0))
+
+    def _sent_last_minute(
+        self, account_id: Optional[int], phone: Optional[str]
+    ) -> Tuple[int, int]:
+        """Transactions sent in the last minute by account and by phone"""
+        if not account_id and not phone:
+            return 0, 0
+
+        if self._use_counters():
+            by_account = (
+                velocity_counters.snapshot(FROM_ACCOUNT, account_id)["minute_count"]
+                if account_id
+                else 0
+            )
+            by_phone = (
+                velocity_counters.snapshot(SENDER_PHONE, phone)["minute_count"]
+                if phone
+                else 0
+            )
+            return by_account, by_phone
+
+        conditions = []
+        if account_id:
+            conditions.append(Transaction.from_account_id == account_id)
+        if phone:
+            conditions.append(Transaction.sender_phone == phone)
+
+        by_account, by_phone = (
+            db.session.query(
+                func.count(case((conditions[0], 1))) if account_id else literal(0),
+                func.count(case((conditions[-1], 1))) if phone else literal(0),
+            )
+            .filter(
+                Transaction.created_at >= datetime.utcnow() - timedelta(minutes=1),
+                or_(*conditions),
+            )
+            .one()
+        )
+        return by_account or 0, by_phone or 0
+
+    def _received_last_hour(
+        self, receiver_phone: Optional[str], to_account_id: Optional[int]
+    ) -> int:
+        """Completed transactions received in the last hour by phone plus by account"""
+        if self._use_counters():
+            received = 0
+            if receiver_phone:
+                received += velocity_counters.snapshot(RECEIVER_PHONE, receiver_phone)[
+                    "hour_count"
+                ]
+            if to_account_id:
+                received += velocity_counters.snapshot(TO_ACCOUNT, to_account_id)[
+                    "hour_count"
+                ]
+            return received
+
+        conditions = []
+        if receiver_phone:
+            conditions.append(Transaction.receiver_phone == receiver_phone)
+        if to_account_id:
+            conditions.append(Transaction.to_account_id == to_account_id)
+
+        # Each branch is served by its own (column, created_at) index
+        one_hour_ago = datetime.utcnow() - timedelta(hours=1)
+        received = (
+            db.session.query(
+                sum(func.count(case((condition, 1))) for condition in conditions)
+            )
+            .filter(
+                Transaction.created_at >= one_hour_ago,
+                Transaction.status == "completed",
+                or_(*conditions),
+            )
+            .scalar()
+        )
+        return received or 0
+
+    def record_transaction(self, transaction: Transaction):
+        """
+        Feed a committed transaction into the velocity counters
+
+        Args:
+            transaction: Committed Transaction row
+        """
+        try:
+            velocity_counters.record_transaction(transaction)
+        except Exception as e:
+            logger.error(f"Error recording transaction in counters: {str(e)}")
+
     def _calculate_risk_level(self, risk_score: int) -> str:
         """Calculate risk level based on score"""
         if risk_score >= 70:
@@ -397,6 +472,7 @@ class TransactionMonitoringService:
         def background_monitor():
             while self.monitoring_enabled:
                 try:
+                    velocity_counters.prune()
                     self._periodic_checks()
                     time.sleep(300)  # Check every 5 minutes
                 except Exception as e:
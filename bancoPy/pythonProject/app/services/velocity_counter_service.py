@@ -0,0 +1,261 @@
+"""
+Velocity Counter Service - In-memory sliding-window counters for fraud scoring
+Keeps per-minute/hour/day counts and amount sums per account and phone so that
+TransactionMonitoringService can score a transfer without querying the database
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from app.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+# Key namespaces
+FROM_ACCOUNT = "from_account"
+TO_ACCOUNT = "to_account"
+SENDER_PHONE = "sender_phone"
+RECEIVER_PHONE = "receiver_phone"
+
+
+class _RollingWindow:
+    """Rolling time window with running count and amount sum"""
+
+    __slots__ = ("span", "events", "count", "total")
+
+    def __init__(self, span: timedelta):
+        self.span = span
+        self.events = deque()
+        self.count = 0
+        self.total = Decimal("0")
+
+    def add(self, when: datetime, amount: Decimal):
+        self.events.append((when, amount))
+        self.count += 1
+        self.total += amount
+
+    def expire(self, now: datetime):
+        cutoff = now - self.span
+        events = self.events
+        while events and events[0][0] < cutoff:
+            _, amount = events.popleft()
+            self.count -= 1
+            self.total -= amount
+
+
+class _DailyWindow:
+    """Calendar-day (UTC) bucket, matches the daily limit semantics"""
+
+    __slots__ = ("day", "count", "total")
+
+    def __init__(self):
+        self.day = None
+        self.count = 0
+        self.total = Decimal("0")
+
+    def add(self, when: datetime, amount: Decimal):
+        day = when.date()
+        if day != self.day:
+            if self.day is not None and day < self.day:
+                return  # Late event from a previous day
+            self.day = day
+            self.count = 0
+            self.total = Decimal("0")
+        self.count += 1
+        self.total += amount
+
+    def expire(self, now: datetime):
+        if self.day is not None and self.day != now.date():
+            self.day = None
+            self.count = 0
+            self.total = Decimal("0")
+
+
+class _KeyCounters:
+    """Minute, hour and day windows for a single key"""
+
+    __slots__ = ("minute", "hour", "day")
+
+    def __init__(self):
+        self.minute = _RollingWindow(timedelta(minutes=1))
+        self.hour = _RollingWindow(timedelta(hours=1))
+        self.day = _DailyWindow()
+
+    def add(self, when: datetime, amount: Decimal):
+        self.minute.add(when, amount)
+        self.hour.add(when, amount)
+        self.day.add(when, amount)
+
+    def expire(self, now: datetime):
+        self.minute.expire(now)
+        self.hour.expire(now)
+        self.day.expire(now)
+
+    def is_empty(self) -> bool:
+        return not self.hour.events and self.day.count == 0
+
+
+class VelocityCounterStore:
+    """Thread-safe sliding-window counters keyed by account id and phone"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, object], _KeyCounters] = {}
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    def record(
+        self,
+        amount,
+        from_account_id: Optional[int] = None,
+        to_account_id: Optional[int] = None,
+        sender_phone: Optional[str] = None,
+        receiver_phone: Optional[str] = None,
+        when: Optional[datetime] = None,
+    ):
+        """
+        Record a committed transfer in every window it belongs to
+
+        Args:
+            amount: Transfer amount
+            from_account_id: Local sender account id (if any)
+            to_account_id: Local receiver account id (if any)
+            sender_phone: Sender phone number (if any)
+            receiver_phone: Receiver phone number (if any)
+            when: Commit time, defaults to now (UTC)
+        """
+        when = when or datetime.utcnow()
+        amount = Decimal(str(amount))
+        keys = [
+            (FROM_ACCOUNT, from_account_id),
+            (TO_ACCOUNT, to_account_id),
+            (SENDER_PHONE, sender_phone),
+            (RECEIVER_PHONE, receiver_phone),
+        ]
+
+        with self._lock:
+            for key in keys:
+                if key[1] is None:
+                    continue
+                counters = self._counters.get(key)
+                if counters is None:
+                    counters = self._counters[key] = _KeyCounters()
+                counters.add(when, amount)
+
+    def record_transaction(self, transaction: Transaction):
+        """Record a committed Transaction row"""
+        self.record(
+            transaction.amount,
+            from_account_id=transaction.from_account_id,
+            to_account_id=transaction.to_account_id,
+            sender_phone=transaction.sender_phone,
+            receiver_phone=transaction.receiver_phone,
+            when=transaction.created_at,
+        )
+
+    def snapshot(self, namespace: str, key) -> Dict:
+        """
+        Get current window values for a key
+
+        Args:
+            namespace: One of FROM_ACCOUNT, TO_ACCOUNT, SENDER_PHONE, RECEIVER_PHONE
+            key: Account id or phone number
+
+        Returns:
+            Dict with count/amount for the minute, hour and day windows
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            counters = self._counters.get((namespace, key))
+            if counters is None:
+                return {
+                    "minute_count": 0,
+                    "minute_amount": Decimal("0"),
+                    "hour_count": 0,
+                    "hour_amount": Decimal("0"),
+                    "day_count": 0,
+                    "day_amount": Decimal("0"),
+                }
+
+            counters.expire(now)
+            return {
+                "minute_count": counters.minute.count,
+                "minute_amount": counters.minute.total,
+                "hour_count": counters.hour.count,
+                "hour_amount": counters.hour.total,
+                "day_count": counters.day.count,
+                "day_amount": counters.day.total,
+            }
+
+    def warm_up(self) -> int:
+        """
+        Load today's and the last hour's completed transactions from the database.
+        Must be called inside an application context.
+
+        Returns:
+            Number of transactions loaded
+        """
+        now = datetime.utcnow()
+        start_of_day = datetime(now.year, now.month, now.day)
+        since = min(start_of_day, now - timedelta(hours=1))
+
+        rows = (
+            Transaction.query.with_entities(
+                Transaction.amount,
+                Transaction.from_account_id,
+                Transaction.to_account_id,
+                Transaction.sender_phone,
+                Transaction.receiver_phone,
+                Transaction.created_at,
+            )
+            .filter(
+                Transaction.created_at >= since,
+                Transaction.status == "completed",
+            )
+            .order_by(Transaction.created_at)
+            .all()
+        )
+
+        with self._lock:
+            self._counters.clear()
+        for amount, from_id, to_id, sender, receiver, created_at in rows:
+            self.record(
+                amount,
+                from_account_id=from_id,
+                to_account_id=to_id,
+                sender_phone=sender,
+                receiver_phone=receiver,
+                when=created_at,
+            )
+
+        self.is_warm = True
+        logger.info(f"Velocity counters warmed up with {len(rows)} transactions")
+        return len(rows)
+
+    def prune(self):
+        """Drop keys whose windows are all empty"""
+        now = datetime.utcnow()
+        with self._lock:
+            for key in list(self._counters):
+                counters = self._counters[key]
+                counters.expire(now)
+                if counters.is_empty():
+                    del self._counters[key]
+
+    def reset(self):
+        """Clear all counters and mark the store as cold"""
+        with self._lock:
+            self._counters.clear()
+        self.is_warm = False
+
+    def get_stats(self) -> Dict:
+        """Get store statistics for monitoring"""
+        with self._lock:
+            return {"is_warm": self.is_warm, "tracked_keys": len(self._counters)}
+
+
+# Global instance
+velocity_counters = VelocityCounterStore()
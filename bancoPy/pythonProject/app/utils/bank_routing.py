@@ -0,0 +1,207 @@
+"""
+Bank routing table - bank code -> peer endpoint, built once from contactos-bancos.json
+The table is immutable and swapped atomically when the file's mtime changes,
+so lookups are a dict access with no parsing or file I/O
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTACTS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "contactos-bancos.json",
+)
+
+# Same shape as api_endpoints in config/banks.json; phone_lookup answers 200
+# with the phone link (or true) when the bank has the phone number linked
+DEFAULT_ENDPOINTS = {
+    "sinpe_transfer": "/api/sinpe-transfer",
+    "sinpe_movil": "/api/sinpe-movil-transfer",
+    "health": "/health",
+    "phone_lookup": "/api/phone-links/phone/{phone}",
+}
+
+
+def normalize_bank_code(bank_code) -> Optional[str]:
+    """Normalize a bank code to the 4-digit form used in IBANs (152 -> 0152)"""
+    if bank_code is None:
+        return None
+    digits = "".join(filter(str.isdigit, str(bank_code)))
+    return digits.zfill(4) if digits else None
+
+
+def bank_code_from_iban(iban: str) -> Optional[str]:
+    """Extract the 4-digit bank code from a CR IBAN (dashed or compact)"""
+    clean_iban = (iban or "").replace("-", "")
+    if len(clean_iban) < 8:
+        return None
+    return clean_iban[4:8]
+
+
+def contact_bank_code(contact: Mapping) -> Optional[str]:
+    """4-digit bank code of a contactos-bancos.json entry (IBAN first, then codigo)"""
+    return normalize_bank_code(
+        bank_code_from_iban(contact.get("IBAN", "")) or contact.get("codigo")
+    )
+
+
+@dataclass(frozen=True)
+class BankRoute:
+    """Endpoint of one peer bank"""
+
+    bank_code: str  # 4 digits, e.g. "0119"
+    name: str
+    contact: str
+    address: str  # host:port
+    enabled: bool
+    sinpe_path: str = DEFAULT_ENDPOINTS["sinpe_transfer"]
+    movil_path: str = DEFAULT_ENDPOINTS["sinpe_movil"]
+    health_path: str = DEFAULT_ENDPOINTS["health"]
+    phone_path: str = DEFAULT_ENDPOINTS["phone_lookup"]
+
+    def base_url(self, protocol: str = "https") -> str:
+        return f"{protocol}://{self.address}"
+
+    def phone_lookup_path(self, phone: str) -> str:
+        """Path of the peer's phone ownership check for one number"""
+        return self.phone_path.format(phone=phone)
+
+
+@dataclass(frozen=True)
+class BankRoutingTable:
+    """Immutable snapshot of the bank directory"""
+
+    routes: Mapping[str, BankRoute]
+    contacts: Tuple[Mapping, ...]
+    mtime: Optional[float] = None
+
+    def get(self, bank_code) -> Optional[BankRoute]:
+        return self.routes.get(normalize_bank_code(bank_code))
+
+    @staticmethod
+    def from_contacts(contacts, mtime: float = None) -> "BankRoutingTable":
+        """
+        Build a table from contactos-bancos.json entries
+
+        Entries without an IP are kept as contacts but not routed. When two
+        entries share a bank code the first one wins.
+        """
+        routes = {}
+        for contact in contacts:
+            address = contact.get("IP")
+            bank_code = contact_bank_code(contact)
+            if not address or not bank_code or bank_code in routes:
+                continue
+
+            endpoints = {**DEFAULT_ENDPOINTS, **contact.get("api_endpoints", {})}
+            routes[bank_code] = BankRoute(
+                bank_code=bank_code,
+                name=contact.get("banco", ""),
+                contact=contact.get("contacto", ""),
+                address=address,
+                enabled=contact.get("enabled", True),
+                sinpe_path=endpoints["sinpe_transfer"],
+                movil_path=endpoints["sinpe_movil"],
+                health_path=endpoints["health"],
+                phone_path=endpoints["phone_lookup"],
+            )
+
+        return BankRoutingTable(
+            routes=MappingProxyType(routes),
+            contacts=tuple(MappingProxyType(dict(c)) for c in contacts),
+            mtime=mtime,
+        )
+
+
+class BankRoutingRegistry:
+    """Holds the current routing table and reloads it when the file changes"""
+
+    def __init__(
+        self, path: Optional[str] = CONTACTS_FILE, check_interval: float = 1.0
+    ):
+        """
+        Args:
+            path: contactos-bancos.json path (None for a fixed in-memory table)
+            check_interval: Minimum seconds between mtime checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._table = BankRoutingTable(MappingProxyType({}), ())
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> BankRoutingTable:
+        """Current table, reloaded first if the file changed"""
+        now = time.monotonic()
+        if self.path and now >= self._next_check:
+            self._reload_if_changed(now)
+        return self._table
+
+    def get(self, bank_code) -> Optional[BankRoute]:
+        """Route for a 3- or 4-digit bank code, or None"""
+        return self.table.get(bank_code)
+
+    def routes(self, enabled_only: bool = False) -> Tuple[BankRoute, ...]:
+        """All routes, optionally only enabled banks"""
+        return tuple(
+            route
+            for route in self.table.routes.values()
+            if route.enabled or not enabled_only
+        )
+
+    def load_contacts(self, contacts) -> BankRoutingTable:
+        """
+        Swap in a table built from contact entries instead of the file
+
+        Args:
+            contacts: contactos-bancos.json style entries
+
+        Returns:
+            The new table
+        """
+        table = BankRoutingTable.from_contacts(contacts)
+        with self._lock:
+            self.path = None
+            self._table = table
+        return table
+
+    def _reload_if_changed(self, now: float):
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except FileNotFoundError:
+                logger.error(f"File not found: {self.path}")
+                return
+            if mtime == self._table.mtime:
+                return
+
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    contacts = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                # Keep serving the previous table
+                logger.error(f"Invalid bank contacts in {self.path}: {e}")
+                return
+
+            self._table = BankRoutingTable.from_contacts(contacts, mtime)
+            logger.info(
+                f"Bank routing table loaded: {len(self._table.routes)} banks "
+                f"from {self.path}"
+            )
+
+
+# Global instance
+bank_routing = BankRoutingRegistry()
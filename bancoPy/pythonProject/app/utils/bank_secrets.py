@@ -0,0 +1,253 @@
+"""
+Bank secret registry - sender bank code -> HMAC verifier
+Each peer bank signs with its own secret, message format and digest, declared
+in the "hmac" block of its contactos-bancos.json entry:
+
+    "hmac": {"formato": "concat", "digest": "hmac-md5", "clave": "..."}
+
+The secret can be overridden with the HMAC_SECRET_<bank code> environment
+variable (e.g. HMAC_SECRET_0119). Verifiers are built once per routing table,
+so a lookup is a dict access and no request has to guess the peer's format.
+
+While no bank has its own secret, every sender is checked with the shared
+default secret. Once any bank is configured, senders without a valid
+configuration of their own are rejected.
+"""
+
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from app.utils.bank_routing import (
+    BankRoutingRegistry,
+    BankRoutingTable,
+    bank_code_from_iban,
+    bank_routing,
+    contact_bank_code,
+    normalize_bank_code,
+)
+from app.utils.hmac_generator import (
+    DIGEST_MD5,
+    FORMAT_COMMA,
+    SECRET_KEY,
+    HmacVerifier,
+    get_verifier,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _resolve_bank_code(bank_code, account) -> Optional[str]:
+    """
+    Sender bank from the sender IBAN, checked against the declared bank code
+
+    Raises:
+        ValueError: The declared bank code disagrees with the sender IBAN
+    """
+    declared = normalize_bank_code(bank_code)
+    account = account or ""
+    if not account.upper().startswith("CR"):
+        return declared
+    iban_bank = normalize_bank_code(bank_code_from_iban(account))
+    if declared and iban_bank and declared != iban_bank:
+        raise ValueError(
+            f"Declared bank {declared} does not match sender IBAN bank {iban_bank}"
+        )
+    return iban_bank or declared
+
+
+def sender_bank_code(payload: dict) -> Optional[str]:
+    """
+    4-digit bank code of the bank that sent a transfer payload
+
+    Args:
+        payload: Nested (sender IBAN / sender.bank_code) or flat (sender_account
+            / sender_bank) transfer payload
+
+    Returns:
+        Bank code or None if the payload does not name the sender bank
+
+    Raises:
+        ValueError: The declared bank code disagrees with the sender IBAN
+    """
+    sender = payload.get("sender")
+    if isinstance(sender, dict):
+        return _resolve_bank_code(sender.get("bank_code"), sender.get("account_number"))
+    return _resolve_bank_code(payload.get("sender_bank"), payload.get("sender_account"))
+
+
+def transfer_bank_code(transfer) -> Optional[str]:
+    """
+    4-digit sender bank code of a validated IncomingTransfer
+
+    Raises:
+        ValueError: The declared bank code disagrees with the sender IBAN
+    """
+    return _resolve_bank_code(transfer.sender_bank, transfer.sender_account)
+
+
+class BankSecretRegistry:
+    """Per-bank HMAC verifiers, rebuilt when the routing table changes"""
+
+    def __init__(
+        self, routing: BankRoutingRegistry = None, default_secret: str = SECRET_KEY
+    ):
+        """
+        Args:
+            routing: Bank routing registry holding the contact entries
+            default_secret: Secret for banks without an "hmac" block
+        """
+        self.routing = routing or bank_routing
+        self.default = get_verifier(default_secret)
+        self._registered: Dict[str, HmacVerifier] = {}
+        self._table: Optional[BankRoutingTable] = None
+        self._verifiers: Mapping[str, HmacVerifier] = MappingProxyType({})
+        self._configured: frozenset = frozenset()
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        bank_code,
+        clave: str,
+        message_format: str = FORMAT_COMMA,
+        digest: str = DIGEST_MD5,
+    ) -> HmacVerifier:
+        """
+        Set a bank's secret, format and digest (takes precedence over the file)
+
+        Args:
+            bank_code: 3- or 4-digit bank code
+            clave: Shared secret
+            message_format: FORMAT_COMMA or FORMAT_CONCAT
+            digest: DIGEST_MD5, DIGEST_HMAC_MD5 or DIGEST_HMAC_SHA256
+
+        Returns:
+            The bank's verifier
+        """
+        verifier = get_verifier(clave, message_format, digest)
+        with self._lock:
+            self._registered[normalize_bank_code(bank_code)] = verifier
+            self._table = None  # rebuild on next lookup
+        return verifier
+
+    def verifier_for(self, bank_code) -> HmacVerifier:
+        """
+        Verifier to sign for a bank, or the default one for unknown banks
+
+        Args:
+            bank_code: 3- or 4-digit bank code (None for the default)
+
+        Returns:
+            HmacVerifier for the bank
+        """
+        self._refresh()
+        return self._verifiers.get(normalize_bank_code(bank_code)) or self.default
+
+    def sender_verifier(self, bank_code) -> Optional[HmacVerifier]:
+        """
+        Verifier to check a transfer from a sender bank
+
+        Args:
+            bank_code: 3- or 4-digit sender bank code (None if unknown)
+
+        Returns:
+            The bank's verifier; the default one while no bank has its own
+            secret; None when the sender cannot be verified
+        """
+        self._refresh()
+        verifier = self._verifiers.get(normalize_bank_code(bank_code))
+        if verifier is None and not self._configured:
+            return self.default
+        return verifier
+
+    def verify(self, payload: dict, provided_hmac: str) -> bool:
+        """Verify a payload with the verifier of its sender bank"""
+        if not isinstance(payload, dict):
+            return False
+        try:
+            verifier = self.sender_verifier(sender_bank_code(payload))
+        except ValueError:
+            return False
+        return verifier is not None and verifier.verify(payload, provided_hmac)
+
+    def verify_transfer(self, transfer) -> bool:
+        """Verify a validated IncomingTransfer with its sender bank's verifier"""
+        try:
+            verifier = self.sender_verifier(transfer_bank_code(transfer))
+        except ValueError:
+            return False
+        return verifier is not None and verifier.verify_transfer(transfer)
+
+    def verify_transfers(self, transfers) -> List[bool]:
+        """Verify validated IncomingTransfers, one flag per transfer in order"""
+        return [self.verify_transfer(transfer) for transfer in transfers]
+
+    def verify_many(self, payloads, hmac_field: str = "hmac_md5") -> List[bool]:
+        """
+        Verify a batch of payloads, each with the verifier of its sender bank
+
+        Args:
+            payloads: Iterable of transfer payloads
+            hmac_field: Payload key holding the HMAC
+
+        Returns:
+            One validity flag per payload, in order
+        """
+        return [
+            isinstance(payload, dict) and self.verify(payload, payload.get(hmac_field))
+            for payload in payloads
+        ]
+
+    def get_formats(self) -> Dict[str, Dict]:
+        """Format and digest per configured bank (secrets are not exposed)"""
+        self._refresh()
+        return {
+            bank_code: {
+                "message_format": verifier.message_format,
+                "digest": verifier.digest,
+            }
+            for bank_code, verifier in self._verifiers.items()
+        }
+
+    def _refresh(self):
+        table = self.routing.table
+        if table is not self._table:
+            self._rebuild(table)
+
+    def _rebuild(self, table: BankRoutingTable):
+        with self._lock:
+            verifiers = {}
+            configured = set(self._registered)
+            for contact in table.contacts:
+                config = contact.get("hmac")
+                bank_code = contact_bank_code(contact)
+                if not bank_code or bank_code in verifiers:
+                    continue
+                clave = os.environ.get(f"HMAC_SECRET_{bank_code}")
+                if not config and not clave:
+                    continue
+                configured.add(bank_code)
+                config = config or {}
+                try:
+                    clave = clave or config.get("clave")
+                    if not clave:
+                        raise ValueError("missing clave")
+                    verifiers[bank_code] = get_verifier(
+                        clave,
+                        config.get("formato", FORMAT_COMMA),
+                        config.get("digest", DIGEST_MD5),
+                    )
+                except ValueError as e:
+                    # Transfers from this bank are rejected until it is fixed
+                    logger.error(f"Invalid HMAC config for bank {bank_code}: {e}")
+            verifiers.update(self._registered)
+
+            self._verifiers = MappingProxyType(verifiers)
+            self._configured = frozenset(configured)
+            self._table = table
+
+
+# Global instance
+bank_secrets = BankSecretRegistry()
@@ -4,11 +4,21 @@ Provides comprehensive validation with improved security and standards complianc
 """
 
 import re
-from typing import Dict, Tuple, List
-from decimal import Decimal, InvalidOperation
+from typing import Dict, Tuple, List, Union
 from datetime import datetime, timedelta
 import hashlib
 
+from app.utils.validators import parse_amount, parse_timestamp
+
+# Compiled once at import instead of on every call
+UUID_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE
+)
+CLEAN_IBAN_PATTERN = re.compile(r"^CR\d{20}$")
+SEPARATORS_PATTERN = re.compile(r"[-\s]")
+NON_DIGITS_PATTERN = re.compile(r"\D")
+UNSAFE_CHARS_PATTERN = re.compile(r'[<>"\';\\]')
+
 
 def validate_sinpe_payload(payload: Dict) -> Tuple[bool, str]:
     """
@@ -41,25 +51,20 @@ def validate_sinpe_payload(payload: Dict) -> Tuple[bool, str]:
 
     # Validate transaction ID format (UUID)
     transaction_id = payload["transaction_id"]
-    if not re.match(
-        r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
-        transaction_id,
-        re.IGNORECASE,
-    ):
+    if not isinstance(transaction_id, str) or not UUID_PATTERN.match(transaction_id):
         return False, "ID de transacción debe ser un UUID válido"
 
-    # Validate amount
-    try:
-        amount = float(payload["amount"])
-        if amount <= 0:
-            return False, "Monto debe ser mayor a cero"
-        if amount > 10000000:  # 10 million limit
-            return False, "Monto excede el límite máximo"
-        # Check decimal places (max 2)
-        if Decimal(str(amount)).as_tuple().exponent < -2:
-            return False, "Monto no puede tener más de 2 decimales"
-    except (ValueError, InvalidOperation):
+    # Validate amount (parsed once, straight to Decimal)
+    amount = parse_amount(payload["amount"])
+    if amount is None:
         return False, "Monto inválido"
+    if amount <= 0:
+        return False, "Monto debe ser mayor a cero"
+    if amount > 10000000:  # 10 million limit
+        return False, "Monto excede el límite máximo"
+    # Check decimal places (max 2)
+    if amount.normalize().as_tuple().exponent < -2:
+        return False, "Monto no puede tener más de 2 decimales"
 
     # Validate currency
     valid_currencies = ["CRC", "USD"]
@@ -76,9 +81,9 @@ def validate_sinpe_payload(payload: Dict) -> Tuple[bool, str]:
     if not validate_account_format(receiver_account):
         return False, "Formato de cuenta destino inválido"
 
-    # Validate timestamp format (ISO 8601)
-    timestamp = payload["timestamp"]
-    if not validate_timestamp_format(timestamp):
+    # Validate timestamp format (ISO 8601), parsed once for both checks
+    timestamp = parse_timestamp(payload["timestamp"])
+    if timestamp is None:
         return False, "Formato de timestamp inválido (debe ser ISO 8601)"
 
     # Check timestamp is recent (within last hour)
@@ -119,25 +124,20 @@ def validate_sinpe_movil_payload(payload: Dict) -> Tuple[bool, str]:
 
     # Validate transaction ID format (UUID)
     transaction_id = payload["transaction_id"]
-    if not re.match(
-        r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$",
-        transaction_id,
-        re.IGNORECASE,
-    ):
+    if not isinstance(transaction_id, str) or not UUID_PATTERN.match(transaction_id):
         return False, "ID de transacción debe ser un UUID válido"
 
-    # Validate amount
-    try:
-        amount = float(payload["amount"])
-        if amount <= 0:
-            return False, "Monto debe ser mayor a cero"
-        if amount > 1000000:  # 1 million limit for mobile transfers
-            return False, "Monto excede el límite máximo para SINPE Móvil"
-        # Check decimal places (max 2)
-        if Decimal(str(amount)).as_tuple().exponent < -2:
-            return False, "Monto no puede tener más de 2 decimales"
-    except (ValueError, InvalidOperation):
+    # Validate amount (parsed once, straight to Decimal)
+    amount = parse_amount(payload["amount"])
+    if amount is None:
         return False, "Monto inválido"
+    if amount <= 0:
+        return False, "Monto debe ser mayor a cero"
+    if amount > 1000000:  # 1 million limit for mobile transfers
+        return False, "Monto excede el límite máximo para SINPE Móvil"
+    # Check decimal places (max 2)
+    if amount.normalize().as_tuple().exponent < -2:
+        return False, "Monto no puede tener más de 2 decimales"
 
     # Validate currency
     valid_currencies = ["CRC", "USD"]
@@ -158,9 +158,9 @@ def validate_sinpe_movil_payload(payload: Dict) -> Tuple[bool, str]:
     if sender_phone == receiver_phone:
         return False, "Teléfono origen y destino no pueden ser iguales"
 
-    # Validate timestamp format (ISO 8601)
-    timestamp = payload["timestamp"]
-    if not validate_timestamp_format(timestamp):
+    # Validate timestamp format (ISO 8601), parsed once for both checks
+    timestamp = parse_timestamp(payload["timestamp"])
+    if timestamp is None:
         return False, "Formato de timestamp inválido (debe ser ISO 8601)"
 
     # Check timestamp is recent
@@ -189,7 +189,7 @@ def validate_account_format(account: str) -> bool:
 
     # Check if it's a regular account number
     # Costa Rican account numbers are typically 10-20 digits
-    clean_account = re.sub(r"[-\s]", "", account)
+    clean_account = SEPARATORS_PATTERN.sub("", account)
     return clean_account.isdigit() and 10 <= len(clean_account) <= 20
 
 
@@ -207,10 +207,10 @@ def validate_iban_format(iban: str) -> bool:
         return False
 
     # Remove spaces and dashes
-    clean_iban = re.sub(r"[-\s]", "", iban.upper())
+    clean_iban = SEPARATORS_PATTERN.sub("", iban.upper())
 
     # Check basic format
-    if not re.match(r"^CR\d{20}$", clean_iban):
+    if not CLEAN_IBAN_PATTERN.match(clean_iban):
         return False
 
     # Check country code
@@ -253,7 +253,7 @@ def validate_phone_format(phone: str) -> bool:
         return False
 
     # Remove any non-digit characters
-    clean_phone = re.sub(r"\D", "", phone)
+    clean_phone = NON_DIGITS_PATTERN.sub("", phone)
 
     # Costa Rican phone numbers are 8 digits
     if len(clean_phone) != 8:
@@ -276,49 +276,31 @@ def validate_timestamp_format(timestamp: str) -> bool:
     Returns:
         True if valid ISO 8601 format
     """
-    if not timestamp:
-        return False
-
-    # Try to parse ISO 8601 format
-    try:
-        # Handle both with and without 'Z' suffix
-        if timestamp.endswith("Z"):
-            datetime.fromisoformat(timestamp[:-1] + "+00:00")
-        else:
-            datetime.fromisoformat(timestamp)
-        return True
-    except ValueError:
-        return False
+    return parse_timestamp(timestamp) is not None
 
 
-def validate_timestamp_freshness(timestamp: str, max_age_minutes: int = 60) -> bool:
+def validate_timestamp_freshness(
+    timestamp: Union[str, datetime], max_age_minutes: int = 60
+) -> bool:
     """
     Validate that timestamp is recent (within acceptable time window)
 
     Args:
-        timestamp: Timestamp string
+        timestamp: Timestamp string, or a datetime already parsed with
+            parse_timestamp (naive UTC)
         max_age_minutes: Maximum age in minutes
 
     Returns:
         True if timestamp is fresh
     """
-    try:
-        # Parse timestamp
-        if timestamp.endswith("Z"):
-            dt = datetime.fromisoformat(timestamp[:-1] + "+00:00")
-        else:
-            dt = datetime.fromisoformat(timestamp)
-
-        # Remove timezone info for comparison with UTC now
-        dt = dt.replace(tzinfo=None)
-        now = datetime.utcnow()
-
-        # Check if within acceptable window
-        age = abs((now - dt).total_seconds() / 60)
-        return age <= max_age_minutes
+    if not isinstance(timestamp, datetime):
+        timestamp = parse_timestamp(timestamp)
+        if timestamp is None:
+            return False
 
-    except (ValueError, AttributeError):
-        return False
+    # Check if within acceptable window
+    age = abs((datetime.utcnow() - timestamp).total_seconds() / 60)
+    return age <= max_age_minutes
 
 
 def validate_transaction_limits(
@@ -391,7 +373,7 @@ def sanitize_input(input_str: str, max_length: int = 255) -> str:
         return ""
 
     # Remove potentially dangerous characters
-    sanitized = re.sub(r'[<>"\';\\]', "", str(input_str))
+    sanitized = UNSAFE_CHARS_PATTERN.sub("", str(input_str))
 
     # Limit length
     return sanitized[:max_length]
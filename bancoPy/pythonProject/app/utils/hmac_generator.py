@@ -5,8 +5,214 @@ FORMATO CORREGIDO: Compatible con ecosistema inter-banco usando comas como separ
 
 import hashlib
 import hmac
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 SECRET_KEY = "supersecreta123"
+MD5_BLOCK_SIZE = 64
+
+# Message formats: fields joined with commas, or concatenated (PRUEBA server)
+FORMAT_COMMA = "comma"
+FORMAT_CONCAT = "concat"
+SEPARATORS = {FORMAT_COMMA: ",", FORMAT_CONCAT: ""}
+
+# Digests: legacy md5 over "<clave><sep><fields>", or a real keyed HMAC
+DIGEST_MD5 = "md5"
+DIGEST_HMAC_MD5 = "hmac-md5"
+DIGEST_HMAC_SHA256 = "hmac-sha256"
+HMAC_DIGESTS = {DIGEST_HMAC_MD5: hashlib.md5, DIGEST_HMAC_SHA256: hashlib.sha256}
+
+
+class HmacVerifier:
+    """
+    Signer/verifier for one secret key, message format and digest
+
+    The key material is hashed once: the legacy md5 digest starts every
+    message with "<clave><sep>", so the MD5 blocks that prefix fills are
+    hashed once, and HMAC digests keep the keyed inner/outer state. Each
+    message then copies the primed state instead of rehashing the secret.
+    """
+
+    __slots__ = ("message_format", "digest", "_sep", "_primed", "_tail", "_prefix")
+
+    def __init__(
+        self,
+        clave: str = SECRET_KEY,
+        message_format: str = FORMAT_COMMA,
+        digest: str = DIGEST_MD5,
+    ):
+        """
+        Args:
+            clave: Secret key for HMAC generation
+            message_format: FORMAT_COMMA or FORMAT_CONCAT
+            digest: DIGEST_MD5, DIGEST_HMAC_MD5 or DIGEST_HMAC_SHA256
+
+        Raises:
+            ValueError: If the format or digest is unknown
+        """
+        if message_format not in SEPARATORS:
+            raise ValueError(f"Formato de mensaje desconocido: {message_format}")
+        if digest != DIGEST_MD5 and digest not in HMAC_DIGESTS:
+            raise ValueError(f"Algoritmo de digest desconocido: {digest}")
+
+        self.message_format = message_format
+        self.digest = digest
+        self._sep = SEPARATORS[message_format]
+        self._tail = b""
+        self._prefix = ""
+
+        if digest in HMAC_DIGESTS:
+            self._primed = hmac.new(clave.encode(), digestmod=HMAC_DIGESTS[digest])
+            return
+
+        prefix = f"{clave}{self._sep}"
+        encoded = prefix.encode()
+        full_blocks = len(encoded) - len(encoded) % MD5_BLOCK_SIZE
+        if full_blocks:
+            self._primed = hashlib.md5(encoded[:full_blocks])
+            self._tail = encoded[full_blocks:]
+        else:
+            # A shorter prefix shares its block with the message, so a
+            # one-shot hash is cheaper than copying a primed state
+            self._primed = None
+            self._prefix = prefix
+
+    def sign(self, identifier: str, timestamp: str, transaction_id: str, amount) -> str:
+        """
+        Generate the HMAC for one transfer
+
+        Args:
+            identifier: Account number or phone number of the signing party
+            timestamp: ISO 8601 timestamp
+            transaction_id: UUID of transaction
+            amount: Transfer amount
+
+        Returns:
+            HMAC in hexadecimal format
+        """
+        if type(amount) is not float:
+            amount = float(amount)
+        sep = self._sep
+        message = (
+            f"{self._prefix}{identifier}{sep}{timestamp}{sep}"
+            f"{transaction_id}{sep}{amount:.2f}"
+        ).encode()
+        if self._primed is None:
+            return hashlib.md5(message).hexdigest()
+        digest = self._primed.copy()
+        digest.update(self._tail + message)
+        return digest.hexdigest()
+
+    def verify(self, payload: dict, provided_hmac: str) -> bool:
+        """
+        Verify the HMAC of one incoming transfer payload
+
+        Args:
+            payload: Transfer payload containing all fields
+            provided_hmac: HMAC provided in request
+
+        Returns:
+            True if HMAC is valid, False otherwise
+        """
+        if not payload or not provided_hmac:
+            return False
+
+        try:
+            fields = signed_fields(payload)
+            if fields is None:
+                return False
+            # Use constant-time comparison to prevent timing attacks
+            return hmac.compare_digest(self.sign(*fields), provided_hmac.lower())
+        except Exception:
+            return False
+
+    def verify_transfer(self, transfer) -> bool:
+        """
+        Verify a validated IncomingTransfer against the HMAC it carried
+
+        Args:
+            transfer: IncomingTransfer from the payload validator
+
+        Returns:
+            True if HMAC is valid, False otherwise
+        """
+        if not transfer.hmac:
+            return False
+        expected = self.sign(
+            transfer.signer,
+            transfer.signed_timestamp,
+            transfer.transaction_id,
+            transfer.amount,
+        )
+        return hmac.compare_digest(expected, transfer.hmac.lower())
+
+    def verify_many(self, payloads, hmac_field: str = "hmac_md5") -> List[bool]:
+        """
+        Verify a batch of payloads that carry their own HMAC
+
+        Args:
+            payloads: Iterable of transfer payloads
+            hmac_field: Payload key holding the HMAC
+
+        Returns:
+            One validity flag per payload, in order
+        """
+        verify = self.verify
+        return [
+            isinstance(payload, dict) and verify(payload, payload.get(hmac_field))
+            for payload in payloads
+        ]
+
+
+def signed_fields(payload: dict) -> Optional[Tuple]:
+    """
+    Extract the (identifier, timestamp, transaction_id, amount) tuple covered
+    by the HMAC of a transfer payload
+
+    Args:
+        payload: Flat (receiver_phone/receiver_account) or nested (sender)
+            transfer payload
+
+    Returns:
+        Field tuple, or None if the payload has no signing party
+    """
+    if "receiver_phone" in payload:
+        # SINPE Móvil transfer
+        identifier = payload.get("receiver_phone", "")
+    elif "receiver_account" in payload:
+        # Traditional SINPE transfer
+        identifier = payload.get("receiver_account", "")
+    else:
+        # Legacy format: the sender phone or account signs
+        sender = payload.get("sender", {})
+        identifier = (
+            sender.get("phone")
+            or sender.get("phone_number")
+            or sender.get("account_number")
+        )
+        if not identifier:
+            return None
+        amount = payload["amount"]
+        if isinstance(amount, dict):
+            amount = amount["value"]
+        return identifier, payload["timestamp"], payload["transaction_id"], amount
+
+    return (
+        identifier,
+        payload.get("timestamp", ""),
+        payload.get("transaction_id", ""),
+        payload.get("amount", 0),
+    )
+
+
+@lru_cache(maxsize=64)
+def get_verifier(
+    clave: str = SECRET_KEY,
+    message_format: str = FORMAT_COMMA,
+    digest: str = DIGEST_MD5,
+) -> HmacVerifier:
+    """Get the shared verifier for a secret key, message format and digest"""
+    return HmacVerifier(clave, message_format, digest)
 
 
 def generate_hmac_for_account_transfer(
@@ -30,10 +236,8 @@ def generate_hmac_for_account_transfer(
     Returns:
         HMAC in hexadecimal format
     """
-    amount_str = "{:.2f}".format(float(amount))
-    # FORMATO CORREGIDO: Con comas como separadores para compatibilidad inter-banco
-    mensaje = f"{clave},{account_number},{timestamp},{transaction_id},{amount_str}"
-    return hashlib.md5(mensaje.encode()).hexdigest()
+    # Mensaje: "{clave},{cuenta},{timestamp},{transaction_id},{monto:.2f}"
+    return get_verifier(clave).sign(account_number, timestamp, transaction_id, amount)
 
 
 def generate_hmac_for_phone_transfer(
@@ -57,10 +261,8 @@ def generate_hmac_for_phone_transfer(
     Returns:
         HMAC in hexadecimal format
     """
-    amount_str = "{:.2f}".format(float(amount))
-    # FORMATO CORREGIDO: Con comas como separadores para compatibilidad inter-banco
-    mensaje = f"{clave},{phone_number},{timestamp},{transaction_id},{amount_str}"
-    return hashlib.md5(mensaje.encode()).hexdigest()
+    # Mensaje: "{clave},{teléfono},{timestamp},{transaction_id},{monto:.2f}"
+    return get_verifier(clave).sign(phone_number, timestamp, transaction_id, amount)
 
 
 def generar_hmac(
@@ -84,10 +286,7 @@ def generar_hmac(
     Returns:
         HMAC in hexadecimal format
     """
-    amount_str = "{:.2f}".format(float(amount))
-    # CAMBIO CRÍTICO: Usar formato con comas como esperan otros bancos
-    mensaje = f"{clave},{account_number},{timestamp},{transaction_id},{amount_str}"
-    return hashlib.md5(mensaje.encode()).hexdigest()
+    return get_verifier(clave).sign(account_number, timestamp, transaction_id, amount)
 
 
 def verify_hmac(payload: dict, provided_hmac: str, clave: str = SECRET_KEY) -> bool:
@@ -102,68 +301,7 @@ def verify_hmac(payload: dict, provided_hmac: str, clave: str = SECRET_KEY) -> b
     Returns:
         True if HMAC is valid, False otherwise
     """
-    if not payload or not provided_hmac:
-        return False
-
-    try:
-        # Extract required fields based on transfer type
-        if "receiver_phone" in payload:
-            # SINPE Móvil transfer
-            phone = payload.get("receiver_phone", "")
-            timestamp = payload.get("timestamp", "")
-            transaction_id = payload.get("transaction_id", "")
-            amount = payload.get("amount", 0)
-
-            expected_hmac = generate_hmac_for_phone_transfer(
-                phone, timestamp, transaction_id, amount, clave
-            )
-        elif "receiver_account" in payload:
-            # Traditional SINPE transfer
-            account = payload.get("receiver_account", "")
-            timestamp = payload.get("timestamp", "")
-            transaction_id = payload.get("transaction_id", "")
-            amount = payload.get("amount", 0)
-
-            expected_hmac = generate_hmac_for_account_transfer(
-                account, timestamp, transaction_id, amount, clave
-            )
-        else:
-            # Try legacy format
-            sender = payload.get("sender", {})
-            if sender.get("phone"):
-                # Phone-based transfer (SINPE Móvil)
-                expected_hmac = generate_hmac_for_phone_transfer(
-                    sender["phone"],
-                    payload["timestamp"],
-                    payload["transaction_id"],
-                    (
-                        payload["amount"]["value"]
-                        if isinstance(payload["amount"], dict)
-                        else payload["amount"]
-                    ),
-                    clave,
-                )
-            elif sender.get("account_number"):
-                # Account-based transfer (SINPE)
-                expected_hmac = generate_hmac_for_account_transfer(
-                    sender["account_number"],
-                    payload["timestamp"],
-                    payload["transaction_id"],
-                    (
-                        payload["amount"]["value"]
-                        if isinstance(payload["amount"], dict)
-                        else payload["amount"]
-                    ),
-                    clave,
-                )
-            else:
-                return False
-
-        # Use constant-time comparison to prevent timing attacks
-        return hmac.compare_digest(expected_hmac.lower(), provided_hmac.lower())
-
-    except Exception:
-        return False
+    return get_verifier(clave).verify(payload, provided_hmac)
 
 
 def extract_bank_code_from_iban(iban: str) -> str:
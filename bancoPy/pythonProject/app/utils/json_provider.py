@@ -0,0 +1,111 @@
+"""
+Flask JSON provider backed by orjson, with a stdlib fallback
+Decimal and datetime values are encoded natively (Decimal as a number,
+datetime as ISO 8601, the same output as the models' to_dict), so routes can
+hand column values straight to jsonify without per-field conversion.
+"""
+
+import dataclasses
+import decimal
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+# Optional fast JSON encoder
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(o: Any) -> Any:
+    """Encode types the JSON encoder does not handle natively"""
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider using orjson when installed and the stdlib json otherwise
+
+    Both paths produce the same documents: Decimal as float, date/datetime as
+    isoformat(), dataclasses as objects. Keys keep insertion order, matching
+    JSON_SORT_KEYS=False in create_app (a setting Flask >= 2.3 ignores).
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+    def __init__(self, app, use_orjson: bool = ORJSON_AVAILABLE):
+        """
+        Args:
+            app: Flask application
+            use_orjson: Encode and decode with orjson (default: if installed)
+        """
+        super().__init__(app)
+        self.use_orjson = use_orjson and ORJSON_AVAILABLE
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to a JSON string (stdlib kwargs force the stdlib path)"""
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(
+                obj, default=self.default, option=self._orjson_options()
+            ).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        """Deserialize JSON; input orjson rejects is retried with the stdlib"""
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # NaN/Infinity literals and integers beyond 64 bits
+                pass
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """Build a JSON response, encoding straight to bytes with orjson"""
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj,
+            default=self.default,
+            option=self._orjson_options(indent) | orjson.OPT_APPEND_NEWLINE,
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def column_records(keys: Sequence[str], rows: Iterable[Sequence]) -> List[Dict]:
+    """
+    Turn column tuples from a select() into response records
+
+    Args:
+        keys: Output key per column
+        rows: Result rows (tuples of column values)
+
+    Returns:
+        One dict per row; Decimal/datetime values are left to the provider
+    """
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination helpers
+Pages are ordered newest first by (created_at, id); the cursor encodes the
+last row of a page so the next page is a range seek instead of an OFFSET scan
+"""
+
+import base64
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import literal, tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+CursorKey = Tuple[datetime, int]
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor
+
+    Args:
+        created_at: Creation timestamp of the last row returned
+        row_id: Primary key of the last row returned
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> CursorKey:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        (created_at, id) tuple
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        )
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+
+def parse_page_args(args) -> Tuple[int, Optional[CursorKey], bool]:
+    """
+    Read limit, cursor and include_total from request query arguments
+
+    `per_page` is accepted as an alias of `limit` for older clients.
+
+    Args:
+        args: request.args
+
+    Returns:
+        Tuple of (limit, cursor key or None, include_total)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = args.get(
+        "limit", args.get("per_page", DEFAULT_PAGE_SIZE, type=int), type=int
+    )
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    cursor = args.get("cursor")
+    after = decode_cursor(cursor) if cursor else None
+
+    include_total = args.get("include_total", "false").lower() in ("1", "true", "yes")
+    return limit, after, include_total
+
+
+def newest_first(created_at_column, id_column) -> tuple:
+    """ORDER BY clause for keyset pages"""
+    return created_at_column.desc(), id_column.desc()
+
+
+def after_cursor(created_at_column, id_column, after: CursorKey):
+    """WHERE clause selecting rows that sort after the cursor (older rows)"""
+    created_at, row_id = after
+    return tuple_(created_at_column, id_column) < tuple_(
+        literal(created_at, created_at_column.type), literal(row_id, id_column.type)
+    )
+
+
+def build_page(rows: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Trim a result fetched with limit + 1 rows and compute the next cursor
+
+    Args:
+        rows: Rows ordered by newest_first, at most limit + 1
+        limit: Page size
+
+    Returns:
+        Tuple of (page rows, next cursor or None on the last page)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
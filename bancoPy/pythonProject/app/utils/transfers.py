@@ -0,0 +1,139 @@
+"""
+Typed transfer objects shared by SINPE routes, validators and services
+Payloads are parsed once at the edge; later stages read typed attributes
+instead of re-walking dicts and re-converting amounts and timestamps.
+All classes are slotted, so each instance is a fixed-size record without a
+per-instance __dict__.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Mapping, Optional
+
+# Transfer kinds (same values as the outbox kinds)
+SINPE = "sinpe"
+SINPE_MOVIL = "sinpe_movil"
+
+
+@dataclass(frozen=True, slots=True)
+class IncomingTransfer:
+    """Normalized transfer received from a peer bank"""
+
+    kind: str  # SINPE or SINPE_MOVIL
+    transaction_id: str
+    amount: Decimal
+    currency: str
+    timestamp: Optional[datetime]  # naive UTC
+    description: str = ""
+    version: str = "1.0"
+    sender_account: str = ""
+    sender_bank: str = ""
+    sender_name: str = ""
+    sender_phone: str = ""
+    receiver_account: str = ""
+    receiver_bank: str = ""
+    receiver_name: str = ""
+    receiver_phone: str = ""
+    signed_timestamp: str = ""  # timestamp exactly as signed by the peer
+    hmac: str = ""
+
+    @property
+    def signer(self) -> str:
+        """Identifier covered by the HMAC (sender phone, else sender account)"""
+        return self.sender_phone or self.sender_account
+
+
+@dataclass(frozen=True, slots=True)
+class OutgoingTransfer:
+    """Transfer queued for delivery to a peer bank"""
+
+    kind: str  # SINPE or SINPE_MOVIL
+    transaction_id: str
+    timestamp: str  # ISO 8601, signed as-is
+    amount: Decimal
+    currency: str
+    sender: Mapping
+    receiver: Mapping
+    description: str = ""
+    version: str = "1.0"
+
+    @property
+    def signer(self) -> str:
+        """Sender phone (SINPE Móvil) or account number (SINPE)"""
+        field = "phone_number" if self.kind == SINPE_MOVIL else "account_number"
+        return self.sender[field]
+
+    @property
+    def destination(self) -> str:
+        """Receiver phone (SINPE Móvil) or account number (SINPE)"""
+        field = "phone_number" if self.kind == SINPE_MOVIL else "account_number"
+        return self.receiver[field]
+
+    def to_payload(self, hmac_md5: str) -> Dict:
+        """Wire payload in the inter-bank format"""
+        return {
+            "version": self.version,
+            "timestamp": self.timestamp,
+            "transaction_id": self.transaction_id,
+            "sender": dict(self.sender),
+            "receiver": dict(self.receiver),
+            "amount": {"value": float(self.amount), "currency": self.currency},
+            "description": self.description,
+            "hmac_md5": hmac_md5,
+        }
+
+
+@dataclass(slots=True)
+class MonitoringInput:
+    """Fields the fraud monitor scores for one transfer"""
+
+    amount: Decimal
+    transaction_type: str = "unknown"
+    currency: str = "CRC"
+    sender_phone: Optional[str] = None
+    receiver_phone: Optional[str] = None
+    from_account_id: Optional[int] = None
+    to_account_id: Optional[int] = None
+    timestamp: Optional[datetime] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "MonitoringInput":
+        """Build from the legacy transaction_data dict"""
+        amount = data.get("amount", 0)
+        return cls(
+            amount=amount if isinstance(amount, Decimal) else Decimal(str(amount)),
+            transaction_type=data.get("transaction_type", "unknown"),
+            currency=data.get("currency", "CRC"),
+            sender_phone=data.get("sender_phone"),
+            receiver_phone=data.get("receiver_phone"),
+            from_account_id=data.get("from_account_id"),
+            to_account_id=data.get("to_account_id"),
+            timestamp=data.get("timestamp"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TransferResult:
+    """Outcome of processing an incoming transfer"""
+
+    success: bool
+    transaction_id: Optional[str] = None
+    error: Optional[str] = None
+    receiver_account: Optional[str] = None
+    receiver_phone: Optional[str] = None
+    amount: Optional[float] = None
+    new_balance: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        """Response dict; fields that do not apply are omitted"""
+        result = {"success": self.success}
+        for field in TransferResult.__slots__[1:]:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "TransferResult":
+        return cls(**{field: data.get(field) for field in cls.__slots__})
@@ -3,136 +3,245 @@ Validadores para transferencias SINPE
 Garantizan compatibilidad con protocolo estándar inter-banco
 """
 
-from typing import Tuple, Dict, Any
-from datetime import datetime
+from typing import Tuple, Dict, Any, Optional
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
 import re
 
-
-def validate_sinpe_payload(data: Dict[Any, Any]) -> Tuple[bool, str]:
+from app.utils.transfers import IncomingTransfer, SINPE, SINPE_MOVIL
+
+# Patrones compilados una sola vez
+IBAN_PATTERN = re.compile(r"^CR\d{2}-\d{4}-\d{4}-\d{2}-\d{4}-\d{4}-\d{2}$")
+PHONE_PATTERN = re.compile(r"^[678]\d{7}$")
+BANK_CODE_PATTERN = re.compile(r"^\d{3}$")
+TRANSACTION_ID_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$",
+    re.IGNORECASE,
+)
+
+# Campos requeridos principales
+REQUIRED_FIELDS = (
+    "version",
+    "timestamp",
+    "transaction_id",
+    "sender",
+    "receiver",
+    "amount",
+    "hmac_md5",
+)
+
+
+def parse_amount(value) -> Optional[Decimal]:
     """
-    Validar estructura de transferencia SINPE tradicional
+    Convertir un monto JSON a Decimal sin pasar por float
 
     Args:
-        data: Payload de transferencia recibido
+        value: Monto (int, float o string numérico)
 
     Returns:
-        Tuple[bool, str]: (is_valid, error_message)
+        Decimal finito, o None si el valor no es un número válido
     """
-    if not isinstance(data, dict):
-        return False, "Payload debe ser un objeto JSON"
-
-    # Campos requeridos principales
-    required_fields = [
-        "version",
-        "timestamp",
-        "transaction_id",
-        "sender",
-        "receiver",
-        "amount",
-        "hmac_md5",
-    ]
-
-    for field in required_fields:
-        if field not in data:
-            return False, f"Falta campo requerido: {field}"
-
-    # Validar sender
-    sender = data.get("sender", {})
-    if (
-        "account_number" not in sender
-        or "bank_code" not in sender
-        or "name" not in sender
-    ):
-        return False, "Sender debe tener account_number, bank_code y name"
-
-    # Validar receiver
-    receiver = data.get("receiver", {})
-    if (
-        "account_number" not in receiver
-        or "bank_code" not in receiver
-        or "name" not in receiver
-    ):
-        return False, "Receiver debe tener account_number, bank_code y name"
-
-    # Validar amount
-    amount = data.get("amount", {})
-    if "value" not in amount or "currency" not in amount:
-        return False, "Amount debe tener value y currency"
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return Decimal(value)
+    try:
+        # repr(float) es la representación más corta que conserva el valor
+        amount = Decimal(repr(value) if isinstance(value, float) else value)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return amount if amount.is_finite() else None
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """
+    Convertir un timestamp ISO 8601 a datetime UTC sin zona horaria
+
+    Args:
+        value: Timestamp ISO 8601 (acepta sufijo Z y offsets)
 
+    Returns:
+        datetime naive en UTC, o None si el formato es inválido
+    """
+    if not isinstance(value, str) or not value:
+        return None
     try:
-        float(amount["value"])
-    except (ValueError, TypeError):
-        return False, "Amount value debe ser un número válido"
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
-    # Validar IBAN format básico
-    if not validate_iban_format(sender["account_number"]):
-        return False, f"IBAN sender inválido: {sender['account_number']}"
 
-    if not validate_iban_format(receiver["account_number"]):
-        return False, f"IBAN receiver inválido: {receiver['account_number']}"
+class TransferValidator:
+    """
+    Validador de un tipo de payload SINPE
 
-    return True, "Válido"
+    Recorre el payload una sola vez: cada campo se lee y se convierte una vez
+    y el resultado es un IncomingTransfer normalizado (monto Decimal,
+    timestamp datetime) que rutas y servicios usan sin volver a parsear.
+    """
 
+    def __init__(self, kind: str):
+        """
+        Args:
+            kind: SINPE (cuentas IBAN) o SINPE_MOVIL (teléfonos)
+        """
+        if kind not in (SINPE, SINPE_MOVIL):
+            raise ValueError(f"Tipo de transferencia desconocido: {kind}")
+        self.kind = kind
+
+    def validate(self, data: Dict[Any, Any]) -> Tuple[Optional[IncomingTransfer], str]:
+        """
+        Validar y normalizar un payload
+
+        Args:
+            data: Payload de transferencia recibido
+
+        Returns:
+            Tuple[Optional[IncomingTransfer], str]: (transfer, error_message);
+            transfer es None si el payload es inválido
+        """
+        if not isinstance(data, dict):
+            return None, "Payload debe ser un objeto JSON"
+
+        for field in REQUIRED_FIELDS:
+            if field not in data:
+                return None, f"Falta campo requerido: {field}"
+
+        transaction_id = data["transaction_id"]
+        if not isinstance(transaction_id, str) or not transaction_id:
+            return None, "transaction_id debe ser un texto no vacío"
+
+        sender = data["sender"]
+        receiver = data["receiver"]
+        amount = data["amount"]
+        if not isinstance(sender, dict):
+            sender = {}
+        if not isinstance(receiver, dict):
+            receiver = {}
+
+        if self.kind == SINPE:
+            parties, error = self._account_parties(sender, receiver)
+        else:
+            parties, error = self._phone_parties(sender, receiver)
+        if error:
+            return None, error
+
+        if (
+            not isinstance(amount, dict)
+            or "value" not in amount
+            or ("currency" not in amount)
+        ):
+            return None, "Amount debe tener value y currency"
+
+        value = parse_amount(amount["value"])
+        if value is None:
+            return None, "Amount value debe ser un número válido"
+
+        if self.kind == SINPE:
+            if not validate_iban_format(parties["sender_account"]):
+                return None, f"IBAN sender inválido: {parties['sender_account']}"
+            if not validate_iban_format(parties["receiver_account"]):
+                return None, f"IBAN receiver inválido: {parties['receiver_account']}"
+
+        timestamp = parse_timestamp(data["timestamp"])
+        if timestamp is None:
+            return None, "Timestamp inválido (debe ser ISO 8601)"
 
-def validate_sinpe_movil_payload(data: Dict[Any, Any]) -> Tuple[bool, str]:
+        return (
+            IncomingTransfer(
+                kind=self.kind,
+                transaction_id=transaction_id,
+                amount=value,
+                currency=amount["currency"],
+                timestamp=timestamp,
+                description=data.get("description") or "",
+                version=data["version"],
+                signed_timestamp=data["timestamp"],
+                hmac=data["hmac_md5"] if isinstance(data["hmac_md5"], str) else "",
+                **parties,
+            ),
+            "Válido",
+        )
+
+    @staticmethod
+    def _account_parties(sender: Dict, receiver: Dict) -> Tuple[Dict, str]:
+        if (
+            "account_number" not in sender
+            or "bank_code" not in sender
+            or "name" not in sender
+        ):
+            return {}, "Sender debe tener account_number, bank_code y name"
+        if (
+            "account_number" not in receiver
+            or "bank_code" not in receiver
+            or "name" not in receiver
+        ):
+            return {}, "Receiver debe tener account_number, bank_code y name"
+        return {
+            "sender_account": sender["account_number"],
+            "sender_bank": sender["bank_code"],
+            "sender_name": sender["name"],
+            "receiver_account": receiver["account_number"],
+            "receiver_bank": receiver["bank_code"],
+            "receiver_name": receiver["name"],
+        }, ""
+
+    @staticmethod
+    def _phone_parties(sender: Dict, receiver: Dict) -> Tuple[Dict, str]:
+        if "phone_number" not in sender:
+            return {}, "Sender debe tener phone_number para SINPE móvil"
+        if "phone_number" not in receiver:
+            return {}, "Receiver debe tener phone_number para SINPE móvil"
+
+        sender_phone = sender["phone_number"]
+        receiver_phone = receiver["phone_number"]
+        if not validate_phone_format(sender_phone):
+            return {}, f"Número de teléfono sender inválido: {sender_phone}"
+        if not validate_phone_format(receiver_phone):
+            return {}, f"Número de teléfono receiver inválido: {receiver_phone}"
+        return {
+            "sender_phone": sender_phone,
+            "sender_bank": sender.get("bank_code") or "",
+            "sender_name": sender.get("name") or "",
+            "receiver_phone": receiver_phone,
+            "receiver_bank": receiver.get("bank_code") or "",
+            "receiver_name": receiver.get("name") or "",
+        }, ""
+
+
+sinpe_validator = TransferValidator(SINPE)
+sinpe_movil_validator = TransferValidator(SINPE_MOVIL)
+
+
+def validate_sinpe_payload(data: Dict[Any, Any]) -> Tuple[bool, str]:
     """
-    Validar estructura de transferencia SINPE móvil
+    Validar estructura de transferencia SINPE tradicional
 
     Args:
-        data: Payload de transferencia móvil recibido
+        data: Payload de transferencia recibido
 
     Returns:
         Tuple[bool, str]: (is_valid, error_message)
     """
-    if not isinstance(data, dict):
-        return False, "Payload debe ser un objeto JSON"
-
-    # Campos requeridos principales
-    required_fields = [
-        "version",
-        "timestamp",
-        "transaction_id",
-        "sender",
-        "receiver",
-        "amount",
-        "hmac_md5",
-    ]
-
-    for field in required_fields:
-        if field not in data:
-            return False, f"Falta campo requerido: {field}"
-
-    # Validar sender (debe tener phone_number)
-    sender = data.get("sender", {})
-    if "phone_number" not in sender:
-        return False, "Sender debe tener phone_number para SINPE móvil"
-
-    # Validar receiver (debe tener phone_number)
-    receiver = data.get("receiver", {})
-    if "phone_number" not in receiver:
-        return False, "Receiver debe tener phone_number para SINPE móvil"
-
-    # Validar format de teléfonos
-    if not validate_phone_format(sender["phone_number"]):
-        return False, f"Número de teléfono sender inválido: {sender['phone_number']}"
-
-    if not validate_phone_format(receiver["phone_number"]):
-        return (
-            False,
-            f"Número de teléfono receiver inválido: {receiver['phone_number']}",
-        )
+    transfer, message = sinpe_validator.validate(data)
+    return transfer is not None, message
 
-    # Validar amount
-    amount = data.get("amount", {})
-    if "value" not in amount or "currency" not in amount:
-        return False, "Amount debe tener value y currency"
 
-    try:
-        float(amount["value"])
-    except (ValueError, TypeError):
-        return False, "Amount value debe ser un número válido"
+def validate_sinpe_movil_payload(data: Dict[Any, Any]) -> Tuple[bool, str]:
+    """
+    Validar estructura de transferencia SINPE móvil
 
-    return True, "Válido"
+    Args:
+        data: Payload de transferencia móvil recibido
+
+    Returns:
+        Tuple[bool, str]: (is_valid, error_message)
+    """
+    transfer, message = sinpe_movil_validator.validate(data)
+    return transfer is not None, message
 
 
 def validate_iban_format(iban: str) -> bool:
@@ -149,8 +258,7 @@ def validate_iban_format(iban: str) -> bool:
         return False
 
     # Formato: CR21-0XXX-0001-XX-XXXX-XXXX-XX
-    pattern = r"^CR\d{2}-\d{4}-\d{4}-\d{2}-\d{4}-\d{4}-\d{2}$"
-    return bool(re.match(pattern, iban))
+    return isinstance(iban, str) and IBAN_PATTERN.match(iban) is not None
 
 
 def validate_phone_format(phone: str) -> bool:
@@ -167,8 +275,7 @@ def validate_phone_format(phone: str) -> bool:
         return False
 
     # Formato: 8 dígitos, empieza con 6, 7 u 8
-    pattern = r"^[678]\d{7}$"
-    return bool(re.match(pattern, phone))
+    return isinstance(phone, str) and PHONE_PATTERN.match(phone) is not None
 
 
 def validate_bank_code(bank_code: str) -> bool:
@@ -185,8 +292,7 @@ def validate_bank_code(bank_code: str) -> bool:
         return False
 
     # Códigos de banco son de 3 dígitos
-    pattern = r"^\d{3}$"
-    return bool(re.match(pattern, bank_code))
+    return isinstance(bank_code, str) and BANK_CODE_PATTERN.match(bank_code) is not None
 
 
 def validate_transaction_id(transaction_id: str) -> bool:
@@ -203,8 +309,10 @@ def validate_transaction_id(transaction_id: str) -> bool:
         return False
 
     # UUID v4 format básico
-    pattern = r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
-    return bool(re.match(pattern, transaction_id, re.IGNORECASE))
+    return (
+        isinstance(transaction_id, str)
+        and TRANSACTION_ID_PATTERN.match(transaction_id) is not None
+    )
 
 
 def validate_timestamp(timestamp: str) -> bool:
@@ -217,11 +325,4 @@ def validate_timestamp(timestamp: str) -> bool:
     Returns:
         bool: True si el formato es válido
     """
-    if not timestamp:
-        return False
-
-    try:
-        datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-        return True
-    except ValueError:
-        return False
+    return parse_timestamp(timestamp) is not None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET /api/transactions page serialization
+Compares the former ORM objects + to_dict() + stdlib jsonify with column
+tuples encoded by FastJSONProvider (orjson and stdlib fallback)
+"""
+
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from common import create_benchmark_app
+
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from app.models import db, Transaction
+from app.routes.transaction_routes import TRANSACTION_COLUMNS, TRANSACTION_KEYS
+from app.utils.json_provider import ORJSON_AVAILABLE, FastJSONProvider, column_records
+
+ROWS = 100  # MAX_PAGE_SIZE
+TRANSACTIONS = 2000
+ROUNDS = 200
+
+
+def seed():
+    base = datetime(2025, 1, 1)
+    for i in range(TRANSACTIONS):
+        db.session.add(
+            Transaction(
+                transaction_id=str(uuid.uuid4()),
+                from_account_id=1,
+                to_account_id=2,
+                amount=Decimal("1000.00") + i,
+                status="completed",
+                description="Pago",
+                created_at=base + timedelta(seconds=i),
+            )
+        )
+    db.session.commit()
+
+
+def legacy_page():
+    """ORM objects and to_dict() per row"""
+    rows = Transaction.query.order_by(Transaction.created_at.desc()).limit(ROWS).all()
+    return jsonify({"success": True, "data": [row.to_dict() for row in rows]})
+
+
+def column_page():
+    """Column tuples handed to the provider"""
+    rows = db.session.execute(
+        db.select(*TRANSACTION_COLUMNS)
+        .order_by(Transaction.created_at.desc())
+        .limit(ROWS)
+    ).all()
+    return jsonify({"success": True, "data": column_records(TRANSACTION_KEYS, rows)})
+
+
+def per_page_ms(fn) -> float:
+    """Best milliseconds per page over ROUNDS runs"""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn().get_data()
+        best = min(best, time.perf_counter() - start)
+        db.session.expunge_all()
+    return best * 1000
+
+
+def main():
+    db_path = os.path.join(tempfile.gettempdir(), "bench_json_lists.db")
+    app = create_benchmark_app(db_path)
+
+    results = {}
+    with app.app_context():
+        seed()
+
+        app.json = DefaultJSONProvider(app)
+        results["ORM + to_dict + json"] = per_page_ms(legacy_page)
+        app.json = FastJSONProvider(app, use_orjson=False)
+        results["columns + json"] = per_page_ms(column_page)
+        if ORJSON_AVAILABLE:
+            app.json = FastJSONProvider(app)
+            results["ORM + to_dict + orjson"] = per_page_ms(legacy_page)
+            results["columns + orjson"] = per_page_ms(column_page)
+
+    print("=" * 60)
+    print(f"🧾 /api/transactions page of {ROWS} rows (best of {ROUNDS})")
+    print("=" * 60)
+    baseline = results["ORM + to_dict + json"]
+    for name, value in results.items():
+        print(f"   {name:<24} {value:>8.3f} ms  ({baseline / value:.2f}x)")
+
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQL round trips per SINPE Móvil transfer
+Compares the former per-entity lookups with SinpeService.resolve_sinpe_parties
+"""
+
+import os
+import tempfile
+
+from common import create_benchmark_app, count_queries
+
+from app.models import Account, PhoneLink, SinpeSubscription
+from app.services.sinpe_service import SinpeService
+from app.services.velocity_counter_service import velocity_counters
+
+SENDER_PHONE = "88887777"
+RECEIVER_PHONE = "88886666"
+
+
+def legacy_lookups(sender_phone: str, receiver_phone: str):
+    """Lookups issued by send_sinpe_transfer before the joined resolver"""
+    sender_link = PhoneLink.query.filter_by(phone=sender_phone).first()
+    Account.query.filter_by(number=sender_link.account_number).first()
+    SinpeSubscription.query.filter_by(sinpe_number=receiver_phone).first()
+    receiver_link = PhoneLink.query.filter_by(phone=receiver_phone).first()
+    Account.query.filter_by(number=receiver_link.account_number).first()
+    sender_link = PhoneLink.query.filter_by(phone=sender_phone).first()
+    Account.query.filter_by(number=sender_link.account_number).first()
+
+
+def main():
+    db_path = os.path.join(tempfile.gettempdir(), "bench_sinpe_queries.db")
+    app = create_benchmark_app(db_path)
+
+    with app.app_context():
+        from app.models import db
+
+        with count_queries() as legacy:
+            legacy_lookups(SENDER_PHONE, RECEIVER_PHONE)
+        db.session.rollback()
+
+        with count_queries() as resolver:
+            SinpeService.resolve_sinpe_parties(SENDER_PHONE, RECEIVER_PHONE)
+        db.session.rollback()
+
+        velocity_counters.warm_up()
+        with count_queries() as transfer:
+            SinpeService.send_sinpe_transfer(SENDER_PHONE, RECEIVER_PHONE, 1000)
+
+    print("=" * 60)
+    print("📊 SQL statements per SINPE Móvil transfer")
+    print("=" * 60)
+    print(f"Party resolution (before): {len(legacy)}")
+    print(f"Party resolution (after):  {len(resolver)}")
+    print(f"Full send_sinpe_transfer:  {len(transfer)}")
+    for statement in transfer:
+        print(f"   - {statement.split()[0]} {' '.join(statement.split()[1:6])} ...")
+
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent transfer and read throughput on banking.db
+Compares the former engine options (rollback journal, large pool) with the
+WAL/pragma connect hook and SQLite pool sizing from app.utils.sqlite_config
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from common import create_benchmark_app
+
+from app.models import db, Account
+from app.services.account_balance_service import AccountBalanceService
+from app.utils.sqlite_config import sqlite_engine_options
+
+DURATION_SECONDS = 5
+WRITER_THREADS = 4
+READER_THREADS = 8
+
+LEGACY_ENGINE_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_recycle": 300,
+    "pool_timeout": 20,
+    "pool_size": 10,
+    "max_overflow": 20,
+}
+
+
+def run_workload(app):
+    """Run writer and reader threads for DURATION_SECONDS and count operations"""
+    with app.app_context():
+        account_numbers = [acc.number for acc in Account.query.all()]
+
+    counts = {"transfers": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + DURATION_SECONDS
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                source, dest = rng.sample(account_numbers, 2)
+                result = AccountBalanceService.transfer_between_accounts(
+                    source, dest, Decimal("1.00"), transaction_id=str(uuid.uuid4())
+                )
+                bump("transfers" if result["success"] else "errors")
+            db.session.remove()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                try:
+                    AccountBalanceService.get_account_balance(
+                        rng.choice(account_numbers)
+                    )
+                    AccountBalanceService.get_transaction_history(
+                        rng.choice(account_numbers), limit=20
+                    )
+                    bump("reads")
+                except Exception:
+                    db.session.rollback()
+                    bump("errors")
+                finally:
+                    db.session.remove()
+
+    threads = [
+        threading.Thread(target=writer, args=(i,)) for i in range(WRITER_THREADS)
+    ] + [threading.Thread(target=reader, args=(i,)) for i in range(READER_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        db.engine.dispose()
+
+    return counts
+
+
+def main():
+    results = {}
+    for label, options, pragmas in [
+        ("default journal", LEGACY_ENGINE_OPTIONS, False),
+        ("WAL + pragmas", sqlite_engine_options(), True),
+    ]:
+        db_path = os.path.join(tempfile.gettempdir(), "bench_sqlite_pragmas.db")
+        app = create_benchmark_app(db_path, options, sqlite_pragmas=pragmas)
+        results[label] = run_workload(app)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print("=" * 60)
+    print(
+        f"📊 SQLite throughput ({WRITER_THREADS} writers, {READER_THREADS} readers, "
+        f"{DURATION_SECONDS}s)"
+    )
+    print("=" * 60)
+    for label, counts in results.items():
+        print(
+            f"{label:<16} transfers/s: {counts['transfers'] / DURATION_SECONDS:8.1f}  "
+            f"reads/s: {counts['reads'] / DURATION_SECONDS:8.1f}  "
+            f"errors: {counts['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request CPU and allocations of the SINPE Móvil pipeline
+Compares the former dict hand-offs (payload re-walked for the HMAC, amount
+re-converted to Decimal by the service and the monitor, result dicts) with
+the slotted IncomingTransfer/MonitoringInput/TransferResult objects. Payloads
+are validated up front (same validator in both); the stages after it are
+measured. Database work is identical in both and left out.
+"""
+
+import sys
+import time
+import tracemalloc
+import uuid
+from decimal import Decimal
+
+import common  # noqa: F401  (adds the project root to sys.path)
+
+from app.utils.bank_secrets import BankSecretRegistry
+from app.utils.bank_routing import BankRoutingRegistry
+from app.utils.hmac_generator import generate_hmac_for_phone_transfer
+from app.utils.transfers import MonitoringInput, TransferResult
+from app.utils.validators import sinpe_movil_validator
+
+REQUESTS = 20000
+ROUNDS = 5
+
+
+def build_payloads():
+    payloads = []
+    for i in range(REQUESTS):
+        transaction_id = str(uuid.uuid4())
+        timestamp = "2025-01-01T12:00:00+00:00"
+        amount = 1000 + i / 100
+        payloads.append(
+            {
+                "version": "1.0",
+                "timestamp": timestamp,
+                "transaction_id": transaction_id,
+                "sender": {"phone_number": "87001122", "bank_code": "0151"},
+                "receiver": {"phone_number": "88886666"},
+                "amount": {"value": amount, "currency": "CRC"},
+                "hmac_md5": generate_hmac_for_phone_transfer(
+                    "87001122", timestamp, transaction_id, amount
+                ),
+            }
+        )
+    return payloads
+
+
+def legacy_request(payload, transfer, secrets):
+    """Dict hand-offs as before the typed transfer objects"""
+    if not secrets.verify(payload, payload.get("hmac_md5")):
+        return None
+    kwargs = {
+        "transaction_id": payload["transaction_id"],
+        "sender_phone": payload["sender"]["phone_number"],
+        "receiver_phone": payload["receiver"]["phone_number"],
+        "amount": payload["amount"]["value"],
+        "currency": payload["amount"].get("currency", "CRC"),
+        "description": payload.get("description", ""),
+    }
+    amount = Decimal(str(kwargs["amount"]))
+    monitoring_data = {
+        "amount": kwargs["amount"],
+        "transaction_type": "sinpe_movil",
+        "sender_phone": kwargs["sender_phone"],
+        "receiver_phone": kwargs["receiver_phone"],
+        "currency": kwargs["currency"],
+    }
+    Decimal(str(monitoring_data.get("amount", 0)))
+    result = {
+        "success": True,
+        "transaction_id": kwargs["transaction_id"],
+        "receiver_phone": kwargs["receiver_phone"],
+        "receiver_account": "152001234567892",
+        "amount": float(amount),
+        "new_balance": 101000.0,
+    }
+    return result["success"]
+
+
+def dto_request(payload, transfer, secrets):
+    """Typed objects: parsed once, read by attribute"""
+    if not secrets.verify_transfer(transfer):
+        return None
+    MonitoringInput(
+        amount=transfer.amount,
+        transaction_type="sinpe_movil",
+        currency=transfer.currency,
+        sender_phone=transfer.sender_phone,
+        receiver_phone=transfer.receiver_phone,
+    )
+    result = TransferResult(
+        success=True,
+        transaction_id=transfer.transaction_id,
+        receiver_phone=transfer.receiver_phone,
+        receiver_account="152001234567892",
+        amount=float(transfer.amount),
+        new_balance=101000.0,
+    )
+    return result.success
+
+
+def cpu_per_request(handler, payloads, secrets) -> float:
+    """Best CPU microseconds per request over ROUNDS runs"""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.process_time()
+        for payload, transfer in payloads:
+            assert handler(payload, transfer, secrets)
+        best = min(best, time.process_time() - start)
+    return best / len(payloads) * 1e6
+
+
+def traced_bytes(handler, payloads, secrets) -> float:
+    """Peak bytes allocated while handling one request, averaged"""
+    sample = payloads[:2000]
+    total = 0
+    tracemalloc.start()
+    for payload, transfer in sample:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        handler(payload, transfer, secrets)
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / len(sample)
+
+
+def main():
+    print("=" * 60)
+    print(f"📦 Transfer DTOs: per-request cost ({REQUESTS} requests)")
+    print("=" * 60)
+
+    routing = BankRoutingRegistry(path=None)
+    routing.load_contacts([])
+    secrets = BankSecretRegistry(routing=routing)
+    payloads = [
+        (payload, sinpe_movil_validator.validate(payload)[0])
+        for payload in build_payloads()
+    ]
+
+    legacy_cpu = cpu_per_request(legacy_request, payloads, secrets)
+    dto_cpu = cpu_per_request(dto_request, payloads, secrets)
+    legacy_mem = traced_bytes(legacy_request, payloads, secrets)
+    dto_mem = traced_bytes(dto_request, payloads, secrets)
+
+    print(f"\nCPU per request (best of {ROUNDS}):")
+    print(f"   dicts  {legacy_cpu:>8.2f} µs")
+    print(f"   DTOs   {dto_cpu:>8.2f} µs  ({legacy_cpu / dto_cpu:.2f}x)")
+    print("\nPeak bytes allocated per request:")
+    print(f"   dicts  {legacy_mem:>8.0f} B")
+    print(f"   DTOs   {dto_mem:>8.0f} B  ({legacy_mem / dto_mem:.2f}x)")
+
+    result = {
+        "success": True,
+        "transaction_id": payloads[0][1].transaction_id,
+        "receiver_phone": "88886666",
+        "receiver_account": "152001234567892",
+        "amount": 1000.0,
+        "new_balance": 101000.0,
+    }
+    print("\nObject size (sys.getsizeof):")
+    print(f"   result dict          {sys.getsizeof(result):>5} B")
+    print(
+        f"   TransferResult       {sys.getsizeof(TransferResult.from_dict(result)):>5} B"
+    )
+    monitoring = {
+        "amount": Decimal("1000"),
+        "transaction_type": "sinpe_movil",
+        "sender_phone": "87001122",
+        "receiver_phone": "88886666",
+        "currency": "CRC",
+        "from_account_id": 1,
+    }
+    print(f"   monitoring dict      {sys.getsizeof(monitoring):>5} B")
+    print(
+        f"   MonitoringInput      "
+        f"{sys.getsizeof(MonitoringInput.from_dict(monitoring)):>5} B"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Shared helpers for SINPE Banking System benchmarks
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Add project root to path so benchmarks run as plain scripts
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+from app.models import db
+from app.services.database_service import DatabaseService
+from app.utils.sqlite_config import register_sqlite_pragmas
+
+
+def create_benchmark_app(
+    db_path: str, engine_options: dict = None, sqlite_pragmas: bool = False
+) -> Flask:
+    """
+    Create a minimal Flask app bound to a scratch SQLite database with sample data
+
+    Args:
+        db_path: Path of the scratch database file (recreated)
+        engine_options: Optional SQLALCHEMY_ENGINE_OPTIONS
+        sqlite_pragmas: Apply the production WAL/pragma connect hook
+
+    Returns:
+        Flask application with an initialized database
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    if engine_options:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+    db.init_app(app)
+
+    with app.app_context():
+        if sqlite_pragmas:
+            register_sqlite_pragmas(db.engine)
+        db.create_all()
+        DatabaseService().create_sample_data()
+
+    return app
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements sent to the database inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def timer():
+    """Measure wall-clock seconds spent inside the block"""
+    result = {"seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
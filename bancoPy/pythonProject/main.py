@@ -22,6 +22,9 @@ from app import create_app
 from app.models import db
 from app.services.database_service import DatabaseService
 from app.services.terminal_service import TerminalService
+from app.services.outbox_service import outbox
+from app.services.phone_routing_service import phone_routing
+from app.services.velocity_counter_service import velocity_counters
 
 console = Console()
 
@@ -43,7 +46,10 @@ class SinpeBankingSystem:
         with self.app.app_context():
             db.create_all()
             db_service = DatabaseService()
+            db_service.upgrade_schema()
             db_service.create_sample_data()
+            velocity_counters.warm_up()
+            phone_routing.refresh_from_file()
 
         console.print("[green]✓ Database initialized successfully[/green]")
 
@@ -88,6 +94,9 @@ class SinpeBankingSystem:
         self.server_thread.start()
         self.server_running = True
 
+        # Deliver queued outgoing inter-bank transfers in the background
+        outbox.start(self.app)
+
         # Wait for server to start
         time.sleep(1)
         ssl_context = getattr(self.app, "ssl_context", None)
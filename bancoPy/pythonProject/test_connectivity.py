@@ -12,49 +12,52 @@ from app.utils.hmac_generator import (
     generate_hmac_for_account_transfer,
     generate_hmac_for_phone_transfer,
 )
+from app.utils.bank_routing import bank_routing
+from app.services.async_bank_connector_service import AsyncBankConnectorService
+import asyncio
 import sys
 import os
 
 # Agregar el directorio de la aplicación al path
 sys.path.append(os.path.join(os.path.dirname(__file__), "app"))
 
-# Configuración de bancos para pruebas
+# Configuración de bancos para pruebas (tabla compartida con BankConnectorService)
+BANCO_LOCAL = "0152"
+
 BANCOS_ACTIVOS = {
-    "876": {
-        "name": "Banco Josue",
-        "url": "http://192.168.3.10:5000",
-        "endpoint_sinpe": "/api/sinpe-transfer",
-        "endpoint_movil": "/api/sinpe-movil-transfer",
-        "enabled": True,
-    },
-    "119": {
-        "name": "Banco TypeScript (Marconi)",
-        "url": "http://192.168.2.10:3001",
-        "endpoint_sinpe": "/api/sinpe/transfer",
-        "endpoint_movil": "/api/sinpe/movil-transfer",
-        "enabled": True,
-    },
-    "241": {
-        "name": "Banco Brayan",
-        "url": "http://192.168.4.10:5050",
-        "endpoint_sinpe": "/api/sinpe-transfer",
-        "endpoint_movil": "/api/sinpe-movil-transfer",
-        "enabled": True,
-    },
-    "223": {
-        "name": "Banco Kendall",
-        "url": "http://192.168.5.10:3001",
-        "endpoint_sinpe": "/api/sinpe-transfer",
-        "endpoint_movil": "/api/sinpe-movil-transfer",
-        "enabled": True,
-    },
+    route.bank_code.lstrip("0"): {
+        "name": route.name,
+        "url": route.base_url("http"),
+        "endpoint_sinpe": route.sinpe_path,
+        "endpoint_movil": route.movil_path,
+        "endpoint_health": route.health_path,
+        "enabled": route.enabled,
+    }
+    for route in bank_routing.routes(enabled_only=True)
+    if route.bank_code != BANCO_LOCAL
 }
 
 
+def probar_health_concurrente() -> dict:
+    """Probar el health de todos los bancos a la vez (asyncio)"""
+    print("🔍 Probando health check de todos los bancos en paralelo...")
+    resultados = asyncio.run(AsyncBankConnectorService().check_health(protocol="http"))
+
+    health = {}
+    for bank_code, resultado in resultados.items():
+        codigo = bank_code.lstrip("0")
+        if codigo not in BANCOS_ACTIVOS:
+            continue
+        health[codigo] = resultado["healthy"]
+        icono = "✅" if resultado["healthy"] else "❌"
+        print(f"{icono} {resultado['bank']} - {resultado['latency_ms']} ms")
+    return health
+
+
 def test_health_endpoint(bank_code: str, bank_config: dict) -> bool:
     """Test health endpoint de un banco"""
     try:
-        url = f"{bank_config['url']}/health"
+        url = f"{bank_config['url']}{bank_config['endpoint_health']}"
         print(f"🔍 Probando health check: {url}")
         
         response = requests.get(url, timeout=5)
@@ -227,7 +230,7 @@ def main():
     print()
     
     resultados = {
-        "health": {},
+        "health": probar_health_concurrente(),
         "sinpe": {},
         "movil": {}
     }
@@ -239,10 +242,6 @@ def main():
         print(f"\n📋 Probando banco: {bank_config['name']} (Código: {bank_code})")
         print("-" * 50)
         
-        # Test Health
-        resultados["health"][bank_code] = test_health_endpoint(bank_code, bank_config)
-        print()
-        
         # Test SINPE Transfer
         resultados["sinpe"][bank_code] = test_sinpe_transfer(bank_code, bank_config)
         print()
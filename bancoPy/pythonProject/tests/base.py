@@ -0,0 +1,66 @@
+"""
+Shared fixture for tests that run against the sample banking database
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from flask import Flask
+from app.models import db
+from app.services.database_service import DatabaseService
+from app.services.idempotency_service import incoming_transfers
+from app.services.velocity_counter_service import velocity_counters
+
+
+class AppTestCase(unittest.TestCase):
+    """
+    Flask app with a fresh database holding the sample data
+
+    Subclasses may set:
+        blueprints: Blueprints mounted under /api (self.client is then usable)
+        database_file: File name for an on-disk SQLite database, for tests
+            that need several connections (default: in-memory)
+
+    Process-wide velocity counters and the incoming transfer cache are reset
+    around every test.
+    """
+
+    blueprints = ()
+    database_file = None
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        if self.database_file:
+            self.db_dir = tempfile.TemporaryDirectory()
+            self.addCleanup(self.db_dir.cleanup)
+            self.app.config[
+                "SQLALCHEMY_DATABASE_URI"
+            ] = f"sqlite:///{os.path.join(self.db_dir.name, self.database_file)}"
+            self.app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+                "connect_args": {"timeout": 30}
+            }
+        else:
+            self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+        db.init_app(self.app)
+        for blueprint in self.blueprints:
+            self.app.register_blueprint(blueprint, url_prefix="/api")
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        DatabaseService().create_sample_data()
+        velocity_counters.reset()
+        incoming_transfers.reset()
+
+    def tearDown(self):
+        velocity_counters.reset()
+        incoming_transfers.reset()
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.ctx.pop()
@@ -0,0 +1,234 @@
+"""
+Test the asyncio inter-bank connector and its blocking facade
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import json
+import socket
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services import async_bank_connector_service
+from app.services.async_bank_connector_service import (
+    AsyncBankConnectorService,
+    AsyncLoopRunner,
+    AsyncPeerClient,
+    BlockingBankConnector,
+)
+from app.services.bank_connector_service import BankConnectorService
+from app.services.circuit_breaker_service import PeerCircuitBreakers
+from app.services.peer_session_service import PeerSessionPool
+from app.services.phone_routing_service import phone_routing
+from app.utils.bank_routing import BankRoutingRegistry
+
+OWNED_PHONE = "88884321"
+
+
+def make_peer(delay: float = 0.0):
+    """Fake peer: /health after `delay`, owns OWNED_PHONE, accepts transfers"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                time.sleep(delay)
+                self._reply(200, {"status": "healthy"})
+            elif self.path.endswith(OWNED_PHONE):
+                self._reply(200, {"success": True, "data": {"phone": OWNED_PHONE}})
+            else:
+                self._reply(404, {"error": "Phone link not found"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply(200, {"success": True, "path": self.path})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestAsyncConnector(unittest.TestCase):
+    def setUp(self):
+        self.server = make_peer(delay=0.3)
+        self.peer = f"127.0.0.1:{self.server.server_address[1]}"
+        self.pool = PeerSessionPool()
+        self.breakers = PeerCircuitBreakers()
+        self.routing = BankRoutingRegistry(path=None)
+        self.connector = AsyncBankConnectorService(
+            sessions=self.pool, routing=self.routing, breakers=self.breakers
+        )
+        self.connector.use_https = False
+
+    def tearDown(self):
+        phone_routing.learned.clear()
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _load_peers(self, count, address=None):
+        self.routing.load_contacts(
+            [
+                {
+                    "contacto": f"peer-{i}",
+                    "codigo": str(900 + i),
+                    "IP": address or self.peer,
+                }
+                for i in range(count)
+            ]
+        )
+
+    def test_send_transfer(self):
+        """Test the coroutine sends over the pool and records latency"""
+        self._load_peers(1)
+        payload = {"transaction_id": "t-1", "amount": 10, "timestamp": "now"}
+
+        result = asyncio.run(
+            self.connector.send_sinpe_transfer_to_bank(
+                "CR21-0900-0001-00-0000-0001-23", payload
+            )
+        )
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(result["data"]["path"], "/api/sinpe-transfer")
+        self.assertEqual(self.pool.get_stats()[f"http://{self.peer}"]["requests"], 1)
+
+    def test_health_checks_run_concurrently(self):
+        """Test a health sweep takes about one peer latency, not the sum"""
+        self._load_peers(16)
+
+        start = time.monotonic()
+        results = asyncio.run(self.connector.check_health())
+
+        self.assertLess(time.monotonic() - start, 16 * 0.3 / 2)
+        self.assertEqual(len(results), 16)
+        self.assertTrue(all(r["healthy"] for r in results.values()))
+
+    def test_health_check_feeds_breaker(self):
+        """Test an unreachable peer is reported and counted as a failure"""
+        self._load_peers(1, address=f"127.0.0.1:{unused_port()}")
+
+        results = asyncio.run(self.connector.check_health(timeout=1))
+
+        self.assertFalse(results["0900"]["healthy"])
+        self.assertEqual(self.breakers.get("0900").failures, 1)
+
+    def test_blocking_facade(self):
+        """Test sync callers get the same results through the facade"""
+        self._load_peers(3)
+        runner = AsyncLoopRunner()
+        facade = BlockingBankConnector(self.connector, runner)
+        try:
+            owner = facade.find_bank_for_phone(OWNED_PHONE)
+            self.assertIn(owner.contact, {"peer-0", "peer-1", "peer-2"})
+            result = facade.send_sinpe_movil_transfer_to_bank(
+                OWNED_PHONE, {"transaction_id": "t-2"}
+            )
+            self.assertTrue(result["success"], result)
+            self.assertEqual(result["data"]["path"], "/api/sinpe-movil-transfer")
+            # Lookup helpers are delegated
+            self.assertEqual(facade.get_bank_ip("900"), self.peer)
+        finally:
+            runner.stop()
+
+    def test_sync_and_async_results_match(self):
+        """Test both connectors build the same results from the shared helpers"""
+        self._load_peers(1)
+        sync = BankConnectorService(
+            sessions=self.pool, routing=self.routing, breakers=self.breakers
+        )
+        sync.use_https = False
+        payload = {"transaction_id": "t-3", "amount": 10, "timestamp": "now"}
+
+        for send, target in (
+            ("send_sinpe_transfer_to_bank", "CR21-0900-0001-00-0000-0001-23"),
+            ("send_sinpe_movil_transfer_to_bank", OWNED_PHONE),
+            ("send_sinpe_movil_transfer_to_bank", "80000000"),
+        ):
+            phone_routing.learned.clear()
+            expected = getattr(sync, send)(target, payload)
+            phone_routing.learned.clear()
+            result = asyncio.run(getattr(self.connector, send)(target, payload))
+            self.assertEqual(result, expected, send)
+
+
+class FakeAsyncClient:
+    """Stands in for httpx.AsyncClient; records aclose()"""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.closed_on = None
+        FakeAsyncClient.instances.append(self)
+
+    async def aclose(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+class TestAsyncPeerClient(unittest.TestCase):
+    def setUp(self):
+        FakeAsyncClient.instances = []
+        fake_httpx = types.SimpleNamespace(
+            AsyncClient=FakeAsyncClient, Limits=lambda **kwargs: kwargs
+        )
+        patches = (
+            mock.patch.object(
+                async_bank_connector_service, "httpx", fake_httpx, create=True
+            ),
+            mock.patch.object(async_bank_connector_service, "HTTPX_AVAILABLE", True),
+        )
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = AsyncPeerClient(sessions=PeerSessionPool())
+
+    def test_rebind_closes_client_of_finished_loop(self):
+        """Test moving to a new event loop closes the previous client"""
+        asyncio.run(self.client._bind())
+        asyncio.run(self.client._bind())
+
+        first, second = FakeAsyncClient.instances
+        self.assertIsNotNone(first.closed_on)
+        self.assertIsNone(second.closed_on)
+        self.assertIs(self.client._client, second)
+
+    def test_rebind_closes_client_on_its_running_loop(self):
+        """Test a client whose loop still runs is closed on that loop"""
+        runner = AsyncLoopRunner()
+        try:
+            runner.run(self.client._bind())
+            asyncio.run(self.client._bind())
+            first, _ = FakeAsyncClient.instances
+            self.assertIs(first.closed_on, runner._loop)
+        finally:
+            runner.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+Test parallel phone ownership probing in BankConnectorService
+"""
+
+import unittest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.bank_connector_service import BankConnectorService
+from app.services.peer_session_service import PeerSessionPool
+from app.services.phone_routing_service import UNROUTABLE, phone_routing
+from app.utils.bank_routing import BankRoutingRegistry
+
+
+def make_peer(owns_phone: bool, delay: float, post_delay: float = 0.0, answer=None):
+    """Start a fake peer bank; returns (server, received POST counter, GET paths)
+
+    Phone lookups answer like /api/phone-links/phone/<phone>, or 200 with
+    `answer` as the body when given.
+    """
+    posts = []
+    probes = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            probes.append(self.path)
+            time.sleep(delay)
+            if answer is not None:
+                self._reply(200, answer)
+            elif owns_phone:
+                phone = self.path.rsplit("/", 1)[-1]
+                self._reply(200, {"success": True, "data": {"phone": phone}})
+            else:
+                self._reply(404, {"error": "Phone link not found"})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(post_delay)
+            posts.append(self.path)
+            self._reply(200, {"success": True})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, posts, probes
+
+
+class TestBankFanout(unittest.TestCase):
+    def setUp(self):
+        self.pool = PeerSessionPool()
+        self.servers = []
+        self.contacts = []
+        self.probes = {}
+        self.routing = BankRoutingRegistry(path=None)
+        self.connector = BankConnectorService(sessions=self.pool, routing=self.routing)
+        self.connector.use_https = False
+
+    def tearDown(self):
+        phone_routing.learned.clear()
+        self.pool.close()
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def _add_peer(
+        self, name, owns_phone, delay=0.0, post_delay=0.0, answer=None, **contact
+    ):
+        server, posts, self.probes[name] = make_peer(
+            owns_phone, delay, post_delay, answer
+        )
+        self.servers.append(server)
+        self.contacts.append(
+            {
+                "contacto": name,
+                "codigo": str(901 + len(self.contacts)),
+                "IP": f"127.0.0.1:{server.server_address[1]}",
+                **contact,
+            }
+        )
+        self.routing.load_contacts(self.contacts)
+        return posts
+
+    def test_first_confirming_bank_wins(self):
+        """Test slow peers do not delay the owner's answer"""
+        slow_posts = self._add_peer("slow", owns_phone=False, delay=2.0)
+        owner_posts = self._add_peer("owner", owns_phone=True, delay=0.05)
+        other_posts = self._add_peer("other", owns_phone=False)
+
+        start = time.monotonic()
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88881234", {"transaction_id": "t-1"}
+        )
+
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertTrue(result["success"], result)
+        self.assertEqual(result["bank"], "owner")
+        self.assertEqual(owner_posts, ["/api/sinpe-movil-transfer"])
+        self.assertEqual(slow_posts + other_posts, [])
+
+    def test_routed_phone_skips_probing(self):
+        """Test a learned route sends directly and unknown owners are cached"""
+        owner_posts = self._add_peer("owner", owns_phone=True)
+        phone_routing.learn("88885678", "0901")
+
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88885678", {"transaction_id": "t-3"}
+        )
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(owner_posts, ["/api/sinpe-movil-transfer"])
+        self.assertEqual(
+            self.pool.get_stats()[self.connector._base_url(self.routing.get("901"))][
+                "requests"
+            ],
+            1,
+        )
+
+    def test_probe_path_per_bank(self):
+        """Test each peer is probed on its own path and disabled banks are skipped"""
+        self._add_peer(
+            "typescript",
+            owns_phone=False,
+            api_endpoints={"phone_lookup": "/api/sinpe/validate/{phone}"},
+        )
+        self._add_peer("disabled", owns_phone=True, enabled=False)
+        owner_posts = self._add_peer("owner", owns_phone=True, delay=0.05)
+
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88881234", {"transaction_id": "t-4"}
+        )
+
+        self.assertEqual(result["bank"], "owner")
+        self.assertEqual(owner_posts, ["/api/sinpe-movil-transfer"])
+        self.assertEqual(self.probes["typescript"], ["/api/sinpe/validate/88881234"])
+        self.assertEqual(self.probes["disabled"], [])
+
+    def test_lookup_answering_false_is_not_owner(self):
+        """Test a 200 whose body denies the phone does not count as ownership"""
+        denying_posts = self._add_peer(
+            "validator",
+            owns_phone=False,
+            answer=False,
+            api_endpoints={"phone_lookup": "/api/sinpe/validate/{phone}"},
+        )
+        unlinked_posts = self._add_peer(
+            "unlinked", owns_phone=False, answer={"success": False}
+        )
+        owner_posts = self._add_peer("owner", owns_phone=True, delay=0.2)
+
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88881234", {"transaction_id": "t-6"}
+        )
+
+        self.assertEqual(result["bank"], "owner")
+        self.assertEqual(owner_posts, ["/api/sinpe-movil-transfer"])
+        self.assertEqual(denying_posts + unlinked_posts, [])
+        self.assertEqual(self.probes["validator"], ["/api/sinpe/validate/88881234"])
+
+    def test_transfer_not_bound_by_probe_deadline(self):
+        """Test a slow credit after discovery is not cut off by fanout_deadline"""
+        posts = self._add_peer("owner", owns_phone=True, post_delay=0.6)
+        self.connector.fanout_deadline = 0.3
+
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88881234", {"transaction_id": "t-5"}
+        )
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(posts, ["/api/sinpe-movil-transfer"])
+
+    def test_global_deadline(self):
+        """Test the search gives up after the deadline without sending"""
+        posts = self._add_peer("slow", owns_phone=True, delay=2.0)
+        self.connector.fanout_deadline = 0.3
+
+        start = time.monotonic()
+        result = self.connector.send_sinpe_movil_transfer_to_bank(
+            "88881234", {"transaction_id": "t-2"}
+        )
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(result["success"])
+        self.assertEqual(posts, [])
+        self.assertEqual(phone_routing.lookup("88881234"), UNROUTABLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Test the precomputed bank code -> endpoint routing table
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.utils.bank_routing import BankRoutingRegistry
+
+CONTACTS = [
+    {
+        "banco": "Banco TypeScript",
+        "codigo": "119",
+        "contacto": "marconi",
+        "IBAN": "CR21-0119-0001-71-3176-4383-40",
+        "IP": "192.168.2.10:3001",
+        "enabled": True,
+        "api_endpoints": {"sinpe_transfer": "/api/sinpe/transfer"},
+    },
+    {
+        "banco": "Banco Marco",
+        "codigo": "150",
+        "contacto": "marco",
+        "IBAN": "CR21-0150-0001-00-0000-0012-34",
+        "IP": "192.168.6.10:5000",
+        "enabled": False,
+    },
+    {"banco": "Sin IP", "codigo": "999", "contacto": "nadie"},
+]
+
+
+class TestBankRouting(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "contactos-bancos.json")
+        self._write(CONTACTS, mtime=1000)
+        self.routing = BankRoutingRegistry(self.path, check_interval=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, contacts, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(contacts if isinstance(contacts, str) else json.dumps(contacts))
+        os.utime(self.path, (mtime, mtime))
+
+    def test_lookup_by_bank_code(self):
+        """Test 3- and 4-digit codes resolve to the same route"""
+        route = self.routing.get("119")
+        self.assertIs(route, self.routing.get("0119"))
+        self.assertEqual(route.base_url("http"), "http://192.168.2.10:3001")
+        self.assertEqual(route.sinpe_path, "/api/sinpe/transfer")
+        self.assertEqual(route.movil_path, "/api/sinpe-movil-transfer")
+        self.assertIsNone(self.routing.get("999"))
+        self.assertEqual(len(self.routing.table.contacts), 3)
+
+    def test_enabled_only(self):
+        """Test disabled banks are routed but excluded on request"""
+        self.assertEqual(len(self.routing.routes()), 2)
+        self.assertEqual(
+            [route.bank_code for route in self.routing.routes(enabled_only=True)],
+            ["0119"],
+        )
+
+    def test_reload_on_mtime_change(self):
+        """Test the table is rebuilt only when the file changes"""
+        table = self.routing.table
+        self.assertIs(self.routing.table, table)
+
+        self._write(CONTACTS[1:], mtime=2000)
+        self.assertIsNot(self.routing.table, table)
+        self.assertIsNone(self.routing.get("119"))
+
+    def test_invalid_file_keeps_table(self):
+        """Test a broken file keeps serving the previous table"""
+        self.assertIsNotNone(self.routing.get("119"))
+        self._write("{not json", mtime=2000)
+        self.assertIsNotNone(self.routing.get("119"))
+
+
+if __name__ == "__main__":
+    unittest.main()
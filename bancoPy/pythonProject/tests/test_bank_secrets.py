@@ -0,0 +1,203 @@
+"""
+Test per-bank HMAC secrets, message formats and digests
+"""
+
+import unittest
+import sys
+import os
+import hashlib
+import hmac
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.utils.bank_routing import BankRoutingRegistry
+from app.utils.bank_secrets import BankSecretRegistry, sender_bank_code
+from app.utils.hmac_generator import (
+    DIGEST_HMAC_MD5,
+    DIGEST_HMAC_SHA256,
+    FORMAT_CONCAT,
+    HmacVerifier,
+    generate_hmac_for_account_transfer,
+)
+
+TIMESTAMP = "2025-01-01T00:00:00Z"
+
+
+def account_payload(bank_code, account_number, transaction_id="txn-1"):
+    return {
+        "timestamp": TIMESTAMP,
+        "transaction_id": transaction_id,
+        "sender": {"account_number": account_number, "bank_code": bank_code},
+        "receiver": {"account_number": "CR21-0152-0001-00-0000-0001-23"},
+        "amount": {"value": 1500.5, "currency": "CRC"},
+    }
+
+
+class TestHmacVerifierDigests(unittest.TestCase):
+    def test_keyed_digests_match_reference(self):
+        """Test primed HMAC states match hmac.new over the whole message"""
+        fields = ("CR21-0119-0001", TIMESTAMP, "txn-1", "1500.5")
+        for digest, digestmod in (
+            (DIGEST_HMAC_MD5, hashlib.md5),
+            (DIGEST_HMAC_SHA256, hashlib.sha256),
+        ):
+            verifier = HmacVerifier("clave-peer", FORMAT_CONCAT, digest)
+            expected = hmac.new(
+                b"clave-peer",
+                f"CR21-0119-0001{TIMESTAMP}txn-11500.50".encode(),
+                digestmod,
+            ).hexdigest()
+            self.assertEqual(verifier.sign(*fields), expected)
+            self.assertEqual(verifier.sign(*fields), expected)  # state not consumed
+
+    def test_unknown_digest_rejected(self):
+        """Test unsupported digests fail at construction"""
+        with self.assertRaises(ValueError):
+            HmacVerifier("clave", digest="sha1")
+
+
+class TestBankSecretRegistry(unittest.TestCase):
+    def setUp(self):
+        self.routing = BankRoutingRegistry(path=None)
+        self.routing.load_contacts(
+            [
+                {"codigo": "152", "IP": "127.0.0.1:5000"},
+                {
+                    "codigo": "241",
+                    "IP": "127.0.0.1:5050",
+                    "hmac": {"digest": "hmac-sha256", "clave": "clave-241"},
+                },
+                {
+                    "codigo": "876",
+                    "IP": "127.0.0.1:5060",
+                    "hmac": {"digest": "sha1"},
+                },
+            ]
+        )
+        self.secrets = BankSecretRegistry(routing=self.routing)
+
+    def test_sender_bank_code(self):
+        """Test the sender bank comes from bank_code, the IBAN or sender_bank"""
+        self.assertEqual(sender_bank_code({"sender": {"bank_code": "119"}}), "0119")
+        self.assertEqual(
+            sender_bank_code({"sender": {"account_number": "CR21-0241-0001-58"}}),
+            "0241",
+        )
+        self.assertEqual(sender_bank_code({"sender_bank": "0151"}), "0151")
+        self.assertIsNone(sender_bank_code({"sender": {"phone_number": "8888"}}))
+
+    def test_declared_bank_must_match_iban(self):
+        """Test the IBAN decides the sender bank and a conflicting code fails"""
+        self.assertEqual(
+            sender_bank_code(
+                {"sender": {"account_number": "CR21-0241-0001", "bank_code": "241"}}
+            ),
+            "0241",
+        )
+        with self.assertRaises(ValueError):
+            sender_bank_code(
+                {"sender": {"account_number": "CR21-0241-0001", "bank_code": "152"}}
+            )
+
+        # Signed correctly for 0241 but claiming to come from another bank
+        payload = account_payload("876", "CR21-0241-0001")
+        signature = self.secrets.verifier_for("241").sign(
+            "CR21-0241-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        self.assertFalse(self.secrets.verify(payload, signature))
+        payload["sender"]["bank_code"] = "0241"
+        self.assertTrue(self.secrets.verify(payload, signature))
+
+    def test_verifier_per_sender_bank(self):
+        """Test each sender bank is checked with its own secret and digest"""
+        self.secrets.register("119", "clave-ts", FORMAT_CONCAT, DIGEST_HMAC_MD5)
+
+        prueba = account_payload("119", "CR21-0119-0001")
+        signature = hmac.new(
+            b"clave-ts", f"CR21-0119-0001{TIMESTAMP}txn-11500.50".encode(), "md5"
+        ).hexdigest()
+        self.assertTrue(self.secrets.verify(prueba, signature))
+
+        # The shared legacy signature is not accepted for a configured bank
+        legacy = generate_hmac_for_account_transfer(
+            "CR21-0119-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        self.assertFalse(self.secrets.verify(prueba, legacy))
+
+        # Once banks have their own secrets, unconfigured banks are rejected
+        local = account_payload("152", "CR21-0152-0001")
+        local_signature = generate_hmac_for_account_transfer(
+            "CR21-0152-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        self.assertFalse(self.secrets.verify(local, local_signature))
+        self.assertIsNone(self.secrets.sender_verifier("999"))
+
+    def test_shared_secret_without_bank_config(self):
+        """Test every sender uses the shared secret while no bank has its own"""
+        routing = BankRoutingRegistry(path=None)
+        routing.load_contacts([{"codigo": "152", "IP": "127.0.0.1:5000"}])
+        secrets = BankSecretRegistry(routing=routing)
+
+        local = account_payload("152", "CR21-0152-0001")
+        signature = generate_hmac_for_account_transfer(
+            "CR21-0152-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        local["hmac_md5"] = signature
+        self.assertTrue(secrets.verify(local, signature))
+        self.assertIs(secrets.sender_verifier("999"), secrets.default)
+        self.assertEqual(
+            secrets.verify_many([local, dict(local, sender={"bank_code": "151"})]),
+            [True, False],
+        )
+
+    def test_contacts_and_environment(self):
+        """Test "hmac" blocks and HMAC_SECRET_<code> configure banks"""
+        payload = account_payload("241", "CR21-0241-0001")
+        signature = hmac.new(
+            b"clave-241",
+            f"CR21-0241-0001,{TIMESTAMP},txn-1,1500.50".encode(),
+            "sha256",
+        ).hexdigest()
+        payload["hmac_md5"] = signature
+        self.assertTrue(self.secrets.verify(payload, signature))
+        # Invalid blocks reject the bank instead of using the default secret
+        self.assertIsNone(self.secrets.sender_verifier("876"))
+        self.routing.load_contacts(
+            list(self.routing.table.contacts)
+            + [{"codigo": "877", "IP": "127.0.0.1:5070", "hmac": {"formato": "concat"}}]
+        )
+        self.assertIsNone(self.secrets.sender_verifier("877"))
+
+        os.environ["HMAC_SECRET_0241"] = "rotada"
+        try:
+            self.routing.load_contacts(self.routing.table.contacts)
+            self.assertFalse(self.secrets.verify(payload, signature))
+        finally:
+            del os.environ["HMAC_SECRET_0241"]
+
+        self.assertEqual(
+            self.secrets.get_formats(),
+            {"0241": {"message_format": "comma", "digest": "hmac-sha256"}},
+        )
+
+    def test_verify_many_mixed_banks(self):
+        """Test a batch is checked per sender bank; unconfigured banks fail"""
+        good = account_payload("241", "CR21-0241-0001")
+        good["hmac_md5"] = self.secrets.verifier_for("241").sign(
+            "CR21-0241-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        shared = account_payload("152", "CR21-0152-0001")
+        shared["hmac_md5"] = generate_hmac_for_account_transfer(
+            "CR21-0152-0001", TIMESTAMP, "txn-1", 1500.5
+        )
+        wrong = dict(shared, sender={"account_number": "CR21-0241-0001"})
+
+        self.assertEqual(
+            self.secrets.verify_many([good, shared, wrong, None]),
+            [True, False, False, False],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
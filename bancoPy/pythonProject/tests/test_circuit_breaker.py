@@ -0,0 +1,144 @@
+"""
+Test per-peer circuit breakers and adaptive timeouts
+"""
+
+import unittest
+import sys
+import os
+import socket
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.bank_connector_service import BankConnectorService
+from app.services.circuit_breaker_service import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    PeerCircuitBreakers,
+    backoff_delay,
+)
+from app.services.peer_session_service import PeerSessionPool
+from app.utils.bank_routing import BankRoutingRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breakers = PeerCircuitBreakers(
+            failure_threshold=3, reset_timeout=10, clock=self.clock
+        )
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and successes reset the count"""
+        for _ in range(2):
+            self.breakers.record_failure("0119")
+        self.breakers.record_success("0119")
+        for _ in range(2):
+            self.breakers.record_failure("0119")
+        self.assertTrue(self.breakers.allow_request("0119"))
+
+        self.breakers.record_failure("0119")
+        self.assertEqual(self.breakers.get("0119").state, OPEN)
+        self.assertFalse(self.breakers.allow_request("0119"))
+        self.assertTrue(self.breakers.allow_request("0241"))
+
+    def test_half_open_single_trial(self):
+        """Test one trial call after the cooldown decides the circuit state"""
+        breaker = self.breakers.get("0119")
+        for _ in range(3):
+            breaker.record_failure()
+        first_cooldown = breaker.cooldown
+        self.assertTrue(5 <= first_cooldown <= 10)
+
+        self.clock.now += first_cooldown + 0.001
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        # A failed trial reopens with a longer cooldown
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertTrue(10 <= breaker.cooldown <= 20)
+
+        self.clock.now += breaker.cooldown + 0.001
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_health_check_feeds_breaker(self):
+        """Test a healthy probe half-opens an open circuit early"""
+        for _ in range(3):
+            self.breakers.record_health_check("0119", healthy=False)
+        self.assertTrue(self.breakers.is_open("0119"))
+
+        self.breakers.record_health_check("0119", healthy=True)
+        self.assertFalse(self.breakers.is_open("0119"))
+        self.assertTrue(self.breakers.allow_request("0119"))
+
+    def test_adaptive_timeout_and_backoff(self):
+        """Test timeouts follow p99 latency within bounds and backoff is capped"""
+        self.assertEqual(self.breakers.timeout_for(None), 10.0)
+        self.assertAlmostEqual(self.breakers.timeout_for(0.5), 1.5)
+        self.assertEqual(self.breakers.timeout_for(0.01), 1.0)
+        self.assertEqual(self.breakers.timeout_for(60), 10.0)
+
+        for attempt in range(10):
+            delay = backoff_delay(attempt, base=0.1, cap=1.0)
+            self.assertTrue(0 <= delay <= min(1.0, 0.1 * 2**attempt))
+
+    def test_dead_peer_fails_fast(self):
+        """Test a dead peer opens its circuit and later transfers skip the network"""
+        routing = BankRoutingRegistry(path=None)
+        routing.load_contacts(
+            [
+                {
+                    "contacto": "dead",
+                    "codigo": "119",
+                    "IP": f"127.0.0.1:{unused_port()}",
+                }
+            ]
+        )
+        pool = PeerSessionPool()
+        breakers = PeerCircuitBreakers(failure_threshold=2)
+        connector = BankConnectorService(
+            sessions=pool, routing=routing, breakers=breakers
+        )
+        connector.use_https = False
+        payload = {"transaction_id": "t-1", "amount": 10, "timestamp": "now"}
+
+        result = connector.send_sinpe_transfer_to_bank(
+            "CR21-0119-0001-00-0000-0001-23", payload
+        )
+        self.assertFalse(result["success"])
+        self.assertEqual(result.get("circuit"), "open")
+        requests_sent = sum(s["requests"] for s in pool.get_stats().values())
+        self.assertEqual(requests_sent, 2)
+
+        result = connector.send_sinpe_transfer_to_bank(
+            "CR21-0119-0001-00-0000-0001-23", payload
+        )
+        self.assertEqual(result.get("circuit"), "open")
+        self.assertEqual(
+            sum(s["requests"] for s in pool.get_stats().values()), requests_sent
+        )
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
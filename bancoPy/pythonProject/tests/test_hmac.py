@@ -9,7 +9,11 @@ import os
 # Add app directory to path
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
 
+import hashlib
+from decimal import Decimal
+
 from app.utils.hmac_generator import (
+    HmacVerifier,
     generate_hmac_for_account_transfer,
     generate_hmac_for_phone_transfer,
     verify_hmac,
@@ -106,5 +110,51 @@ class TestHMACGeneration(unittest.TestCase):
         self.assertFalse(verify_hmac(payload, "invalid_hmac"))
 
 
+class TestHmacVerifier(unittest.TestCase):
+    def test_primed_digest_matches_full_message(self):
+        """Test the copied key state yields the same digest as hashing it all"""
+        verifier = HmacVerifier("otra-clave")
+        message = "otra-clave,88887777,2024-01-15T10:30:00Z,txn-1,5000.00"
+
+        expected = hashlib.md5(message.encode()).hexdigest()
+        for amount in (5000, 5000.0, "5000", Decimal("5000.00")):
+            self.assertEqual(
+                verifier.sign("88887777", "2024-01-15T10:30:00Z", "txn-1", amount),
+                expected,
+            )
+        self.assertEqual(
+            generate_hmac_for_phone_transfer(
+                "88887777", "2024-01-15T10:30:00Z", "txn-1", 5000, "otra-clave"
+            ),
+            expected,
+        )
+
+    def test_verify_many(self):
+        """Test batch verification flags each payload in order"""
+        verifier = HmacVerifier()
+
+        def payload(phone, amount):
+            item = {
+                "timestamp": "2024-01-15T10:30:00Z",
+                "transaction_id": f"txn-{phone}",
+                "sender": {"phone_number": phone},
+                "amount": {"value": amount, "currency": "CRC"},
+            }
+            item["hmac_md5"] = generate_hmac_for_phone_transfer(
+                phone, item["timestamp"], item["transaction_id"], amount
+            ).upper()
+            return item
+
+        tampered = payload("88886666", 100)
+        tampered["amount"]["value"] = 1000
+
+        self.assertEqual(
+            verifier.verify_many(
+                [payload("88887777", 250.5), tampered, {"sender": {}}, "not-a-dict"]
+            ),
+            [True, False, False, False],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,168 @@
+"""
+Test exactly-once processing of incoming transfers replayed by peer banks
+"""
+
+import unittest
+import sys
+import os
+import threading
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.models import db, Account, ProcessedTransfer, Transaction
+from app.services.idempotency_service import incoming_transfers
+from app.services.sinpe_service import SinpeService
+from app.utils.transfers import SINPE_MOVIL, IncomingTransfer
+from tests.base import AppTestCase
+
+RECEIVER = "152001234567892"
+
+
+class TestIncomingIdempotency(AppTestCase):
+    database_file = "idempotency.db"
+
+    def _incoming(self, transaction_id, receiver_account="CR210152152001234567892"):
+        return SinpeService.process_incoming_sinpe_transfer(
+            sender_account="CR21-0151-0001-00-0000-0001-23",
+            sender_bank="0151",
+            sender_name="Banco Externo",
+            receiver_account=receiver_account,
+            receiver_bank="0152",
+            receiver_name="María Rodríguez Soto",
+            amount=2500,
+            currency="CRC",
+            description="Pago",
+            transaction_id=transaction_id,
+            timestamp="2025-01-01T00:00:00Z",
+        )
+
+    def _movil(self, transaction_id):
+        return SinpeService.process_incoming_sinpe_movil_transfer(
+            sender_phone="87001122",
+            receiver_phone="88886666",
+            amount=1000,
+            currency="CRC",
+            description="Pago",
+            transaction_id=transaction_id,
+            timestamp="2025-01-01T00:00:00Z",
+        )
+
+    def _batch(self, *transaction_ids):
+        transfers = [
+            IncomingTransfer(
+                kind=SINPE_MOVIL,
+                transaction_id=transaction_id,
+                amount=Decimal("1000"),
+                currency="CRC",
+                timestamp=None,
+                description="Pago",
+                sender_phone="87001122",
+                receiver_phone="88886666",
+            )
+            for transaction_id in transaction_ids
+        ]
+        return [
+            result.to_dict()
+            for result in SinpeService.process_incoming_transfer_batch(transfers)
+        ]
+
+    def _balance(self):
+        db.session.expire_all()
+        return Account.query.filter_by(number=RECEIVER).first().balance
+
+    def test_replay_returns_original_result(self):
+        """Test a retried transfer gets the first result and is credited once"""
+        first = self._incoming("ext-replay")
+        self.assertTrue(first["success"], first)
+
+        self.assertEqual(self._incoming("ext-replay"), first)
+        self.assertEqual(self._balance(), Decimal("102500.00"))
+        self.assertEqual(
+            Transaction.query.filter_by(transaction_id="ext-replay").count(), 1
+        )
+
+    def test_replay_after_cache_miss_uses_table(self):
+        """Test the stored result is served once the memory front forgot it"""
+        first = self._movil("ext-movil-replay")
+        self.assertTrue(first["success"], first)
+        incoming_transfers.reset()
+
+        self.assertEqual(self._movil("ext-movil-replay"), first)
+        self.assertEqual(self._balance(), Decimal("101000.00"))
+        self.assertEqual(incoming_transfers.cached("ext-movil-replay").to_dict(), first)
+
+    def test_failed_transfer_does_not_claim(self):
+        """Test a rejected transfer can be retried with the same id"""
+        result = self._incoming("ext-retry", receiver_account="CR210152999999999999999")
+        self.assertFalse(result["success"])
+        self.assertIsNone(db.session.get(ProcessedTransfer, "ext-retry"))
+
+        self.assertTrue(self._incoming("ext-retry")["success"])
+        self.assertEqual(self._balance(), Decimal("102500.00"))
+
+    def test_concurrent_replays_credit_once(self):
+        """Test simultaneous deliveries of one transfer apply a single credit"""
+        results = []
+
+        def worker():
+            with self.app.app_context():
+                results.append(self._incoming("ext-concurrent"))
+                db.session.remove()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result == results[0] for result in results), results)
+        self.assertTrue(results[0]["success"])
+        self.assertEqual(self._balance(), Decimal("102500.00"))
+
+    def test_batch_item_replayed_as_single(self):
+        """Test a transfer first credited in a batch replays on the single path"""
+        (first,) = self._batch("ext-batch-first")
+        self.assertTrue(first["success"], first)
+
+        self.assertEqual(self._movil("ext-batch-first"), first)
+        incoming_transfers.reset()
+        self.assertEqual(self._movil("ext-batch-first"), first)
+        self.assertEqual(self._balance(), Decimal("101000.00"))
+
+    def test_single_replayed_in_batch(self):
+        """Test a batch item already credited singly returns the original result"""
+        first = self._movil("ext-single-first")
+        self.assertTrue(first["success"], first)
+
+        replayed, fresh = self._batch("ext-single-first", "ext-batch-new")
+        self.assertEqual(replayed, first)
+        self.assertTrue(fresh["success"], fresh)
+
+        incoming_transfers.reset()
+        self.assertEqual(self._batch("ext-single-first"), [first])
+        self.assertEqual(self._balance(), Decimal("102000.00"))
+        self.assertEqual(
+            ProcessedTransfer.query.filter(
+                ProcessedTransfer.transaction_id.in_(
+                    ["ext-single-first", "ext-batch-new"]
+                )
+            ).count(),
+            2,
+        )
+
+    def test_legacy_transaction_is_duplicate(self):
+        """Test ids recorded before the idempotency table are still rejected"""
+        sample = Transaction.query.first()
+
+        result = self._incoming(sample.transaction_id)
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Transacción duplicada")
+        self.assertEqual(self._balance(), Decimal("100000.00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Test the orjson JSON provider and the column-tuple list endpoints
+"""
+
+import unittest
+import sys
+import os
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from flask import Flask
+from app.models import db, Account, Transaction, User
+from app.routes.account_routes import account_bp
+from app.routes.transaction_routes import transaction_bp
+from app.routes.user_routes import user_bp
+from app.utils.json_provider import ORJSON_AVAILABLE, FastJSONProvider
+from app.utils.transfers import TransferResult
+from tests.base import AppTestCase
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def _providers(self):
+        providers = [FastJSONProvider(self.app, use_orjson=False)]
+        if ORJSON_AVAILABLE:
+            providers.append(FastJSONProvider(self.app))
+        return providers
+
+    def test_encodes_decimal_and_datetime(self):
+        """Test both backends encode like the models' to_dict"""
+        document = {
+            "amount": Decimal("1500.75"),
+            "created_at": datetime(2025, 1, 1, 12, 30, 15, 123456),
+            "result": TransferResult(success=True, transaction_id="txn-1"),
+            "name": "María",
+        }
+        for provider in self._providers():
+            self.assertEqual(
+                json.loads(provider.dumps(document)),
+                {
+                    "amount": 1500.75,
+                    "created_at": "2025-01-01T12:30:15.123456",
+                    "result": {
+                        "success": True,
+                        "transaction_id": "txn-1",
+                        "error": None,
+                        "receiver_account": None,
+                        "receiver_phone": None,
+                        "amount": None,
+                        "new_balance": None,
+                    },
+                    "name": "María",
+                },
+            )
+
+    def test_response_and_loads(self):
+        """Test responses keep key order and loads accepts stdlib-only input"""
+        with self.app.app_context():
+            for provider in self._providers():
+                response = provider.response({"b": 1, "a": Decimal("2.50")})
+                self.assertEqual(response.get_data(), b'{"b":1,"a":2.5}\n')
+                self.assertEqual(response.mimetype, "application/json")
+
+                self.assertEqual(provider.loads(b'{"value": 0.1}'), {"value": 0.1})
+                self.assertEqual(provider.loads(str(2**70)), 2**70)
+
+
+class TestColumnListEndpoints(AppTestCase):
+    blueprints = (user_bp, account_bp, transaction_bp)
+
+    def setUp(self):
+        super().setUp()
+        self.app.json = FastJSONProvider(self.app)
+        db.session.add(
+            Transaction(
+                transaction_id=str(uuid.uuid4()),
+                from_account_id=1,
+                to_account_id=2,
+                amount=Decimal("1250.50"),
+                status="completed",
+                description="Pago",
+                created_at=datetime(2025, 1, 1, 12, 0, 0, 250000),
+            )
+        )
+        db.session.commit()
+
+    def test_lists_match_to_dict(self):
+        """Test column-tuple lists return the same records as to_dict()"""
+        for url, model in (
+            ("/api/users", User),
+            ("/api/accounts", Account),
+            ("/api/transactions?limit=100", Transaction),
+        ):
+            data = self.client.get(url).get_json()["data"]
+            expected = {item.id: item.to_dict() for item in model.query.all()}
+            self.assertEqual({item["id"]: item for item in data}, expected, url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Test ledger snapshots and incremental integrity checks
+"""
+
+import unittest
+import sys
+import os
+import uuid
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from sqlalchemy import event
+from app.models import db, Account, LedgerSnapshot, Transaction
+from app.services.account_balance_service import AccountBalanceService
+from tests.base import AppTestCase
+
+
+class TestLedgerIntegrity(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self._transfers([("152001234567890", "152001234567892", "120.25")] * 3)
+
+    def _transfers(self, transfers):
+        for source, dest, amount in transfers:
+            result = AccountBalanceService.transfer_between_accounts(
+                source, dest, Decimal(amount), transaction_id=str(uuid.uuid4())
+            )
+            self.assertTrue(result["success"], result)
+
+    def _full_replay(self, account):
+        """Net of every completed transaction, as the check used to compute it"""
+        net = Decimal("0.00")
+        for tx in Transaction.query.filter_by(status="completed"):
+            if tx.from_account_id == account.id:
+                net -= tx.amount
+            if tx.to_account_id == account.id:
+                net += tx.amount
+        return net
+
+    def test_incremental_check_matches_full_replay(self):
+        """Test checkpoint + replayed tail equals replaying the whole history"""
+        AccountBalanceService.checkpoint_ledger()
+        self._transfers([("152001234567892", "152001234567890", "10.10")])
+
+        account = Account.query.filter_by(number="152001234567892").first()
+        result = AccountBalanceService.validate_account_integrity(account.number)
+
+        self.assertEqual(result["replayed_transactions"], 1)
+        self.assertEqual(
+            result["total_transactions"],
+            Transaction.query.filter_by(status="completed", from_account_id=account.id)
+            .union_all(
+                Transaction.query.filter_by(
+                    status="completed", to_account_id=account.id
+                )
+            )
+            .count(),
+        )
+        self.assertEqual(
+            Decimal(str(result["calculated_balance"])), self._full_replay(account)
+        )
+
+    def _plan(self, statement):
+        sql = str(statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+        return [
+            row[3] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"))
+        ]
+
+    def test_single_account_check_uses_indexes(self):
+        """Test the per-account check seeks that account's rows only"""
+        plan = self._plan(AccountBalanceService._ledger_summary(1))
+
+        self.assertFalse([step for step in plan if "SCAN transactions" in step], plan)
+        self.assertEqual(
+            len([step for step in plan if step.startswith("SEARCH transactions")]), 2
+        )
+
+    def test_all_accounts_check_skips_checkpointed_rows(self):
+        """Test the bulk check reads only transactions after the checkpoints"""
+        AccountBalanceService.checkpoint_ledger()
+        self._transfers([("152001234567890", "152001234567895", "1.00")])
+
+        plan = self._plan(AccountBalanceService._ledger_summary())
+        self.assertFalse([step for step in plan if "SCAN transactions" in step], plan)
+        self.assertEqual(
+            [step for step in plan if step.startswith("SEARCH transactions")],
+            ["SEARCH transactions USING INTEGER PRIMARY KEY (rowid>?)"] * 2,
+        )
+
+        # Only the new transfer's debit and credit are replayed
+        flows = AccountBalanceService._ledger_flows()
+        self.assertEqual(
+            db.session.execute(db.select(db.func.count()).select_from(flows)).scalar(),
+            2,
+        )
+
+    def test_checkpoint_is_incremental(self):
+        """Test a second checkpoint only advances accounts with new activity"""
+        first = AccountBalanceService.checkpoint_ledger()
+        self.assertEqual(first["accounts_checkpointed"], Account.query.count())
+
+        self._transfers([("152001234567893", "152001234567894", "5.00")])
+        second = AccountBalanceService.checkpoint_ledger()
+        self.assertEqual(second["accounts_checkpointed"], 2)
+
+        account = Account.query.filter_by(number="152001234567893").first()
+        snapshot = LedgerSnapshot.query.filter_by(account_id=account.id).first()
+        self.assertEqual(snapshot.balance, self._full_replay(account))
+        self.assertEqual(
+            snapshot.last_transaction_id,
+            db.session.query(db.func.max(Transaction.id)).scalar(),
+        )
+
+    def test_validate_all_accounts_single_query(self):
+        """Test the bulk check is one aggregate and agrees with a full replay"""
+        AccountBalanceService.checkpoint_ledger()
+        self._transfers([("152001234567890", "152001234567895", "1.00")])
+
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            report = AccountBalanceService.validate_all_accounts()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(report["accounts_checked"], Account.query.count())
+        for result in report["results"]:
+            account = Account.query.filter_by(number=result["account_number"]).first()
+            self.assertEqual(
+                Decimal(str(result["calculated_balance"])),
+                self._full_replay(account),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Test the durable outbox for outgoing inter-bank transfers
+"""
+
+import unittest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.models import db, OutboxTransfer
+from app.routes.sinpe_routes import sinpe_bp
+from app.services.outbox_service import (
+    DELIVERED,
+    FAILED,
+    IN_FLIGHT,
+    PENDING,
+    SINPE,
+    OutboxService,
+)
+from tests.base import AppTestCase
+
+IBAN = "CR21-0119-0001-71-3176-4383-40"
+
+
+class FakeConnector:
+    """Returns scripted results and records delivered payloads"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sent = []
+
+    def send_sinpe_transfer_to_bank(self, target_iban, payload):
+        self.sent.append(payload["transaction_id"])
+        return self.results.pop(0) if self.results else {"success": True}
+
+    send_sinpe_movil_transfer_to_bank = send_sinpe_transfer_to_bank
+
+
+def transfer_request():
+    return {
+        "sender": {"account_number": "152001234567890", "name": "Juan"},
+        "receiver": {"account_number": IBAN, "name": "Marconi"},
+        "amount": {"value": 1500, "currency": "CRC"},
+    }
+
+
+class TestOutbox(AppTestCase):
+    blueprints = (sinpe_bp,)
+    database_file = "outbox.db"
+
+    def _enqueue(self, outbox, transaction_id="t-1"):
+        entry, _ = outbox.enqueue(SINPE, IBAN, {"transaction_id": transaction_id})
+        return entry
+
+    def test_send_external_transfer_is_accepted(self):
+        """Test the API queues the transfer, returns 202 and is idempotent"""
+        headers = {"Idempotency-Key": "client-key-1"}
+        response = self.client.post(
+            "/api/api/send-external-transfer", json=transfer_request(), headers=headers
+        )
+        self.assertEqual(response.status_code, 202)
+        body = response.get_json()
+        self.assertEqual(body["status"], PENDING)
+        self.assertFalse(body["duplicate"])
+        self.assertEqual(response.headers["Location"], body["status_url"])
+
+        replay = self.client.post(
+            "/api/api/send-external-transfer", json=transfer_request(), headers=headers
+        )
+        self.assertEqual(replay.status_code, 202)
+        self.assertEqual(replay.get_json()["transaction_id"], body["transaction_id"])
+        self.assertTrue(replay.get_json()["duplicate"])
+        self.assertEqual(OutboxTransfer.query.count(), 1)
+
+        status = self.client.get(body["status_url"]).get_json()["data"]
+        self.assertEqual(status["status"], PENDING)
+        self.assertEqual(status["destination"], IBAN)
+        self.assertEqual(
+            self.client.get("/api/api/external-transfers/unknown").status_code, 404
+        )
+
+    def test_retryable_failure_is_retried(self):
+        """Test transient failures are rescheduled and later delivered"""
+        connector = FakeConnector(
+            {"success": False, "error": "Timeout", "retryable": True}
+        )
+        outbox = OutboxService(connector=connector)
+        entry = self._enqueue(outbox)
+
+        self.assertEqual(outbox.dispatch_pending(), 1)
+        db.session.refresh(entry)
+        self.assertEqual((entry.status, entry.attempts), (PENDING, 1))
+        self.assertGreater(entry.next_attempt_at, datetime.utcnow())
+
+        # Not due yet
+        self.assertEqual(outbox.dispatch_pending(), 0)
+
+        entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        self.assertEqual(outbox.dispatch_pending(), 1)
+        db.session.refresh(entry)
+        self.assertEqual((entry.status, entry.attempts), (DELIVERED, 2))
+        self.assertIsNotNone(entry.delivered_at)
+        self.assertEqual(connector.sent, ["t-1", "t-1"])
+
+    def test_permanent_failure_and_attempt_limit(self):
+        """Test rejected transfers and exhausted retries end as failed"""
+        connector = FakeConnector(
+            {"success": False, "error": "Error del banco destino: 400"},
+            {"success": False, "error": "Timeout", "retryable": True},
+        )
+        outbox = OutboxService(connector=connector, max_attempts=1)
+        rejected = self._enqueue(outbox, "t-1")
+        exhausted = self._enqueue(outbox, "t-2")
+
+        self.assertEqual(outbox.dispatch_pending(), 2)
+        for entry in (rejected, exhausted):
+            db.session.refresh(entry)
+            self.assertEqual(entry.status, FAILED)
+        self.assertEqual(rejected.last_error, "Error del banco destino: 400")
+
+    def test_duplicate_on_retry_is_delivered(self):
+        """Test a duplicate rejection after a lost response counts as delivered"""
+        duplicate = {
+            "success": False,
+            "error": "Error del banco destino: 400",
+            "details": '{"success": false, "error": "Transacci\\u00f3n duplicada"}',
+        }
+        connector = FakeConnector(
+            {"success": False, "error": "Timeout", "retryable": True},
+            dict(duplicate),
+            dict(duplicate),
+        )
+        outbox = OutboxService(connector=connector)
+        retried = self._enqueue(outbox, "t-1")
+        self.assertEqual(outbox.dispatch_pending(), 1)
+
+        # On a first attempt the id was already used by someone else
+        first = self._enqueue(outbox, "t-2")
+        retried.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        self.assertEqual(outbox.dispatch_pending(), 2)
+
+        db.session.refresh(retried)
+        db.session.refresh(first)
+        self.assertEqual((retried.status, retried.attempts), (DELIVERED, 2))
+        self.assertIsNotNone(retried.delivered_at)
+        self.assertEqual((first.status, first.attempts), (FAILED, 1))
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test an entry stuck in flight is delivered again after its lease"""
+        outbox = OutboxService(connector=FakeConnector(), lease_seconds=60)
+        entry = self._enqueue(outbox)
+        self.assertEqual(len(outbox.claim(10)), 1)
+        self.assertEqual(outbox.claim(10), [])
+
+        db.session.refresh(entry)
+        self.assertEqual(entry.status, IN_FLIGHT)
+        entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        self.assertEqual(outbox.dispatch_pending(), 1)
+        db.session.refresh(entry)
+        self.assertEqual((entry.status, entry.attempts), (DELIVERED, 2))
+
+    def test_background_dispatcher(self):
+        """Test the dispatcher pool delivers queued transfers"""
+        connector = FakeConnector()
+        outbox = OutboxService(connector=connector, workers=2, poll_interval=0.05)
+        for i in range(5):
+            self._enqueue(outbox, f"t-{i}")
+
+        outbox.start(self.app)
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if outbox.get_stats()["counts"][DELIVERED] == 5:
+                    break
+                db.session.remove()
+                time.sleep(0.05)
+        finally:
+            outbox.stop()
+
+        self.assertEqual(outbox.get_stats()["counts"][DELIVERED], 5)
+        self.assertEqual(sorted(connector.sent), [f"t-{i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
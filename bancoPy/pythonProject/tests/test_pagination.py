@@ -0,0 +1,116 @@
+"""
+Test keyset pagination of transaction listings
+"""
+
+import unittest
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.models import db, Transaction
+from app.routes.transaction_routes import transaction_bp
+from app.services.account_balance_service import AccountBalanceService
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.base import AppTestCase
+
+
+class TestKeysetPagination(AppTestCase):
+    blueprints = (transaction_bp,)
+
+    def setUp(self):
+        super().setUp()
+        # Pairs of rows share a timestamp so the id tie-breaker is exercised
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(24):
+            from_id, to_id = [(1, 3), (3, 1), (2, 4), (1, 1)][i % 4]
+            db.session.add(
+                Transaction(
+                    transaction_id=str(uuid.uuid4()),
+                    from_account_id=from_id,
+                    to_account_id=to_id,
+                    amount=Decimal("10.00"),
+                    status="completed",
+                    created_at=base + timedelta(minutes=i // 2),
+                )
+            )
+        db.session.commit()
+
+    def _collect(self, url, limit):
+        ids, cursor = [], None
+        while True:
+            query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+            body = self.client.get(url + query).get_json()
+            self.assertLessEqual(len(body["data"]), limit)
+            ids.extend(tx["id"] for tx in body["data"])
+            cursor = body["pagination"]["next_cursor"]
+            if not cursor:
+                return ids
+
+    def _expected(self, *filters):
+        query = Transaction.query.filter(*filters)
+        rows = query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        return [tx.id for tx in rows]
+
+    def test_cursor_roundtrip(self):
+        """Test cursors decode to the encoded position"""
+        created_at = datetime(2025, 1, 1, 12, 30, 15, 123456)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_all_transactions_pages(self):
+        """Test paging visits every transaction once in newest-first order"""
+        self.assertEqual(self._collect("/api/transactions", 5), self._expected())
+
+    def test_account_transactions_union(self):
+        """Test sent and received rows merge, self-transfers appear once"""
+        ids = self._collect("/api/accounts/152001234567890/transactions", 4)
+        expected = self._expected(
+            (Transaction.from_account_id == 1) | (Transaction.to_account_id == 1)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_optional_total(self):
+        """Test the total count is only computed when requested"""
+        body = self.client.get("/api/transactions?limit=5").get_json()
+        self.assertNotIn("total", body["pagination"])
+
+        body = self.client.get(
+            "/api/accounts/152001234567890/transactions?limit=5&include_total=true"
+        ).get_json()
+        self.assertEqual(body["pagination"]["total"], 19)
+
+    def test_transaction_history_latest_first(self):
+        """Test history returns the latest N across sent and received rows"""
+        expected = self._expected(
+            (Transaction.from_account_id == 1) | (Transaction.to_account_id == 1)
+        )
+
+        history = AccountBalanceService.get_transaction_history(
+            "152001234567890", limit=7
+        )
+        self.assertEqual([tx["id"] for tx in history], expected[:7])
+
+    def test_transaction_history_stream(self):
+        """Test the streaming variant yields the whole history in order"""
+        expected = self._expected(
+            (Transaction.from_account_id == 1) | (Transaction.to_account_id == 1)
+        )
+
+        stream = AccountBalanceService.iter_transaction_history(
+            "152001234567890", batch_size=4
+        )
+        self.assertEqual([tx["id"] for tx in stream], expected)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a bad request"""
+        response = self.client.get("/api/transactions?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
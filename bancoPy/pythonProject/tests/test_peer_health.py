@@ -0,0 +1,108 @@
+"""
+Test the cached inter-bank health snapshot and latency histograms
+"""
+
+import unittest
+import sys
+import os
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from flask import Flask
+from app.routes.monitoring_routes import monitoring_bp
+from app.services.peer_health_service import (
+    LatencyHistogram,
+    PeerHealthRegistry,
+    peer_health,
+)
+
+
+class FakeHealthConnector:
+    """Scripted check_health results; counts network rounds"""
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.calls = 0
+
+    def check_health(self, protocol=None, timeout=None):
+        self.calls += 1
+        return self.rounds.pop(0)
+
+
+def result(healthy, latency_ms, status_code=200):
+    return {
+        "bank": "Banco",
+        "healthy": healthy,
+        "status_code": status_code,
+        "latency_ms": latency_ms,
+    }
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        """Test samples land in the right bucket and percentiles use bounds"""
+        histogram = LatencyHistogram(bounds=(10, 100, 1000))
+        for latency in (3, 8, 40, 90, 95, 400, 2000):
+            histogram.observe(latency)
+
+        data = histogram.to_dict()
+        self.assertEqual(
+            data["buckets"],
+            {"le_10ms": 2, "le_100ms": 3, "le_1000ms": 1, "gt_1000ms": 1},
+        )
+        self.assertEqual(data["count"], 7)
+        self.assertEqual(data["p50_ms"], 100)
+        self.assertIsNone(data["p99_ms"])
+
+
+class TestPeerHealthRegistry(unittest.TestCase):
+    def test_probe_publishes_snapshot(self):
+        """Test a probe round publishes status, timestamps and histograms"""
+        connector = FakeHealthConnector(
+            {"0119": result(True, 40), "0241": result(False, 5000, None)},
+            {"0119": result(False, 30, 503), "0241": result(True, 20)},
+        )
+        registry = PeerHealthRegistry(connector=connector)
+        self.assertIsNone(registry.snapshot()["age_seconds"])
+
+        registry.probe()
+        snapshot = registry.snapshot()
+        self.assertEqual((snapshot["reachable_banks"], snapshot["total_banks"]), (1, 2))
+        self.assertEqual(snapshot["status"], "partial")
+        self.assertIsNotNone(snapshot["age_seconds"])
+        # Connection failures are not latency samples
+        self.assertEqual(snapshot["peers"]["0241"]["latency_histogram"]["count"], 0)
+
+        first_success = snapshot["peers"]["0119"]["last_success_at"]
+        registry.probe()
+        peers = registry.snapshot()["peers"]
+        self.assertEqual(peers["0119"]["last_success_at"], first_success)
+        self.assertEqual(peers["0119"]["latency_histogram"]["count"], 2)
+        self.assertEqual(connector.calls, 2)
+
+    def test_snapshot_reads_do_not_probe(self):
+        """Test the monitoring endpoint serves the cache without network calls"""
+        peer_health.stop()
+        original = peer_health.connector
+        connector = FakeHealthConnector({"0119": result(True, 12)})
+        peer_health.connector = connector
+        try:
+            peer_health.probe()
+
+            app = Flask(__name__)
+            app.register_blueprint(monitoring_bp, url_prefix="/api/monitoring")
+            client = app.test_client()
+            for _ in range(3):
+                response = client.get("/api/monitoring/metrics/inter-bank")
+                self.assertEqual(response.status_code, 200)
+
+            data = response.get_json()["data"]["inter_bank"]
+            self.assertTrue(data["peers"]["0119"]["healthy"])
+            self.assertEqual(connector.calls, 1)
+        finally:
+            peer_health.connector = original
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Test pooled keep-alive sessions for inter-bank HTTP calls
+"""
+
+import unittest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.bank_connector_service import BankConnectorService
+from app.services.peer_session_service import PeerSessionPool
+from app.utils.bank_routing import BankRoutingRegistry
+
+
+class _PeerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections alive
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({"success": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPeerSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _PeerHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.peer = f"127.0.0.1:{self.server.server_address[1]}"
+        self.base_url = f"http://{self.peer}"
+        self.pool = PeerSessionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        """Test sequential requests to one peer share a single handshake"""
+        for _ in range(5):
+            response = self.pool.post(self.base_url, "/api/sinpe-transfer", json={})
+            self.assertEqual(response.status_code, 200)
+
+        stats = self.pool.get_stats()[self.base_url]
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["handshakes"], 1)
+        self.assertEqual(stats["errors"], 0)
+        self.assertIsNotNone(stats["p99_latency_ms"])
+
+    def test_observed_history_survives_session_creation(self):
+        """Test calls recorded before the peer's first session are kept"""
+        self.pool.observe(self.base_url, 0.2)
+        self.pool.observe(self.base_url, 0.4, error=True)
+
+        self.pool.post(self.base_url, "/api/sinpe-transfer", json={})
+
+        stats = self.pool.get_stats()[self.base_url]
+        self.assertEqual((stats["requests"], stats["errors"]), (3, 1))
+
+    def test_connector_uses_pooled_sessions(self):
+        """Test BankConnectorService sends transfers over the peer pool"""
+        routing = BankRoutingRegistry(path=None)
+        routing.load_contacts(
+            [{"contacto": "peer", "IBAN": "CR21-0119-0001-00", "IP": self.peer}]
+        )
+        connector = BankConnectorService(sessions=self.pool, routing=routing)
+        connector.use_https = False
+        payload = {"transaction_id": "t-1", "amount": 10, "timestamp": "now"}
+
+        for _ in range(3):
+            result = connector.send_sinpe_transfer_to_bank(
+                "CR21-0119-0001-00-0000-0001-23", payload
+            )
+            self.assertTrue(result["success"], result)
+
+        stats = self.pool.get_stats()[self.base_url]
+        self.assertEqual((stats["requests"], stats["handshakes"]), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Test the phone -> bank routing directory
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.bank_connector_service import BankConnectorService
+from app.services.phone_routing_service import PhoneRoutingDirectory, UNROUTABLE
+from app.utils.bank_routing import BankRoutingRegistry
+from tests.base import AppTestCase
+
+
+class TestPhoneRoutingDirectory(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.routing = PhoneRoutingDirectory()
+
+    def test_subscription_registry_route(self):
+        """Test subscribed phones route to their registered bank"""
+        self.assertEqual(self.routing.lookup("88883333"), "0151")
+        self.assertIsNone(self.routing.lookup("80000000"))
+
+    def test_learned_and_negative_routes(self):
+        """Test learned routes win and unroutable phones are cached"""
+        self.routing.learn("88883333", "119")
+        self.assertEqual(self.routing.lookup("88883333"), "0119")
+
+        self.routing.mark_unroutable("80000000")
+        self.assertEqual(self.routing.lookup("80000000"), UNROUTABLE)
+
+        self.routing.forget("80000000")
+        self.assertIsNone(self.routing.lookup("80000000"))
+
+    def test_refresh_from_file(self):
+        """Test bulk routes load from a JSON file and are swapped atomically"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "routes.json")
+            with open(path, "w") as f:
+                json.dump({"87770000": "241"}, f)
+            self.assertEqual(self.routing.refresh_from_file(path), 1)
+            self.assertEqual(self.routing.lookup("87770000"), "0241")
+
+            with open(path, "w") as f:
+                json.dump([{"phone": "87771111", "bank_code": "0876"}], f)
+            self.routing.refresh_from_file()
+
+        self.assertIsNone(self.routing.lookup("87770000"))
+        self.assertEqual(self.routing.lookup("87771111"), "0876")
+
+    def test_connector_resolves_routed_contact(self):
+        """Test a routed bank code maps to its peer endpoint"""
+        routing = BankRoutingRegistry(path=None)
+        routing.load_contacts(
+            [{"contacto": "brayan", "codigo": "241", "IP": "192.168.4.10:5050"}]
+        )
+        connector = BankConnectorService(routing=routing)
+        self.assertEqual(connector.get_route_by_bank_code("0241").contact, "brayan")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Test atomic balance posting and balance conservation under concurrency
+"""
+
+import unittest
+import sys
+import os
+import random
+import threading
+import uuid
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from sqlalchemy import func
+from app.models import db, Account
+from app.services.account_balance_service import AccountBalanceService
+from app.services.posting_service import posting_engine, InsufficientFundsError
+from tests.base import AppTestCase
+
+
+class TestPostingEngine(AppTestCase):
+    database_file = "posting.db"
+
+    def _total_balance(self):
+        return db.session.query(func.sum(Account.balance)).scalar()
+
+    def test_debit_rejected_without_funds(self):
+        """Test a debit larger than the balance is not applied"""
+        account = Account.query.filter_by(number="152001234567890").first()
+
+        with self.assertRaises(InsufficientFundsError) as raised:
+            posting_engine.post([(account.id, Decimal("-1000000"))])
+        db.session.rollback()
+
+        self.assertEqual(raised.exception.available, Decimal("50000.00"))
+        self.assertEqual(account.balance, Decimal("50000.00"))
+
+    def test_loaded_accounts_see_posted_balance(self):
+        """Test accounts already in the session reflect the new balances"""
+        source = db.session.get(Account, 1)
+        dest = db.session.get(Account, 3)
+
+        balances = posting_engine.transfer(1, 3, Decimal("250.50"))
+        db.session.commit()
+
+        self.assertEqual(balances[1], Decimal("49749.50"))
+        self.assertEqual(source.balance, Decimal("49749.50"))
+        self.assertEqual(dest.balance, Decimal("100250.50"))
+
+    def test_update_balance_accepts_float(self):
+        """Test float adjustments are converted before posting"""
+        result = AccountBalanceService.update_balance_atomic("152001234567890", 10.1)
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(result["previous_balance"], 50000.0)
+        self.assertEqual(result["new_balance"], 50010.1)
+        account = Account.query.filter_by(number="152001234567890").first()
+        self.assertEqual(account.balance, Decimal("50010.10"))
+
+    def test_concurrent_transfers_conserve_balance(self):
+        """Test threaded transfers neither lose updates nor overdraw accounts"""
+        account_numbers = [acc.number for acc in Account.query.all()]
+        total_before = self._total_balance()
+        completed = []
+        errors = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            with self.app.app_context():
+                for _ in range(25):
+                    source, dest = rng.sample(account_numbers, 2)
+                    result = AccountBalanceService.transfer_between_accounts(
+                        source,
+                        dest,
+                        Decimal(rng.randint(1, 40000)),
+                        transaction_id=str(uuid.uuid4()),
+                    )
+                    if result["success"]:
+                        completed.append(result)
+                    elif result["error"] != "Fondos insuficientes":
+                        errors.append(result["error"])
+                db.session.remove()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        db.session.expire_all()
+        self.assertEqual(errors, [])
+        self.assertTrue(completed)
+        self.assertEqual(self._total_balance(), total_before)
+        self.assertEqual(Account.query.filter(Account.balance < 0).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
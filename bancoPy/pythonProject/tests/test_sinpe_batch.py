@@ -0,0 +1,130 @@
+"""
+Test the SINPE Móvil batch transfer endpoint
+"""
+
+import unittest
+import sys
+import os
+import uuid
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.models import db, Account, Transaction
+from app.routes.sinpe_routes import sinpe_bp
+from app.utils.hmac_generator import generate_hmac_for_phone_transfer
+from tests.base import AppTestCase
+
+BATCH_URL = "/api/api/sinpe-movil-transfer/batch"
+
+
+def movil_payload(receiver_phone, amount, transaction_id=None, sender="88881111"):
+    transaction_id = transaction_id or str(uuid.uuid4())
+    timestamp = "2025-01-01T12:00:00Z"
+    return {
+        "version": "1.0",
+        "timestamp": timestamp,
+        "transaction_id": transaction_id,
+        "sender": {"phone_number": sender, "bank_code": "0151", "name": "Empresa"},
+        "receiver": {"phone_number": receiver_phone, "bank_code": "0152"},
+        "amount": {"value": amount, "currency": "CRC"},
+        "description": "Planilla",
+        "hmac_md5": generate_hmac_for_phone_transfer(
+            sender, timestamp, transaction_id, amount
+        ),
+    }
+
+
+class TestSinpeBatchEndpoint(AppTestCase):
+    blueprints = (sinpe_bp,)
+
+    def _balance(self, number="152001234567892"):
+        db.session.expire_all()
+        return Account.query.filter_by(number=number).first().balance
+
+    def test_partial_failure_commits_valid_items(self):
+        """Test failing items are reported while the rest are posted"""
+        first = movil_payload("88886666", 1000)
+        bad_hmac = movil_payload("88886666", 500)
+        bad_hmac["hmac_md5"] = "0" * 32
+
+        response = self.client.post(
+            BATCH_URL,
+            json={
+                "transfers": [
+                    first,
+                    bad_hmac,
+                    movil_payload("89999999", 700),
+                    movil_payload("88886666", 2000),
+                    movil_payload("88886666", 300, first["transaction_id"]),
+                ]
+            },
+        )
+        body = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(body["success"])
+        self.assertEqual(
+            [result["success"] for result in body["results"]],
+            [True, False, False, True, True],
+        )
+        self.assertEqual(body["results"][1]["error"], "HMAC signature inválida")
+        # A repeated transaction id replays the first result, credited once
+        replay = dict(body["results"][4], index=0)
+        self.assertEqual(replay, body["results"][0])
+        self.assertEqual(self._balance(), Decimal("103000.00"))
+        self.assertEqual(
+            Transaction.query.filter_by(
+                transaction_type="sinpe_movil_incoming"
+            ).count(),
+            2,
+        )
+
+    def test_batch_only_credits(self):
+        """Test a locally linked sender phone is not debited on receive"""
+        response = self.client.post(
+            BATCH_URL,
+            json={"transfers": [movil_payload("88886666", 1000, sender="88887777")]},
+        )
+
+        self.assertTrue(response.get_json()["success"], response.get_json())
+        self.assertEqual(self._balance("152001234567890"), Decimal("50000.00"))
+        self.assertEqual(self._balance(), Decimal("101000.00"))
+
+    def test_blocked_item_fails_alone(self):
+        """Test each item is fraud-scored and a blocked one is not credited"""
+        # Five transfers in the last minute put the sender over the velocity limit
+        self.client.post(
+            BATCH_URL,
+            json={"transfers": [movil_payload("88886666", 1000) for _ in range(5)]},
+        )
+
+        # Over the single-transfer limit, round and too fast: blocked
+        blocked = movil_payload("88886666", 500000)
+        response = self.client.post(
+            BATCH_URL,
+            json={"transfers": [blocked, movil_payload("88886666", 1000)]},
+        )
+        results = response.get_json()["results"]
+
+        self.assertEqual([result["success"] for result in results], [False, True])
+        self.assertTrue(
+            results[0]["error"].startswith("Transacción bloqueada por seguridad"),
+            results[0],
+        )
+        self.assertEqual(self._balance(), Decimal("106000.00"))
+        self.assertFalse(
+            Transaction.query.filter_by(
+                transaction_id=blocked["transaction_id"]
+            ).count()
+        )
+
+    def test_empty_batch_rejected(self):
+        """Test a batch without transfers is a bad request"""
+        response = self.client.post(BATCH_URL, json={"transfers": []})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Test SINPE Móvil party resolution and transfer posting
+"""
+
+import unittest
+import sys
+import os
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from sqlalchemy import event, text
+from app.models import db, Account
+from app.services.database_service import DatabaseService
+from app.services.sinpe_service import SinpeService
+from tests.base import AppTestCase
+
+
+class TestSinpeService(AppTestCase):
+    def test_resolve_parties_single_query(self):
+        """Test sender and receiver are resolved in one round trip"""
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            parties = SinpeService.resolve_sinpe_parties("88887777", "88886666")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(parties.sender_linked)
+        self.assertEqual(parties.sender_account.number, "152001234567890")
+        self.assertEqual(parties.receiver_account.number, "152001234567892")
+        self.assertEqual(parties.receiver_subscription.sinpe_bank_code, "152")
+
+    def test_resolve_parties_from_cache(self):
+        """Test cached phone links and subscriptions skip the joined query"""
+        SinpeService.resolve_sinpe_parties("88887777", "88886666")
+
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            parties = SinpeService.resolve_sinpe_parties("88887777", "88886666")
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(len(statements), 1)
+        self.assertNotIn("phone_links", statements[0])
+        self.assertEqual(parties.receiver_account.number, "152001234567892")
+        self.assertEqual(
+            parties.receiver_subscription.sinpe_client_name, "María Rodríguez Soto"
+        )
+
+    def test_resolve_unlinked_receiver(self):
+        """Test a subscribed phone without a local account link"""
+        parties = SinpeService.resolve_sinpe_parties("88887777", "88883333")
+        self.assertIsNotNone(parties.receiver_subscription)
+        self.assertFalse(parties.receiver_linked)
+        self.assertIsNone(parties.receiver_account)
+
+    def test_send_transfer_moves_funds(self):
+        """Test a local SINPE Móvil transfer debits and credits both accounts"""
+        SinpeService.send_sinpe_transfer("88887777", "88886666", 1000)
+
+        sender = Account.query.filter_by(number="152001234567890").first()
+        receiver = Account.query.filter_by(number="152001234567892").first()
+        self.assertEqual(sender.balance, Decimal("49000.00"))
+        self.assertEqual(receiver.balance, Decimal("101000.00"))
+
+    def test_send_transfer_unregistered_receiver(self):
+        """Test transfer to a phone not registered in SINPE Móvil fails"""
+        with self.assertRaises(Exception):
+            SinpeService.send_sinpe_transfer("88887777", "89999999", 1000)
+
+    def _incoming_transfer(self, receiver_account, transaction_id):
+        return SinpeService.process_incoming_sinpe_transfer(
+            sender_account="CR21-0151-0001-00-0000-0001-23",
+            sender_bank="0151",
+            sender_name="Banco Externo",
+            receiver_account=receiver_account,
+            receiver_bank="0152",
+            receiver_name="María Rodríguez Soto",
+            amount=2500,
+            currency="CRC",
+            description="Pago",
+            transaction_id=transaction_id,
+            timestamp="2025-01-01T00:00:00Z",
+        )
+
+    def test_incoming_transfer_resolves_iban(self):
+        """Test dashed and compact IBANs resolve through the indexed column"""
+        for receiver_account, transaction_id in [
+            ("CR21-0152-1520-0123-4567-892", "ext-iban-dashed"),
+            ("CR210152152001234567892", "ext-iban-compact"),
+        ]:
+            result = self._incoming_transfer(receiver_account, transaction_id)
+            self.assertTrue(result["success"], result)
+            self.assertEqual(result["receiver_account"], "152001234567892")
+
+        receiver = Account.query.filter_by(number="152001234567892").first()
+        self.assertEqual(receiver.balance, Decimal("105000.00"))
+
+    def test_incoming_transfer_unknown_iban(self):
+        """Test an IBAN without a local account is rejected"""
+        result = self._incoming_transfer("CR210152999999999999999", "ext-iban-miss")
+        self.assertFalse(result["success"])
+
+    def test_dashed_account_number_iban(self):
+        """Test IBANs of dashed account numbers are stored normalized"""
+        db.session.add(Account(number="1234-5678-90", balance=Decimal("0.00")))
+        db.session.commit()
+
+        for receiver_account, transaction_id in [
+            ("CR21-0152-1234-5678-90", "ext-dashed-1"),
+            ("CR2101521234567890", "ext-dashed-2"),
+        ]:
+            result = self._incoming_transfer(receiver_account, transaction_id)
+            self.assertEqual(result.get("receiver_account"), "1234-5678-90", result)
+
+        # IBANs stored before normalization are rewritten by the upgrade
+        with db.engine.begin() as connection:
+            connection.execute(
+                text(
+                    "UPDATE accounts SET iban = 'CR2101521234-5678-90' "
+                    "WHERE number = '1234-5678-90'"
+                )
+            )
+        DatabaseService().upgrade_schema()
+        db.session.expire_all()
+        account = Account.query.filter_by(number="1234-5678-90").first()
+        self.assertEqual(account.iban, "CR2101521234567890")
+
+    def test_upgrade_schema_backfills_iban(self):
+        """Test databases without the IBAN column are upgraded and backfilled"""
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_accounts_iban"))
+            connection.execute(text("ALTER TABLE accounts DROP COLUMN iban"))
+
+        DatabaseService().upgrade_schema()
+        db.session.expire_all()
+
+        account = Account.query.filter_by(iban="CR210152152001234567890").first()
+        self.assertEqual(account.number, "152001234567890")
+        self.assertEqual(Account.query.filter(Account.iban.is_(None)).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
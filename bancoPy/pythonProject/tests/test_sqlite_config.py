@@ -0,0 +1,62 @@
+"""
+Test SQLite connection pragmas and engine options
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from app.models import db
+from app.utils.sqlite_config import register_sqlite_pragmas, sqlite_engine_options
+
+
+class TestSqliteConfig(unittest.TestCase):
+    def setUp(self):
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config[
+            "SQLALCHEMY_DATABASE_URI"
+        ] = f"sqlite:///{os.path.join(self.db_dir.name, 'pragmas.db')}"
+        self.app.config["SQLALCHEMY_ENGINE_OPTIONS"] = sqlite_engine_options()
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        register_sqlite_pragmas(db.engine)
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.db_dir.cleanup()
+
+    def _pragma(self, name):
+        return db.session.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_pragmas_applied_on_connect(self):
+        """Test every new connection runs in WAL with the tuned pragmas"""
+        self.assertEqual(self._pragma("journal_mode"), "wal")
+        self.assertEqual(self._pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma("busy_timeout"), 5000)
+        self.assertEqual(self._pragma("temp_store"), 2)  # MEMORY
+        self.assertEqual(self._pragma("cache_size"), -16000)
+
+    def test_register_is_idempotent(self):
+        """Test registering twice does not install a second hook"""
+        register_sqlite_pragmas(db.engine)
+        self.assertEqual(self._pragma("journal_mode"), "wal")
+
+    def test_engine_uses_queue_pool(self):
+        """Test file databases get a bounded QueuePool"""
+        self.assertIsInstance(db.engine.pool, QueuePool)
+        self.assertEqual(db.engine.pool.size(), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Test transaction monitoring velocity data from SQL aggregates and counters
+"""
+
+import unittest
+import sys
+import os
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.sinpe_service import SinpeService
+from app.services.transaction_monitoring_service import transaction_monitor
+from app.services.velocity_counter_service import velocity_counters
+from tests.base import AppTestCase
+
+
+class TestTransactionMonitoringAggregates(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        for amount in (100, 200, 300):
+            SinpeService.send_sinpe_transfer("88887777", "88886666", amount)
+
+    def _velocity_data(self):
+        return (
+            transaction_monitor._daily_sent_total(1),
+            transaction_monitor._sent_last_minute(1, "88887777"),
+            transaction_monitor._received_last_hour("88886666", 3),
+        )
+
+    def test_sql_aggregates_when_counters_cold(self):
+        """Test range-bounded aggregates include today's completed transfers"""
+        daily_total, sent, received = self._velocity_data()
+
+        # Sample data adds one completed 5000 CRC transfer from account 1
+        self.assertEqual(daily_total, Decimal("5600.00"))
+        self.assertEqual(sent, (4, 4))
+        self.assertEqual(received, 8)
+
+    def test_counters_match_sql_aggregates(self):
+        """Test warmed counters report the same values as SQL"""
+        cold = self._velocity_data()
+        velocity_counters.warm_up()
+        self.assertEqual(self._velocity_data(), cold)
+
+
+if __name__ == "__main__":
+    unittest.main()
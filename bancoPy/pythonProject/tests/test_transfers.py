@@ -0,0 +1,111 @@
+"""
+Test the typed transfer objects passed through the SINPE pipeline
+"""
+
+import unittest
+import sys
+import os
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.transaction_monitoring_service import TransactionMonitoringService
+from app.utils.bank_routing import BankRoutingRegistry
+from app.utils.bank_secrets import BankSecretRegistry
+from app.utils.transfers import (
+    SINPE_MOVIL,
+    MonitoringInput,
+    OutgoingTransfer,
+    TransferResult,
+)
+from app.utils.hmac_generator import generate_hmac_for_phone_transfer
+from app.utils.validators import sinpe_movil_validator
+from tests.base import AppTestCase
+
+
+def movil_payload(amount=1000, transaction_id="txn-movil-1"):
+    timestamp = "2025-01-01T12:00:00+00:00"
+    return {
+        "version": "1.0",
+        "timestamp": timestamp,
+        "transaction_id": transaction_id,
+        "sender": {"phone_number": "87001122", "bank_code": "0151"},
+        "receiver": {"phone_number": "88886666"},
+        "amount": {"value": amount, "currency": "CRC"},
+        "hmac_md5": generate_hmac_for_phone_transfer(
+            "87001122", timestamp, transaction_id, amount
+        ),
+    }
+
+
+class TestTransferObjects(unittest.TestCase):
+    def test_transfer_result_round_trip(self):
+        """Test results serialize without unset fields and load back"""
+        result = TransferResult(success=False, error="Transacción duplicada")
+
+        self.assertEqual(
+            result.to_dict(), {"success": False, "error": "Transacción duplicada"}
+        )
+        self.assertEqual(TransferResult.from_dict(result.to_dict()), result)
+        self.assertFalse(hasattr(result, "__dict__"))
+
+    def test_verify_transfer_matches_payload(self):
+        """Test the typed HMAC check agrees with the payload check"""
+        routing = BankRoutingRegistry(path=None)
+        routing.load_contacts([])
+        secrets = BankSecretRegistry(routing=routing)
+
+        payload = movil_payload(amount=1500.75)
+        transfer, _ = sinpe_movil_validator.validate(payload)
+        self.assertTrue(secrets.verify_transfer(transfer))
+        self.assertTrue(secrets.verify(payload, payload["hmac_md5"]))
+
+        tampered = movil_payload()
+        tampered["hmac_md5"] = payload["hmac_md5"]
+        transfer, _ = sinpe_movil_validator.validate(tampered)
+        self.assertEqual(secrets.verify_transfers([transfer]), [False])
+
+    def test_outgoing_payload(self):
+        """Test outgoing transfers sign the sender and target the receiver"""
+        transfer = OutgoingTransfer(
+            kind=SINPE_MOVIL,
+            transaction_id="txn-1",
+            timestamp="2025-01-01T00:00:00",
+            amount=Decimal("250.50"),
+            currency="CRC",
+            sender={"phone_number": "87001122"},
+            receiver={"phone_number": "88886666", "bank_code": "0119"},
+        )
+
+        self.assertEqual(transfer.signer, "87001122")
+        self.assertEqual(transfer.destination, "88886666")
+        payload = transfer.to_payload("abc")
+        self.assertEqual(payload["amount"], {"value": 250.5, "currency": "CRC"})
+        self.assertEqual(payload["hmac_md5"], "abc")
+
+
+class TestMonitoringInput(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.monitor = TransactionMonitoringService()
+
+    def test_typed_and_dict_input_agree(self):
+        """Test the monitor scores a MonitoringInput like the legacy dict"""
+        data = {
+            "amount": 2500000,
+            "transaction_type": "sinpe_movil",
+            "sender_phone": "88887777",
+            "receiver_phone": "88886666",
+        }
+        typed = MonitoringInput.from_dict(data)
+        self.assertEqual(typed.amount, Decimal("2500000"))
+
+        from_dict = self.monitor.monitor_transaction(data)
+        from_typed = self.monitor.monitor_transaction(typed)
+        self.assertEqual(from_dict["risk_score"], from_typed["risk_score"])
+        self.assertEqual(from_dict["alerts"], from_typed["alerts"])
+
+
+if __name__ == "__main__":
+    unittest.main()
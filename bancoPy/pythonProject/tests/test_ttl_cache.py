@@ -0,0 +1,62 @@
+"""
+Test bounded TTL/LRU cache
+"""
+
+import unittest
+import sys
+import os
+import time
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.utils.ttl_cache import TTLCache, MISSING
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        """Test hits and misses are counted"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        self.assertIs(cache.get("88887777"), MISSING)
+        cache.set("88887777", "152001234567890")
+        self.assertEqual(cache.get("88887777"), "152001234567890")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_none_is_cacheable(self):
+        """Test negative results can be cached"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("89999999", None)
+        self.assertIsNone(cache.get("89999999"))
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted when full"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIs(cache.get("a"), MISSING)
+
+    def test_invalidate(self):
+        """Test explicit invalidation"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        self.assertIs(cache.get("a"), MISSING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Test the single-pass SINPE payload validator and the incoming transfer routes
+"""
+
+import unittest
+import sys
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.models import Account
+from app.routes.sinpe_routes import sinpe_bp
+from app.utils.hmac_generator import (
+    generate_hmac_for_account_transfer,
+    generate_hmac_for_phone_transfer,
+)
+from app.utils.transfers import SINPE, SINPE_MOVIL
+from app.utils.validators import (
+    parse_amount,
+    parse_timestamp,
+    sinpe_movil_validator,
+    sinpe_validator,
+)
+from tests.base import AppTestCase
+
+SENDER_IBAN = "CR21-0151-0001-12-3456-7890-12"
+RECEIVER_IBAN = "CR21-0152-0001-98-7654-3210-98"
+
+
+def sinpe_payload(amount=2500.5, timestamp="2025-01-01T12:00:00Z"):
+    transaction_id = str(uuid.uuid4())
+    return {
+        "version": "1.0",
+        "timestamp": timestamp,
+        "transaction_id": transaction_id,
+        "sender": {"account_number": SENDER_IBAN, "bank_code": "151", "name": "Ana"},
+        "receiver": {
+            "account_number": RECEIVER_IBAN,
+            "bank_code": "152",
+            "name": "María",
+        },
+        "amount": {"value": amount, "currency": "CRC"},
+        "description": "Pago",
+        "hmac_md5": generate_hmac_for_account_transfer(
+            SENDER_IBAN, timestamp, transaction_id, amount
+        ),
+    }
+
+
+def movil_payload(amount=1000, receiver_phone="88886666"):
+    transaction_id = str(uuid.uuid4())
+    timestamp = "2025-01-01T12:00:00+00:00"
+    return {
+        "version": "1.0",
+        "timestamp": timestamp,
+        "transaction_id": transaction_id,
+        "sender": {"phone_number": "87001122", "bank_code": "0151"},
+        "receiver": {"phone_number": receiver_phone},
+        "amount": {"value": amount, "currency": "CRC"},
+        "hmac_md5": generate_hmac_for_phone_transfer(
+            "87001122", timestamp, transaction_id, amount
+        ),
+    }
+
+
+class TestTransferValidator(unittest.TestCase):
+    def test_sinpe_payload_normalized(self):
+        """Test a valid payload becomes a typed transfer"""
+        payload = sinpe_payload(timestamp="2025-01-01T08:00:00-04:00")
+
+        transfer, message = sinpe_validator.validate(payload)
+
+        self.assertEqual(message, "Válido")
+        self.assertEqual(transfer.kind, SINPE)
+        self.assertEqual(transfer.amount, Decimal("2500.5"))
+        self.assertEqual(transfer.timestamp, datetime(2025, 1, 1, 12, 0))
+        self.assertEqual(transfer.sender_bank, "151")
+        self.assertEqual(transfer.receiver_account, RECEIVER_IBAN)
+
+    def test_errors_in_field_order(self):
+        """Test the first failing field is reported with the repo's messages"""
+        missing = sinpe_payload()
+        del missing["hmac_md5"]
+        bad_amount = sinpe_payload()
+        bad_amount["amount"]["value"] = "abc"
+        bad_iban = sinpe_payload()
+        bad_iban["receiver"]["account_number"] = "CR210152"
+        bad_timestamp = sinpe_payload(timestamp="ayer")
+
+        for payload, error in (
+            ([], "Payload debe ser un objeto JSON"),
+            (missing, "Falta campo requerido: hmac_md5"),
+            (bad_amount, "Amount value debe ser un número válido"),
+            (bad_iban, "IBAN receiver inválido: CR210152"),
+            (bad_timestamp, "Timestamp inválido (debe ser ISO 8601)"),
+        ):
+            self.assertEqual(sinpe_validator.validate(payload), (None, error))
+
+    def test_movil_payload(self):
+        """Test SINPE Móvil payloads check phone formats"""
+        transfer, _ = sinpe_movil_validator.validate(movil_payload())
+        self.assertEqual(transfer.kind, SINPE_MOVIL)
+        self.assertEqual(transfer.sender_bank, "0151")
+        self.assertEqual(transfer.amount, Decimal(1000))
+
+        transfer, message = sinpe_movil_validator.validate(
+            movil_payload(receiver_phone="1234")
+        )
+        self.assertIsNone(transfer)
+        self.assertEqual(message, "Número de teléfono receiver inválido: 1234")
+
+    def test_parse_helpers(self):
+        """Test amounts go straight to Decimal and timestamps to naive UTC"""
+        self.assertEqual(parse_amount(0.1), Decimal("0.1"))
+        self.assertEqual(parse_amount("150.25"), Decimal("150.25"))
+        for invalid in (True, None, "NaN", float("inf"), {"value": 1}):
+            self.assertIsNone(parse_amount(invalid))
+        self.assertEqual(
+            parse_timestamp("2025-01-01T12:00:00Z"), datetime(2025, 1, 1, 12)
+        )
+        self.assertIsNone(parse_timestamp(20250101))
+
+
+class TestIncomingTransferRoutes(AppTestCase):
+    blueprints = (sinpe_bp,)
+
+    def test_movil_transfer_credited(self):
+        """Test the route hands the validated transfer to the service"""
+        response = self.client.post(
+            "/api/api/sinpe-movil-transfer", json=movil_payload(amount=1500.75)
+        )
+
+        self.assertEqual(response.status_code, 200, response.get_json())
+        receiver = Account.query.filter_by(number="152001234567892").first()
+        self.assertEqual(receiver.balance, Decimal("101500.75"))
+
+    def test_sinpe_transfer_reaches_service(self):
+        """Test a valid SINPE payload is processed instead of failing on args"""
+        response = self.client.post("/api/api/sinpe-transfer", json=sinpe_payload())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["error"], "Cuenta destino no encontrada")
+
+
+if __name__ == "__main__":
+    unittest.main()
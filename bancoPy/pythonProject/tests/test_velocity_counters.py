@@ -0,0 +1,86 @@
+"""
+Test in-memory velocity counters used by transaction monitoring
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add app directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from app.services.velocity_counter_service import (
+    VelocityCounterStore,
+    FROM_ACCOUNT,
+    SENDER_PHONE,
+    RECEIVER_PHONE,
+    TO_ACCOUNT,
+)
+
+
+class TestVelocityCounterStore(unittest.TestCase):
+    def setUp(self):
+        self.store = VelocityCounterStore()
+
+    def test_record_updates_all_keys(self):
+        """Test a transfer is counted under account and phone keys"""
+        self.store.record(
+            1500,
+            from_account_id=1,
+            to_account_id=2,
+            sender_phone="88887777",
+            receiver_phone="88886666",
+        )
+
+        for namespace, key in [
+            (FROM_ACCOUNT, 1),
+            (TO_ACCOUNT, 2),
+            (SENDER_PHONE, "88887777"),
+            (RECEIVER_PHONE, "88886666"),
+        ]:
+            snapshot = self.store.snapshot(namespace, key)
+            self.assertEqual(snapshot["minute_count"], 1)
+            self.assertEqual(snapshot["hour_amount"], Decimal("1500"))
+            self.assertEqual(snapshot["day_count"], 1)
+
+    def test_rolling_windows_expire(self):
+        """Test minute and hour windows drop old events"""
+        now = datetime.utcnow()
+        self.store.record(100, from_account_id=1, when=now - timedelta(minutes=30))
+        self.store.record(200, from_account_id=1, when=now)
+
+        snapshot = self.store.snapshot(FROM_ACCOUNT, 1)
+        self.assertEqual(snapshot["minute_count"], 1)
+        self.assertEqual(snapshot["minute_amount"], Decimal("200"))
+        self.assertEqual(snapshot["hour_count"], 2)
+        self.assertEqual(snapshot["hour_amount"], Decimal("300"))
+
+    def test_daily_window_resets_on_new_day(self):
+        """Test daily totals only include today's transfers"""
+        now = datetime.utcnow()
+        self.store.record(500, from_account_id=1, when=now - timedelta(days=1))
+        self.store.record(700, from_account_id=1, when=now)
+
+        snapshot = self.store.snapshot(FROM_ACCOUNT, 1)
+        self.assertEqual(snapshot["day_count"], 1)
+        self.assertEqual(snapshot["day_amount"], Decimal("700"))
+
+    def test_unknown_key_is_empty(self):
+        """Test snapshot of an unseen key returns zeros"""
+        snapshot = self.store.snapshot(SENDER_PHONE, "80000000")
+        self.assertEqual(snapshot["minute_count"], 0)
+        self.assertEqual(snapshot["day_amount"], Decimal("0"))
+
+    def test_prune_drops_stale_keys(self):
+        """Test prune removes keys with no activity in any window"""
+        self.store.record(
+            100, from_account_id=1, when=datetime.utcnow() - timedelta(days=2)
+        )
+        self.store.prune()
+        self.assertEqual(self.store.get_stats()["tracked_keys"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()